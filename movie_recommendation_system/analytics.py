@@ -0,0 +1,125 @@
+import threading
+import numpy as np
+import pandas as pd
+from recommendation_result import MovieCatalog
+
+# Number of dataset versions whose aggregates are kept in memory
+MAX_CACHED_VERSIONS = 4
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+class DatasetAggregates:
+    """
+    Dashboard statistics for a movies/ratings dataset.
+
+    Movie-side counts are computed once from factorized genre and year codes.
+    Rating-side statistics are accumulated with bincount over the genre code
+    of each rated movie (found by array indexing, no merge).
+    """
+    def __init__(self, movies_df, ratings_df):
+        catalog = MovieCatalog(movies_df)
+        self._positions_for = catalog.positions_for
+
+        genre_codes, genres = pd.factorize(movies_df['genre'])
+        self.genres = np.asarray(genres)
+        self._movie_genre = genre_codes
+        self.genre_movie_counts = np.bincount(genre_codes[genre_codes >= 0], minlength=len(genres))
+
+        years, year_counts = np.unique(movies_df['year'].dropna().to_numpy(), return_counts=True)
+        self.years = years
+        self.year_movie_counts = year_counts
+        self.total_movies = len(movies_df)
+
+        self.total_ratings = 0
+        self.rating_sum = 0.0
+        self.genre_rating_counts = np.zeros(len(genres), dtype=np.int64)
+        self.genre_rating_sums = np.zeros(len(genres))
+        self._rating_values = {}
+        self._users = set()
+        self.add_ratings(ratings_df)
+
+    def add_ratings(self, ratings_df):
+        """
+        Fold new rating rows into the aggregates
+        """
+        ratings = ratings_df['rating'].to_numpy(dtype=np.float64)
+        self.total_ratings += len(ratings)
+        self.rating_sum += float(ratings.sum())
+
+        values, counts = np.unique(ratings_df['rating'].to_numpy(), return_counts=True)
+        for value, count in zip(values.tolist(), counts.tolist()):
+            self._rating_values[value] = self._rating_values.get(value, 0) + count
+
+        self._users.update(pd.unique(ratings_df['user_id']).tolist())
+
+        positions = self._positions_for(ratings_df['movie_id'].to_numpy())
+        known = positions >= 0
+        genre_codes = self._movie_genre[positions[known]]
+        with_genre = genre_codes >= 0
+        n_genres = len(self.genres)
+        self.genre_rating_counts += np.bincount(genre_codes[with_genre], minlength=n_genres)
+        self.genre_rating_sums += np.bincount(
+            genre_codes[with_genre], weights=ratings[known][with_genre], minlength=n_genres
+        )
+
+    @property
+    def total_users(self):
+        return len(self._users)
+
+    @property
+    def average_rating(self):
+        return self.rating_sum / self.total_ratings if self.total_ratings else float('nan')
+
+    @property
+    def genre_counts(self):
+        """
+        Number of movies per genre, most common first
+        """
+        counts = pd.Series(self.genre_movie_counts, index=self.genres, name='count')
+        return counts.sort_values(ascending=False, kind='stable')
+
+    @property
+    def rating_distribution(self):
+        """
+        Number of ratings per rating value, by value
+        """
+        return pd.Series(self._rating_values, name='count').sort_index()
+
+    @property
+    def genre_average_rating(self):
+        """
+        Average user rating per genre, best first
+        """
+        rated = self.genre_rating_counts > 0
+        averages = self.genre_rating_sums[rated] / self.genre_rating_counts[rated]
+        return pd.Series(averages, index=self.genres[rated], name='rating').sort_values(
+            ascending=False, kind='stable'
+        )
+
+    @property
+    def year_counts(self):
+        """
+        Number of movies per release year, by year
+        """
+        return pd.Series(self.year_movie_counts, index=self.years, name='count')
+
+
+def get_aggregates(movies_df, ratings_df, version):
+    """
+    Get the aggregates of a dataset, computing them once per dataset version
+
+    With version None the aggregates are computed but not cached.
+    """
+    if version is None:
+        return DatasetAggregates(movies_df, ratings_df)
+
+    with _cache_lock:
+        aggregates = _cache.get(version)
+        if aggregates is None:
+            aggregates = DatasetAggregates(movies_df, ratings_df)
+            _cache[version] = aggregates
+            while len(_cache) > MAX_CACHED_VERSIONS:
+                _cache.pop(next(iter(_cache)))
+        return aggregates
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the recommendation engine precision modes
+This script compares memory, query latency and recommendation quality of the
+float64, float32 and int8 engines on the same data.
+"""
+
+import argparse
+import random
+import time
+import numpy as np
+from data_generator import generate_movie_data
+from recommendation_engine import MovieRecommendationEngine
+from quantization import PRECISIONS, nbytes
+
+def split_ratings(ratings_df, n_holdout=2):
+    """
+    Hold out each user's most recent ratings for evaluation
+    """
+    ordered = ratings_df.sort_values(['user_id', 'timestamp'])
+    recent = ordered.groupby('user_id').cumcount(ascending=False) < n_holdout
+    return ordered[~recent], ordered[recent]
+
+def model_memory(engine):
+    """
+    Bytes held by the content features, neighbor lists and NMF item factors
+    """
+    return {
+        'content_features': nbytes(engine.content_matrix),
+        'content_neighbors': nbytes(engine.content_neighbors),
+        'item_factors': nbytes(engine.item_factors),
+    }
+
+def time_queries(query, args):
+    """
+    Mean latency of a query in milliseconds
+    """
+    start_time = time.perf_counter()
+    results = [query(arg) for arg in args]
+    return (time.perf_counter() - start_time) * 1000 / len(args), results
+
+def hit_rate(results, users, test_df):
+    """
+    Share of users with at least one held-out movie among their recommendations
+    """
+    held_out = test_df.groupby('user_id')['movie_id'].apply(set)
+    hits = [bool(held_out.get(user, set()) & set(result.movie_ids.tolist()))
+            for user, result in zip(users, results)]
+    return float(np.mean(hits))
+
+def overlap(results, reference):
+    """
+    Average share of the reference recommendations that are also recommended
+    """
+    return float(np.mean([
+        len(set(a.movie_ids.tolist()) & set(b.movie_ids.tolist())) / max(len(b), 1)
+        for a, b in zip(results, reference)
+    ]))
+
+def run_benchmark(num_movies=1000, num_users=500, n_queries=200, k=10):
+    """Build one engine per precision mode and report memory, latency and quality"""
+    random.seed(42)
+    movies_df, ratings_df = generate_movie_data(num_movies, num_users)
+    train_df, test_df = split_ratings(ratings_df)
+
+    rng = np.random.default_rng(42)
+    movie_ids = rng.choice(movies_df['movie_id'].to_numpy(), n_queries)
+    users = rng.choice(train_df['user_id'].unique(), n_queries)
+
+    reference = None
+    for precision in PRECISIONS:
+        start_time = time.perf_counter()
+        engine = MovieRecommendationEngine(movies_df, train_df, lazy=False, precision=precision)
+        build_time = time.perf_counter() - start_time
+
+        cb_ms, cb_results = time_queries(
+            lambda movie_id: engine.content_based_recommendations(movie_id, k, compact=True), movie_ids
+        )
+        cf_ms, cf_results = time_queries(
+            lambda user_id: engine.collaborative_filtering_recommendations(user_id, k, compact=True), users
+        )
+        if reference is None:
+            reference = (cb_results, cf_results)
+
+        memory = model_memory(engine)
+        print(f"\n{precision}")
+        print(f"  build time:        {build_time:.2f} s")
+        for name, size in memory.items():
+            print(f"  {name + ':':<19}{size / 1024:,.0f} KiB")
+        print(f"  total:             {sum(memory.values()) / 1024:,.0f} KiB")
+        print(f"  content query:     {cb_ms:.3f} ms")
+        print(f"  CF query:          {cf_ms:.3f} ms")
+        print(f"  CF hit rate@{k}:    {hit_rate(cf_results, users, test_df):.3f}")
+        print(f"  content overlap@{k} with float64: {overlap(cb_results, reference[0]):.3f}")
+        print(f"  CF overlap@{k} with float64:      {overlap(cf_results, reference[1]):.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--movies', type=int, default=1000)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args()
+    run_benchmark(args.movies, args.users, args.queries)
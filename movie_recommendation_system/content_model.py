@@ -0,0 +1,200 @@
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer
+from sklearn.preprocessing import normalize
+
+# Relative weight of each field block in the content features
+FIELD_WEIGHTS = {'genre': 1.0, 'director': 0.7, 'cast': 0.7, 'description': 0.5}
+
+# Hashed feature space for descriptions; no shared vocabulary is needed between chunks
+N_HASH_FEATURES = 2 ** 18
+
+# Upper bound on the dense similarity block (rows x movies) held at once
+MAX_BLOCK_ELEMENTS = 2 ** 24
+
+# Below this many rows the work is done in-process; a pool costs more than it saves
+PARALLEL_MIN_ROWS = 20000
+
+_worker_matrix = None
+
+
+def _resolve_jobs(n_jobs):
+    if n_jobs is None or n_jobs <= 0:
+        return os.cpu_count() or 1
+    return n_jobs
+
+
+def _hashing_vectorizer():
+    return HashingVectorizer(
+        n_features=N_HASH_FEATURES,
+        stop_words='english',
+        alternate_sign=False,
+        norm=None
+    )
+
+
+def _hash_chunk(texts):
+    """
+    Tokenize and hash one chunk of descriptions into term counts
+    """
+    return _hashing_vectorizer().transform(texts)
+
+
+def _init_block_worker(matrix):
+    global _worker_matrix
+    _worker_matrix = matrix
+
+
+def _block_neighbors(task):
+    """
+    Compute the top-k most similar rows for one block of rows
+    """
+    start, stop, k = task
+    matrix = _worker_matrix
+    block = (matrix[start:stop] @ matrix.T).toarray()
+
+    # Exclude each movie from its own neighbor list
+    rows = np.arange(stop - start)
+    block[rows, rows + start] = -np.inf
+
+    indices = np.argpartition(-block, k - 1, axis=1)[:, :k]
+    scores = np.take_along_axis(block, indices, axis=1)
+    order = np.argsort(-scores, axis=1, kind='stable')
+    return (np.take_along_axis(indices, order, axis=1).astype(np.int32),
+            np.take_along_axis(scores, order, axis=1))
+
+
+def _run_tasks(func, tasks, n_jobs, initializer=None, initargs=()):
+    """
+    Run tasks in order, across a process pool when there is more than one worker
+    """
+    n_workers = min(_resolve_jobs(n_jobs), len(tasks))
+    if n_workers <= 1:
+        if initializer is not None:
+            initializer(*initargs)
+        return [func(task) for task in tasks]
+
+    with ProcessPoolExecutor(
+        max_workers=n_workers,
+        mp_context=multiprocessing.get_context('spawn'),
+        initializer=initializer,
+        initargs=initargs
+    ) as pool:
+        return list(pool.map(func, tasks))
+
+
+class ContentFeatures:
+    """
+    Weighted, L2-normalized content feature matrix of the catalog.
+
+    Columns are grouped in one block per field; ``blocks`` maps a field to
+    its column slice and ``labels`` maps categorical fields to the category
+    of each column in their block.
+    """
+    def __init__(self, matrix, blocks, labels):
+        self.matrix = matrix
+        self.blocks = blocks
+        self.labels = labels
+
+
+def _one_hot(rows, codes, n_rows, n_categories):
+    values = np.ones(len(rows))
+    return sparse.csr_matrix((values, (rows, codes)), shape=(n_rows, n_categories))
+
+
+def encode_categorical(values):
+    """
+    One-hot encode a single-valued categorical column
+    """
+    codes, labels = pd.factorize(pd.Series(values).reset_index(drop=True))
+    rows = np.flatnonzero(codes >= 0)
+    return _one_hot(rows, codes[rows], len(codes), len(labels)), np.asarray(labels)
+
+
+def encode_multi_valued(values, separator=','):
+    """
+    Multi-hot encode a column holding separator-delimited members (e.g. cast)
+    """
+    members = pd.Series(values).reset_index(drop=True).fillna('').astype(str)
+    members = members.str.split(separator).explode().str.strip()
+    members = members[members != '']
+    codes, labels = pd.factorize(members)
+    return _one_hot(members.index.to_numpy(), codes, len(values), len(labels)), np.asarray(labels)
+
+
+def encode_description(descriptions, n_jobs=None, chunk_size=10000):
+    """
+    TF-IDF encode free-text descriptions.
+
+    Text is tokenized and hashed in independent chunks (in parallel for large
+    catalogs), then IDF weighting is applied to the stacked counts. Hash
+    columns that no description uses are dropped.
+    """
+    texts = pd.Series(descriptions).fillna('').astype(str).tolist()
+    n_rows = len(texts)
+    if n_rows < PARALLEL_MIN_ROWS:
+        n_jobs = 1
+    else:
+        chunk_size = min(chunk_size, -(-n_rows // _resolve_jobs(n_jobs)))
+
+    chunks = [texts[start:start + chunk_size] for start in range(0, max(n_rows, 1), chunk_size)]
+    counts = sparse.vstack(_run_tasks(_hash_chunk, chunks, n_jobs)).tocsr()
+    used = np.unique(counts.indices)
+    return TfidfTransformer().fit_transform(counts[:, used]).tocsr()
+
+
+def build_content_features(movies_df, n_jobs=None, field_weights=None):
+    """
+    Build the content feature matrix from structured movie fields.
+
+    Genre and director are one-hot encoded, every cast member gets its own
+    column, and only the description goes through TF-IDF. Each field block is
+    normalized and scaled by its weight before the rows are L2-normalized.
+    """
+    weights = dict(FIELD_WEIGHTS, **(field_weights or {}))
+    encoded = {}
+    labels = {}
+    encoded['genre'], labels['genre'] = encode_categorical(movies_df['genre'])
+    encoded['director'], labels['director'] = encode_categorical(movies_df['director'])
+    encoded['cast'], labels['cast'] = encode_multi_valued(movies_df['cast'])
+    encoded['description'] = encode_description(movies_df['description'], n_jobs=n_jobs)
+
+    blocks = {}
+    parts = []
+    start = 0
+    for field, block in encoded.items():
+        parts.append(normalize(block) * weights[field])
+        blocks[field] = slice(start, start + block.shape[1])
+        start += block.shape[1]
+
+    matrix = normalize(sparse.hstack(parts, format='csr'))
+    return ContentFeatures(matrix, blocks, labels)
+
+
+def top_k_neighbors(matrix, k, n_jobs=None, block_size=None):
+    """
+    Find the k most similar rows for every row of an L2-normalized matrix.
+
+    Similarities are computed one block of rows at a time so peak memory is
+    bounded by block_size x n_rows. Returns (indices, scores) arrays of shape
+    (n_rows, k), sorted by descending similarity.
+    """
+    n_rows = matrix.shape[0]
+    k = min(k, n_rows - 1)
+    if k <= 0:
+        return np.empty((n_rows, 0), dtype=np.int32), np.empty((n_rows, 0))
+
+    max_block = max(1, MAX_BLOCK_ELEMENTS // max(n_rows, 1))
+    block_size = min(block_size or max_block, max_block)
+    if n_rows < PARALLEL_MIN_ROWS:
+        n_jobs = 1
+
+    tasks = [(start, min(start + block_size, n_rows), k) for start in range(0, n_rows, block_size)]
+    results = _run_tasks(_block_neighbors, tasks, n_jobs,
+                         initializer=_init_block_worker, initargs=(matrix,))
+    _init_block_worker(None)
+    return np.vstack([r[0] for r in results]), np.vstack([r[1] for r in results])
@@ -1,8 +1,13 @@
+import os
+import hashlib
 import pandas as pd
 import numpy as np
 import random
 from datetime import datetime, timedelta
 
+MOVIES_FILE = 'movies.csv'
+RATINGS_FILE = 'ratings.csv'
+
 def generate_movie_data(num_movies=1000, num_users=500):
     """
     Generate sample movie data for the recommendation system
@@ -53,13 +58,38 @@ def save_sample_data():
     movies_df, ratings_df = generate_movie_data()
     
     # Save to CSV files
-    movies_df.to_csv('movies.csv', index=False)
-    ratings_df.to_csv('ratings.csv', index=False)
+    movies_df.to_csv(MOVIES_FILE, index=False)
+    ratings_df.to_csv(RATINGS_FILE, index=False)
     
     print(f"Generated {len(movies_df)} movies and {len(ratings_df)} ratings")
     print("Data saved to movies.csv and ratings.csv")
     
     return movies_df, ratings_df
 
+def dataset_fingerprint(movies_path=MOVIES_FILE, ratings_path=RATINGS_FILE):
+    """
+    Get a cheap version key for the data files from their sizes and modification times
+    
+    Returns None when a data file does not exist.
+    """
+    parts = []
+    for path in (movies_path, ratings_path):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        parts.append(f"{os.path.abspath(path)}:{stat.st_size}:{stat.st_mtime_ns}")
+    return hashlib.sha1('|'.join(parts).encode()).hexdigest()[:16]
+
+def frames_fingerprint(*frames):
+    """
+    Get a version key for data frames in memory from a hash of their columns and rows
+    """
+    digest = hashlib.sha1()
+    for frame in frames:
+        digest.update(repr(list(frame.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(frame, index=True).to_numpy().tobytes())
+    return digest.hexdigest()[:16]
+
 if __name__ == "__main__":
     save_sample_data() 
\ No newline at end of file
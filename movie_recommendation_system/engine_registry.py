@@ -0,0 +1,454 @@
+#!/usr/bin/env python3
+"""
+Versioned, memory-mapped engine artifacts shared by every process on a host.
+
+A registry directory looks like:
+
+    registry/
+    ├── CURRENT              # name of the version being served
+    └── versions/
+        └── <version>/
+            ├── state.pkl    # small engine metadata (settings, specs of the arrays, vocabularies...)
+            └── *.npy        # model and data arrays, opened with mmap_mode='r'
+
+Models, indexes and data frames are broken down to their NumPy arrays, which
+are memory-mapped read-only, so every worker process serving a version
+shares one copy of them through the page cache. Text is saved as UTF-8
+bytes plus offsets and reopened as pyarrow-backed string arrays over the
+mapped files (decoded into each process only when pyarrow is missing), and
+timestamp columns are saved as datetime64 arrays. Publishing writes a
+new version directory and then atomically replaces CURRENT; workers notice
+the change on their next get() and switch to the new version without
+dropping requests.
+"""
+
+import os
+import sys
+import copy
+import time
+import pickle
+import shutil
+import threading
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from scipy import sparse
+try:
+    import pyarrow as pa
+except ImportError:  # Text is then decoded into every process
+    pa = None
+from content_model import ContentFeatures
+from item_cf import ItemCFModel
+from quantization import QuantizedMatrix
+from recommendation_result import MovieCatalog
+from search_index import MovieSearchIndex, _FieldIndex
+from temporal import RatingsTimeIndex
+
+CURRENT_FILE = 'CURRENT'
+VERSIONS_DIR = 'versions'
+STATE_FILE = 'state.pkl'
+
+# Largest numeric array state.pkl may hold; anything bigger would be copied
+# into every worker instead of shared, so it must be saved as a .npy file
+MAX_PICKLED_ARRAY_BYTES = 64 * 1024
+
+# Classes saved attribute by attribute, with the attributes that are
+# per-process caches and start empty when reopened
+ATTRIBUTE_KINDS = {
+    'catalog': (MovieCatalog, {'_groups': dict}),
+    'time_index': (RatingsTimeIndex, {}),
+    'search_index': (MovieSearchIndex, {'_cache': OrderedDict}),
+    'item_cf': (ItemCFModel, {}),
+}
+
+# Text columns of the data frames saved as datetime64 arrays when all their values parse
+TIMESTAMP_COLUMNS = ('timestamp',)
+
+
+class _StatePickler(pickle.Pickler):
+    """
+    Pickler refusing the numeric arrays too large to keep in state.pkl
+    """
+    def reducer_override(self, obj):
+        if isinstance(obj, np.ndarray) and obj.dtype != object and obj.nbytes > MAX_PICKLED_ARRAY_BYTES:
+            raise ValueError(f"Engine state holds a {obj.nbytes:,}-byte {obj.dtype} array; "
+                             f"give its model a spec in _save_value so it is memory-mapped")
+        return NotImplemented
+
+
+def _text_dtype():
+    """String dtype for reopened text arrays: pyarrow storage, NaN for missing values"""
+    try:
+        return pd.StringDtype('pyarrow', na_value=np.nan)
+    except TypeError:  # pandas < 2.3 names this storage 'pyarrow_numpy'
+        return pd.StringDtype('pyarrow_numpy')
+
+
+def _is_text(value):
+    """Check for an object or string array holding only strings and missing values"""
+    if isinstance(value, np.ndarray):
+        return value.dtype == object and value.ndim == 1 and pd.api.types.infer_dtype(value) == 'string'
+    return isinstance(value, pd.api.extensions.ExtensionArray) and isinstance(value.dtype, pd.StringDtype)
+
+
+def _save_strings(values, directory, name, memo, container):
+    """
+    Save strings as their UTF-8 bytes plus each one's end offset in them
+
+    container is what to reopen without pyarrow: 'list', 'array' or a string dtype.
+    """
+    missing = np.asarray(pd.isna(values), dtype=bool)
+    encoded = [b'' if miss else value.encode('utf-8') for value, miss in zip(values, missing)]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(item) for item in encoded], out=offsets[1:])
+    data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return ('strings', container, _save_value(offsets, directory, f"{name}.offsets", memo),
+            _save_value(data, directory, f"{name}.utf8", memo),
+            _save_value(missing, directory, f"{name}.missing", memo) if missing.any() else None)
+
+
+def _open_strings(spec, directory, memo):
+    """Reopen strings saved by _save_strings, over the mapped files when pyarrow is installed"""
+    container = spec[1]
+    offsets, data = _load_value(spec[2], directory, memo), _load_value(spec[3], directory, memo)
+    missing = None if spec[4] is None else _load_value(spec[4], directory, memo)
+    if pa is not None:
+        validity = None if missing is None else pa.py_buffer(np.packbits(~missing, bitorder='little'))
+        strings = pa.LargeStringArray.from_buffers(len(offsets) - 1, pa.py_buffer(offsets),
+                                                   pa.py_buffer(data), validity)
+        if not (isinstance(container, pd.StringDtype) and container.storage.startswith('pyarrow')):
+            container = _text_dtype()
+        return pd.array(strings, dtype=container)
+    raw = data.tobytes()
+    values = [None if missing is not None and missing[i] else raw[offsets[i]:offsets[i + 1]].decode('utf-8')
+              for i in range(len(offsets) - 1)]
+    if container == 'list':
+        return values
+    if container == 'array':
+        return np.array(values, dtype=object)
+    return pd.array(values, dtype=container)
+
+
+def _save_column(series, directory, name, memo):
+    """Save a frame column; a timestamp column whose text all parses is saved as datetime64"""
+    if series.name in TIMESTAMP_COLUMNS and (series.dtype == object or isinstance(series.dtype, pd.StringDtype)):
+        try:
+            parsed = pd.to_datetime(series, format='ISO8601')
+        except (ValueError, TypeError):
+            parsed = None
+        if parsed is not None and parsed.dt.tz is None:
+            return _save_value(parsed.to_numpy(), directory, name, memo)
+    data = series.to_numpy() if isinstance(series.dtype, np.dtype) else series.array
+    return _save_value(data, directory, name, memo)
+
+
+def _save_value(value, directory, name, memo=None):
+    """
+    Save the arrays of a model as .npy files and return a spec to reopen it
+
+    memo maps objects already saved (by id) to their spec, so an object
+    reachable from several models is written once.
+    """
+    if memo is None:
+        memo = {}
+    if id(value) in memo:
+        return memo[id(value)][1]
+    spec = _save_parts(value, directory, name, memo)
+    # Keep the object alive so its id is not reused while saving
+    memo[id(value)] = (value, spec)
+    return spec
+
+
+def _save_attributes(attributes, directory, name, memo):
+    return {attr: _save_value(value, directory, f"{name}.{attr}", memo) for attr, value in attributes.items()}
+
+
+def _save_parts(value, directory, name, memo):
+    for kind, (cls, caches) in ATTRIBUTE_KINDS.items():
+        if type(value) is cls:
+            attributes = {attr: item for attr, item in vars(value).items() if attr not in caches}
+            return (kind, _save_attributes(attributes, directory, name, memo))
+    if isinstance(value, _FieldIndex):
+        # Postings are packed into one array of documents plus each gram's offset in it
+        attributes = dict(vars(value))
+        postings = attributes.pop('postings')
+        attributes['texts'] = np.array(attributes['texts'], dtype=object)
+        grams = list(postings)
+        offsets = np.cumsum([0] + [len(postings[gram]) for gram in grams])
+        docs = np.concatenate([postings[gram] for gram in grams]) if grams else np.empty(0, dtype=np.int64)
+        return ('field_index', _save_attributes(attributes, directory, name, memo), grams,
+                _save_value(offsets, directory, f"{name}.offsets", memo),
+                _save_value(docs, directory, f"{name}.postings", memo))
+    if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        return ('dict', _save_attributes(value, directory, name, memo))
+    if isinstance(value, np.ndarray) and value.dtype != object:
+        filename = f"{name}.npy"
+        np.save(os.path.join(directory, filename), value)
+        return ('array', filename)
+    if _is_text(value):
+        return _save_strings(value, directory, name, memo,
+                             'array' if isinstance(value, np.ndarray) else value.dtype)
+    if isinstance(value, pd.Index) and not isinstance(value, (pd.RangeIndex, pd.MultiIndex)):
+        return ('index', _save_value(value.array if isinstance(value.dtype, pd.StringDtype) else value.to_numpy(),
+                                     directory, name, memo), value.name)
+    if isinstance(value, tuple):
+        return ('tuple', [_save_value(item, directory, f"{name}.{i}", memo) for i, item in enumerate(value)])
+    if isinstance(value, QuantizedMatrix):
+        return ('quantized', _save_value(value.codes, directory, f"{name}.codes", memo),
+                _save_value(value.scales, directory, f"{name}.scales", memo))
+    if sparse.issparse(value):
+        value = value.tocsr()
+        return ('csr', value.shape, [_save_value(part, directory, f"{name}.{part_name}", memo)
+                                     for part_name, part in (('data', value.data),
+                                                             ('indices', value.indices),
+                                                             ('indptr', value.indptr))])
+    if isinstance(value, ContentFeatures):
+        return ('content_features', _save_value(value.matrix, directory, f"{name}.matrix", memo),
+                value.blocks, value.labels)
+    if isinstance(value, pd.DataFrame) and len(value.dtypes.unique()) == 1 \
+            and value.dtypes.iloc[0] != object:
+        return ('frame', _save_value(value.to_numpy(), directory, f"{name}.values", memo),
+                _save_value(value.index, directory, f"{name}.index", memo),
+                _save_value(value.columns, directory, f"{name}.columns", memo))
+    if isinstance(value, pd.DataFrame) and value.columns.is_unique:
+        # Mixed frames are saved column by column
+        columns = [(column, _save_column(series, directory, f"{name}.{i}", memo))
+                   for i, (column, series) in enumerate(value.items())]
+        return ('columns', _save_value(value.index, directory, f"{name}.index", memo), columns)
+    return ('pickle', value)
+
+
+def _load_value(spec, directory, memo=None):
+    """
+    Reopen a model saved by _save_value, memory-mapping its arrays
+
+    Specs shared by several models are opened once (memo maps spec ids to
+    the opened values).
+    """
+    if memo is None:
+        memo = {}
+    if id(spec) not in memo:
+        memo[id(spec)] = _load_parts(spec, directory, memo)
+    return memo[id(spec)]
+
+
+def _load_attributes(specs, directory, memo):
+    return {attr: _load_value(spec, directory, memo) for attr, spec in specs.items()}
+
+
+def _load_parts(spec, directory, memo):
+    kind = spec[0]
+    if kind in ATTRIBUTE_KINDS:
+        cls, caches = ATTRIBUTE_KINDS[kind]
+        value = cls.__new__(cls)
+        value.__dict__.update(_load_attributes(spec[1], directory, memo))
+        for attr, factory in caches.items():
+            setattr(value, attr, factory())
+        return value
+    if kind == 'field_index':
+        value = _FieldIndex.__new__(_FieldIndex)
+        value.__dict__.update(_load_attributes(spec[1], directory, memo))
+        offsets, docs = _load_value(spec[3], directory, memo), _load_value(spec[4], directory, memo)
+        value.postings = {gram: docs[offsets[i]:offsets[i + 1]] for i, gram in enumerate(spec[2])}
+        return value
+    if kind == 'dict':
+        return _load_attributes(spec[1], directory, memo)
+    if kind == 'array':
+        return np.load(os.path.join(directory, spec[1]), mmap_mode='r')
+    if kind == 'strings':
+        return _open_strings(spec, directory, memo)
+    if kind == 'index':
+        return pd.Index(_load_value(spec[1], directory, memo), name=spec[2], copy=False)
+    if kind == 'tuple':
+        return tuple(_load_value(item, directory, memo) for item in spec[1])
+    if kind == 'quantized':
+        return QuantizedMatrix(_load_value(spec[1], directory, memo), _load_value(spec[2], directory, memo))
+    if kind == 'csr':
+        data, indices, indptr = (_load_value(part, directory, memo) for part in spec[2])
+        return sparse.csr_matrix((data, indices, indptr), shape=spec[1], copy=False)
+    if kind == 'content_features':
+        return ContentFeatures(_load_value(spec[1], directory, memo), spec[2], spec[3])
+    if kind == 'frame':
+        return pd.DataFrame(_load_value(spec[1], directory, memo), index=_load_value(spec[2], directory, memo),
+                            columns=_load_value(spec[3], directory, memo), copy=False)
+    if kind == 'columns':
+        columns = {column: _load_value(item, directory, memo) for column, item in spec[2]}
+        return pd.DataFrame(columns, index=_load_value(spec[1], directory, memo), copy=False)
+    return spec[1]
+
+
+def save_engine_arrays(engine, directory):
+    """
+    Write an engine's built models and data to a directory as .npy files plus state.pkl
+
+    Raises ValueError if state.pkl would hold a numeric array larger than
+    MAX_PICKLED_ARRAY_BYTES.
+    """
+    from recommendation_engine import MovieRecommendationEngine
+
+    state = engine.__getstate__()
+    models = state.pop('_models')
+    # Models and data that are the same object (e.g. an undecayed CF training
+    # matrix, or the catalog every index refers to) are saved once
+    memo = {}
+    specs = {}
+    for name, value in models.items():
+        if name == 'nmf_model' and isinstance(models.get('item_factors'), np.ndarray):
+            # The NMF components are the item factors; share them instead of pickling a copy
+            value = copy.copy(value)
+            value.components_ = None
+            specs[name] = ('pickle', value)
+            continue
+        specs[name] = _save_value(value, directory, name, memo)
+    state_specs = {name: _save_value(value, directory, f"state.{name}", memo) for name, value in state.items()}
+
+    with open(os.path.join(directory, STATE_FILE), 'wb') as f:
+        _StatePickler(f, protocol=pickle.HIGHEST_PROTOCOL).dump(
+            {'class': MovieRecommendationEngine, 'state': state_specs, 'models': specs})
+
+
+def load_engine_arrays(directory):
+    """
+    Open an engine written by save_engine_arrays with memory-mapped, read-only models
+    """
+    with open(os.path.join(directory, STATE_FILE), 'rb') as f:
+        saved = pickle.load(f)
+
+    memo = {}
+    engine = saved['class'].__new__(saved['class'])
+    engine.__dict__.update({name: _load_value(spec, directory, memo) for name, spec in saved['state'].items()})
+    engine._models = {name: _load_value(spec, directory, memo) for name, spec in saved['models'].items()}
+    nmf_model = engine._models.get('nmf_model')
+    if nmf_model is not None and nmf_model.components_ is None:
+        nmf_model.components_ = engine._models['item_factors'].T
+    return engine
+
+
+class EngineRegistry:
+    """
+    Registry of published engine versions in a directory shared by worker processes.
+
+    get() returns the engine of the current version and re-reads the CURRENT
+    pointer at most every check_interval seconds, so a publish() from any
+    process is picked up by every worker without a restart. Engines handed
+    out earlier stay valid; old versions are only unmapped once unused.
+    """
+    def __init__(self, registry_dir, check_interval=1.0):
+        self.registry_dir = registry_dir
+        self.check_interval = check_interval
+        self._lock = threading.Lock()
+        self._version = None
+        self._engine = None
+        self._checked_at = 0.0
+
+    def _version_dir(self, version):
+        return os.path.join(self.registry_dir, VERSIONS_DIR, version)
+
+    def current_version(self):
+        """
+        Read the name of the version currently being served (None if nothing is published)
+        """
+        try:
+            with open(os.path.join(self.registry_dir, CURRENT_FILE)) as f:
+                return f.read().strip() or None
+        except FileNotFoundError:
+            return None
+
+    def versions(self):
+        """
+        List the published versions, oldest first
+        """
+        versions_dir = os.path.join(self.registry_dir, VERSIONS_DIR)
+        try:
+            names = [name for name in os.listdir(versions_dir) if not name.startswith('.')]
+        except FileNotFoundError:
+            return []
+        return sorted(names, key=lambda name: os.stat(os.path.join(versions_dir, name)).st_mtime_ns)
+
+    def publish(self, engine, version=None, activate=True):
+        """
+        Publish an engine as a new version and (by default) make it current
+
+        The models are built first if needed. The version directory is
+        written under a temporary name and renamed into place before CURRENT
+        is swapped, so readers only ever see complete versions.
+        """
+        version = version or time.strftime('%Y%m%d-%H%M%S')
+        versions_dir = os.path.join(self.registry_dir, VERSIONS_DIR)
+        os.makedirs(versions_dir, exist_ok=True)
+
+        # Versions are immutable; republishing an existing one only activates it
+        if not os.path.isdir(self._version_dir(version)):
+            engine.warm_up()
+            tmp_dir = os.path.join(versions_dir, f".{version}.{os.getpid()}.tmp")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            os.makedirs(tmp_dir)
+            save_engine_arrays(engine, tmp_dir)
+            os.replace(tmp_dir, self._version_dir(version))
+
+        if activate:
+            self.activate(version)
+        return version
+
+    def activate(self, version):
+        """
+        Atomically point CURRENT at a published version
+        """
+        if not os.path.isdir(self._version_dir(version)):
+            raise KeyError(f"Unknown engine version '{version}'")
+        current_path = os.path.join(self.registry_dir, CURRENT_FILE)
+        tmp_path = f"{current_path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, current_path)
+        self._checked_at = 0.0
+
+    def get(self):
+        """
+        Get the engine of the current version (None if nothing is published)
+        """
+        now = time.monotonic()
+        if self._engine is not None and now - self._checked_at < self.check_interval:
+            return self._engine
+
+        with self._lock:
+            version = self.current_version()
+            self._checked_at = now
+            if version is not None and version != self._version:
+                self._engine = load_engine_arrays(self._version_dir(version))
+                self._version = version
+            return self._engine
+
+    @property
+    def version(self):
+        """
+        Version of the engine returned by the last get()
+        """
+        return self._version
+
+    def prune(self, keep=2):
+        """
+        Delete all but the newest keep versions, never the current one
+
+        Processes still serving a deleted version keep their mappings until
+        they switch.
+        """
+        current = self.current_version()
+        removed = []
+        for version in self.versions()[:-keep] if keep else self.versions():
+            if version != current:
+                shutil.rmtree(self._version_dir(version), ignore_errors=True)
+                removed.append(version)
+        return removed
+
+
+if __name__ == "__main__":
+    # Build an engine from the CSV data files and publish it as the current version
+    from recommendation_engine import MovieRecommendationEngine
+    from data_generator import MOVIES_FILE, RATINGS_FILE, dataset_fingerprint
+
+    registry_dir = sys.argv[1] if len(sys.argv) > 1 else 'engine_registry'
+    registry = EngineRegistry(registry_dir)
+    engine = MovieRecommendationEngine(pd.read_csv(MOVIES_FILE), pd.read_csv(RATINGS_FILE))
+    version = registry.publish(engine, version=dataset_fingerprint())
+    print(f"Published engine version {version} to {registry_dir}")
@@ -0,0 +1,76 @@
+import numpy as np
+
+
+class MovieFilter:
+    """
+    Predicates restricting which movies a recommendation method may return.
+
+    genres keeps movies of any of the given genres, year_range is an
+    inclusive (first, last) pair where either end may be None, min_rating is
+    a minimum catalog rating and exclude lists movie ids to leave out.
+    compile() turns the filter into a boolean mask over catalog positions,
+    which the engine applies before its top-k selection.
+    """
+    def __init__(self, genres=None, year_range=None, min_rating=None, exclude=None):
+        if isinstance(genres, str):
+            genres = [genres]
+        self.genres = tuple(sorted(genres)) if genres else None
+        self.year_range = tuple(year_range) if year_range else None
+        self.min_rating = min_rating
+        self.exclude = tuple(exclude) if exclude is not None and len(exclude) else None
+
+    @classmethod
+    def coerce(cls, filters):
+        """
+        Accept a MovieFilter, a dict of its arguments or None
+        """
+        if filters is None or isinstance(filters, cls):
+            return filters
+        return cls(**filters)
+
+    @property
+    def key(self):
+        """
+        Hashable key of the cacheable part of the filter (everything but exclusions)
+        """
+        return (self.genres, self.year_range, self.min_rating)
+
+    def compile_static(self, catalog):
+        """
+        Build the mask of the genre, year and rating predicates (None if there are none)
+        """
+        mask = None
+        if self.genres is not None:
+            groups = catalog.groups('genre')
+            mask = np.zeros(len(catalog), dtype=bool)
+            for genre in self.genres:
+                mask[groups.get(genre, [])] = True
+        if self.year_range is not None:
+            years = catalog.column('year')
+            first, last = self.year_range
+            if first is not None:
+                mask = _and(mask, years >= first)
+            if last is not None:
+                mask = _and(mask, years <= last)
+        if self.min_rating is not None:
+            mask = _and(mask, catalog.column('rating') >= self.min_rating)
+        return mask
+
+    def apply_exclusions(self, catalog, mask):
+        """
+        Clear the excluded movies from a mask (None means every movie is allowed)
+        """
+        if self.exclude is None:
+            return mask
+        mask = np.ones(len(catalog), dtype=bool) if mask is None else mask.copy()
+        positions = catalog.positions_for(np.asarray(self.exclude))
+        mask[positions[positions >= 0]] = False
+        return mask
+
+    def __repr__(self):
+        return (f"MovieFilter(genres={self.genres!r}, year_range={self.year_range!r}, "
+                f"min_rating={self.min_rating!r}, exclude={self.exclude!r})")
+
+
+def _and(mask, condition):
+    return condition if mask is None else mask & condition
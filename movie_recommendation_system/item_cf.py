@@ -0,0 +1,79 @@
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+from content_model import top_k_neighbors
+
+# Added to the similarity mass of a prediction, pulling predictions backed by
+# few or weak neighbors toward the user's mean rating
+SIMILARITY_SHRINKAGE = 1.0
+
+
+class ItemCFModel:
+    """
+    Item-based collaborative filtering over precomputed sparse neighbors.
+
+    Ratings are kept as a CSR (users x catalog positions) matrix. Item-item
+    similarity is the adjusted cosine (ratings centered on each user's mean)
+    computed with blocked sparse products, keeping only the top n_neighbors
+    positive similarities per item. A user's predictions are aggregated from
+    the neighbor lists of the items they rated, so a query costs
+    O(rated items x n_neighbors) instead of a pass over the whole catalog.
+    """
+    def __init__(self, catalog, ratings_df, n_neighbors=50, n_jobs=None):
+        positions = catalog.positions_for(ratings_df['movie_id'].to_numpy())
+        known = positions >= 0
+        self.user_ids, user_rows = np.unique(ratings_df['user_id'].to_numpy()[known], return_inverse=True)
+        n_items = len(catalog)
+        self.ratings = sparse.csr_matrix(
+            (ratings_df['rating'].to_numpy(dtype=np.float64)[known], (user_rows, positions[known])),
+            shape=(len(self.user_ids), n_items)
+        )
+
+        counts = np.diff(self.ratings.indptr)
+        self.user_means = np.asarray(self.ratings.sum(axis=1)).ravel() / np.maximum(counts, 1)
+        centered = self.ratings.copy()
+        centered.data -= np.repeat(self.user_means, counts)
+
+        # One L2-normalized row of centered ratings per item, so row products are cosines
+        item_vectors = normalize(centered.T.tocsr())
+        indices, scores = top_k_neighbors(item_vectors, n_neighbors, n_jobs=n_jobs)
+        keep = scores > 0
+        rows = np.repeat(np.arange(n_items), keep.sum(axis=1))
+        self.similarity = sparse.csr_matrix((scores[keep], (rows, indices[keep])), shape=(n_items, n_items))
+
+    def _user_row(self, user_id):
+        row = np.searchsorted(self.user_ids, user_id)
+        if row < len(self.user_ids) and self.user_ids[row] == user_id:
+            return row
+        return None
+
+    def user_history(self, user_id):
+        """
+        Get (catalog positions, ratings) of the movies a user rated, or None for unknown users
+        """
+        row = self._user_row(user_id)
+        if row is None:
+            return None
+        start, stop = self.ratings.indptr[row], self.ratings.indptr[row + 1]
+        return self.ratings.indices[start:stop], self.ratings.data[start:stop]
+
+    def predict(self, user_id):
+        """
+        Get (positions, predicted ratings) of the unrated neighbors of a user's
+        rated movies, or None for unknown users
+        """
+        row = self._user_row(user_id)
+        if row is None:
+            return None
+        rated, ratings = self.user_history(user_id)
+        mean = self.user_means[row]
+
+        neighbors = self.similarity[rated].tocoo()
+        candidates, inverse = np.unique(neighbors.col, return_inverse=True)
+        numerator = np.bincount(inverse, weights=neighbors.data * (ratings - mean)[neighbors.row],
+                                minlength=len(candidates))
+        weight = np.bincount(inverse, weights=neighbors.data, minlength=len(candidates))
+
+        unrated = ~np.isin(candidates, rated)
+        predicted = mean + numerator[unrated] / (weight[unrated] + SIMILARITY_SHRINKAGE)
+        return candidates[unrated], predicted
@@ -1,6 +1,7 @@
 import pandas as pd
 import numpy as np
-from data_generator import save_sample_data
+from data_generator import save_sample_data, frames_fingerprint
+from analytics import get_aggregates
 from recommendation_engine import MovieRecommendationEngine
 import matplotlib.pyplot as plt
 import seaborn as sns
@@ -19,7 +20,8 @@ def display_menu():
     print("7. Get Genre-Based Recommendations")
     print("8. View User Profile")
     print("9. Show Data Statistics")
-    print("10. Exit")
+    print("10. Search Movies")
+    print("11. Exit")
     print("="*50)
 
 def generate_data():
@@ -46,22 +48,25 @@ def show_data_statistics(movies_df, ratings_df):
         print("❌ No data available. Please load data first.")
         return
     
+    # All statistics, computed once per version of the loaded data
+    aggregates = get_aggregates(movies_df, ratings_df, frames_fingerprint(movies_df, ratings_df))
+    
     print("\n📊 DATA STATISTICS")
     print("-" * 30)
-    print(f"Total Movies: {len(movies_df)}")
-    print(f"Total Users: {ratings_df['user_id'].nunique()}")
-    print(f"Total Ratings: {len(ratings_df)}")
-    print(f"Average Rating: {ratings_df['rating'].mean():.2f}")
+    print(f"Total Movies: {aggregates.total_movies}")
+    print(f"Total Users: {aggregates.total_users}")
+    print(f"Total Ratings: {aggregates.total_ratings}")
+    print(f"Average Rating: {aggregates.average_rating:.2f}")
     
     # Genre distribution
     print(f"\n🎭 Top 5 Genres:")
-    genre_counts = movies_df['genre'].value_counts().head(5)
+    genre_counts = aggregates.genre_counts.head(5)
     for genre, count in genre_counts.items():
         print(f"  {genre}: {count} movies")
     
     # Rating distribution
     print(f"\n⭐ Rating Distribution:")
-    rating_counts = ratings_df['rating'].value_counts().sort_index()
+    rating_counts = aggregates.rating_distribution
     for rating, count in rating_counts.items():
         print(f"  {rating} stars: {count} ratings")
     
@@ -71,21 +76,21 @@ def show_data_statistics(movies_df, ratings_df):
         
         # Genre distribution plot
         plt.subplot(1, 3, 1)
-        movies_df['genre'].value_counts().head(10).plot(kind='bar')
+        aggregates.genre_counts.head(10).plot(kind='bar')
         plt.title('Top 10 Movie Genres')
         plt.xticks(rotation=45)
         plt.ylabel('Number of Movies')
         
         # Rating distribution plot
         plt.subplot(1, 3, 2)
-        ratings_df['rating'].value_counts().sort_index().plot(kind='bar')
+        rating_counts.plot(kind='bar')
         plt.title('Rating Distribution')
         plt.xlabel('Rating')
         plt.ylabel('Number of Ratings')
         
         # Average rating by genre
         plt.subplot(1, 3, 3)
-        genre_ratings = ratings_df.merge(movies_df, on='movie_id').groupby('genre')['rating'].mean().sort_values(ascending=False)
+        genre_ratings = aggregates.genre_average_rating
         genre_ratings.head(10).plot(kind='bar')
         plt.title('Average Rating by Genre')
         plt.xticks(rotation=45)
@@ -116,11 +121,11 @@ def get_content_based_recommendations(engine):
             print("❌ Invalid movie ID!")
             return
         
-        recommendations = engine.content_based_recommendations(movie_id, 10)
+        recommendations = engine.content_based_recommendations(movie_id, 10, compact=True)
         
         print(f"\n🎬 Movies similar to '{engine.movies_df[engine.movies_df['movie_id'] == movie_id]['title'].iloc[0]}':")
         print("-" * 60)
-        for idx, row in recommendations.iterrows():
+        for row in recommendations:
             print(f"• {row['title']} ({row['genre']}) - Rating: {row['rating']}")
             
     except ValueError:
@@ -138,7 +143,7 @@ def get_collaborative_recommendations(engine):
             print("❌ User ID must be between 1 and 500!")
             return
         
-        recommendations = engine.collaborative_filtering_recommendations(user_id, 10)
+        recommendations = engine.collaborative_filtering_recommendations(user_id, 10, compact=True)
         
         if recommendations.empty:
             print("❌ No recommendations found for this user!")
@@ -146,7 +151,7 @@ def get_collaborative_recommendations(engine):
         
         print(f"\n🎬 Recommended movies for User {user_id}:")
         print("-" * 50)
-        for idx, row in recommendations.iterrows():
+        for row in recommendations:
             print(f"• {row['title']} ({row['genre']}) - Rating: {row['rating']}")
             
     except ValueError:
@@ -168,7 +173,7 @@ def get_hybrid_recommendations(engine):
         if movie_id == 0:
             movie_id = None
         
-        recommendations = engine.hybrid_recommendations(user_id, movie_id, 10)
+        recommendations = engine.hybrid_recommendations(user_id, movie_id, 10, compact=True)
         
         if recommendations.empty:
             print("❌ No recommendations found!")
@@ -176,7 +181,7 @@ def get_hybrid_recommendations(engine):
         
         print(f"\n🎬 Hybrid recommendations for User {user_id}:")
         print("-" * 50)
-        for idx, row in recommendations.iterrows():
+        for row in recommendations:
             print(f"• {row['title']} ({row['genre']}) - Rating: {row['rating']}")
             
     except ValueError:
@@ -187,11 +192,11 @@ def get_popular_movies(engine):
     print("\n🔥 POPULAR MOVIES")
     print("-" * 20)
     
-    recommendations = engine.get_popular_movies(10)
+    recommendations = engine.get_popular_movies(10, compact=True)
     
     print("🎬 Most Popular Movies:")
     print("-" * 40)
-    for idx, row in recommendations.iterrows():
+    for row in recommendations:
         print(f"• {row['title']} ({row['genre']}) - Rating: {row['rating']}")
 
 def get_genre_recommendations(engine):
@@ -213,11 +218,11 @@ def get_genre_recommendations(engine):
             return
         
         selected_genre = genres[genre_idx]
-        recommendations = engine.get_genre_recommendations(selected_genre, 10)
+        recommendations = engine.get_genre_recommendations(selected_genre, 10, compact=True)
         
         print(f"\n🎬 Top {selected_genre} Movies:")
         print("-" * 40)
-        for idx, row in recommendations.iterrows():
+        for row in recommendations:
             print(f"• {row['title']} - Rating: {row['rating']}")
             
     except ValueError:
@@ -261,6 +266,27 @@ def view_user_profile(engine):
     except ValueError:
         print("❌ Please enter a valid user ID!")
 
+def search_movies(engine):
+    """Search movies by title, director or cast"""
+    print("\n🔍 SEARCH MOVIES")
+    print("-" * 17)
+    
+    query = input("Enter title, director or cast to search for: ").strip()
+    if not query:
+        print("❌ Please enter a search term!")
+        return
+    
+    results = engine.search_movies(query, 10)
+    if results.empty:
+        print("❌ No movies found matching your search!")
+        return
+    
+    total = engine.search_index.count(query)
+    print(f"\n🎬 Best matches for '{query}' ({len(results)} of {total}):")
+    print("-" * 50)
+    for row in results:
+        print(f"• {row['movie_id']}: {row['title']} ({row['genre']}, {row['year']}) - Rating: {row['rating']}")
+
 def main():
     """Main application loop"""
     movies_df = None
@@ -271,7 +297,7 @@ def main():
         display_menu()
         
         try:
-            choice = int(input("\nEnter your choice (1-10): "))
+            choice = int(input("\nEnter your choice (1-11): "))
             
             if choice == 1:
                 movies_df, ratings_df = generate_data()
@@ -280,7 +306,7 @@ def main():
                 movies_df, ratings_df = load_data()
                 if movies_df is not None and ratings_df is not None:
                     print("Initializing recommendation engine...")
-                    engine = MovieRecommendationEngine(movies_df, ratings_df)
+                    engine = MovieRecommendationEngine(movies_df, ratings_df, background_warmup=True)
                     print("✅ Recommendation engine initialized!")
                 
             elif choice == 3:
@@ -323,11 +349,17 @@ def main():
                 show_data_statistics(movies_df, ratings_df)
                 
             elif choice == 10:
+                if engine is None:
+                    print("❌ Please initialize the recommendation engine first!")
+                else:
+                    search_movies(engine)
+                
+            elif choice == 11:
                 print("\n👋 Thank you for using the Movie Recommendation System!")
                 break
                 
             else:
-                print("❌ Invalid choice! Please enter a number between 1 and 10.")
+                print("❌ Invalid choice! Please enter a number between 1 and 11.")
                 
         except ValueError:
             print("❌ Please enter a valid number!")
@@ -0,0 +1,99 @@
+import numpy as np
+
+# Supported engine precision modes
+PRECISIONS = ('float64', 'float32', 'int8')
+
+# Rows dequantized at once when multiplying a quantized matrix
+DOT_BLOCK_ROWS = 65536
+
+
+def float_dtype(precision):
+    """
+    Floating point dtype used by a precision mode
+    """
+    if precision not in PRECISIONS:
+        raise ValueError(f"Unknown precision '{precision}', expected one of {PRECISIONS}")
+    return np.float64 if precision == 'float64' else np.float32
+
+
+class QuantizedMatrix:
+    """
+    Dense matrix stored as 8-bit codes with one float32 scale per row.
+
+    Non-negative rows are stored as uint8 (value ~= code * scale), rows of a
+    matrix with negative values as int8. Indexing with (row, columns)
+    returns dequantized float32 values, so a QuantizedMatrix can stand in for
+    a read-only float array where rows are looked up one at a time.
+    """
+    def __init__(self, codes, scales):
+        self.codes = codes
+        self.scales = scales
+
+    @classmethod
+    def quantize(cls, matrix):
+        """
+        Quantize a 2-D float matrix row by row (non-finite values become 0)
+        """
+        matrix = np.asarray(matrix, dtype=np.float32)
+        matrix = np.where(np.isfinite(matrix), matrix, 0)
+        signed = bool((matrix < 0).any())
+        levels = 127.0 if signed else 255.0
+        peak = np.abs(matrix).max(axis=1, initial=0)
+        scales = np.where(peak > 0, peak / levels, 1.0).astype(np.float32)
+        codes = np.clip(np.rint(matrix / scales[:, None]), -levels if signed else 0, levels)
+        return cls(codes.astype(np.int8 if signed else np.uint8), scales)
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    @property
+    def nbytes(self):
+        return self.codes.nbytes + self.scales.nbytes
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, key):
+        rows, columns = key if isinstance(key, tuple) else (key, slice(None))
+        scales = self.scales[rows]
+        if np.ndim(scales):
+            scales = scales[:, None]
+        return self.codes[rows, columns].astype(np.float32) * scales
+
+    def toarray(self):
+        return self.codes.astype(np.float32) * self.scales[:, None]
+
+    def gram(self):
+        """
+        Get M.T @ M of the dequantized matrix M, one block of rows at a time
+        """
+        gram = np.zeros((self.codes.shape[1],) * 2, dtype=np.float32)
+        for start in range(0, len(self.codes), DOT_BLOCK_ROWS):
+            block = self[start:start + DOT_BLOCK_ROWS]
+            gram += block.T @ block
+        return gram
+
+    def dot(self, vector):
+        """
+        Multiply by a vector, dequantizing one block of rows at a time
+        """
+        vector = np.asarray(vector, dtype=np.float32)
+        out = np.empty(len(self.codes), dtype=np.float32)
+        for start in range(0, len(self.codes), DOT_BLOCK_ROWS):
+            stop = start + DOT_BLOCK_ROWS
+            out[start:stop] = (self.codes[start:stop].astype(np.float32) @ vector) * self.scales[start:stop]
+        return out
+
+    __matmul__ = dot
+
+
+def nbytes(value):
+    """
+    Memory held by an array, sparse matrix, QuantizedMatrix or tuple of them
+    """
+    if isinstance(value, (tuple, list)):
+        return sum(nbytes(item) for item in value)
+    if hasattr(value, 'indptr'):
+        return value.data.nbytes + value.indices.nbytes + value.indptr.nbytes
+    return getattr(value, 'nbytes', 0)
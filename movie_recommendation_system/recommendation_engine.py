@@ -1,170 +1,738 @@
 import pandas as pd
 import numpy as np
-from sklearn.feature_extraction.text import TfidfVectorizer
+import os
+import pickle
+import logging
+import threading
 from sklearn.metrics.pairwise import cosine_similarity
 from sklearn.decomposition import NMF
 from scipy.sparse import csr_matrix
+from sklearn.preprocessing import normalize
+from content_model import build_content_features, top_k_neighbors
+from reranking import mmr_rerank
+from search_index import MovieSearchIndex
+from temporal import RatingsTimeIndex
+from quantization import QuantizedMatrix, float_dtype
+from item_cf import ItemCFModel
+from filters import MovieFilter
+from recommendation_result import MovieCatalog, RecommendationResult, RESULT_COLUMNS
 import warnings
 warnings.filterwarnings('ignore')
 
+logger = logging.getLogger(__name__)
+
+class _LazyModel:
+    """
+    Engine attribute that is built by the named builder method on first access
+    """
+    def __init__(self, builder):
+        self.builder = builder
+    
+    def __set_name__(self, owner, name):
+        self.name = name
+    
+    def __get__(self, engine, owner=None):
+        if engine is None:
+            return self
+        return engine._get_model(self.name, self.builder)
+    
+    def __set__(self, engine, value):
+        engine._models[self.name] = value
+
 class MovieRecommendationEngine:
-    def __init__(self, movies_df, ratings_df):
+    # Models built by warm_up(), in dependency order, followed by the models
+    # of the configured collaborative filtering algorithm. The full
+    # cosine_sim matrix is only built if something asks for it explicitly.
+    MODEL_NAMES = ['rating_stats', 'ratings_time_index', 'search_index', 'content_features',
+                   'content_neighbors']
+    CF_MODEL_NAMES = {
+        'nmf': ['user_movie_matrix', 'cf_training_matrix', 'item_factors'],
+        'item': ['item_cf'],
+    }
+    
+    # Candidates ranked per requested item when diversity re-ranking is on
+    CANDIDATE_FACTOR = 5
+    
+    # Compiled filter masks kept per engine
+    FILTER_CACHE_SIZE = 128
+    
+    rating_stats = _LazyModel('_build_rating_stats')
+    ratings_time_index = _LazyModel('_build_ratings_time_index')
+    search_index = _LazyModel('_build_search_index')
+    user_movie_matrix = _LazyModel('_build_user_movie_matrix')
+    cf_training_matrix = _LazyModel('_build_cf_training_matrix')
+    content_features = _LazyModel('_build_content_features')
+    content_neighbors = _LazyModel('_build_content_neighbors')
+    cosine_sim = _LazyModel('_build_cosine_sim')
+    nmf_model = _LazyModel('_train_nmf')
+    item_factors = _LazyModel('_build_item_factors')
+    factor_gram = _LazyModel('_build_factor_gram')
+    item_cf = _LazyModel('_build_item_cf')
+    
+    def __init__(self, movies_df, ratings_df, lazy=True, background_warmup=False,
+                 n_jobs=None, n_neighbors=50, rerank_budget_ms=None, cf_decay_half_life=None,
+                 cold_start_threshold=5, precision='float64', cf_algorithm='nmf'):
         """
         Initialize the recommendation engine with movie and rating data
+        
+        With lazy=True (default) every model is built on first use. Set
+        background_warmup=True to start building them in a background thread
+        right away, or lazy=False to build everything before returning.
+        n_jobs is the number of processes used for the content model build
+        (None for all cores) and n_neighbors the number of precomputed
+        similar movies kept per movie.
+        
+        Every recommendation method takes an optional diversity in [0, 1]
+        that re-ranks its candidates with maximal marginal relevance;
+        rerank_budget_ms caps the time spent in that stage.
+        
+        With cf_decay_half_life (in days) collaborative filtering is trained
+        on ratings weighted by their age, so recent tastes count more.
+        
+        hybrid_recommendations serves users with fewer than
+        cold_start_threshold ratings from their rated movies' content
+        features instead of the NMF model.
+        
+        precision sets the storage of the content features, neighbor scores
+        and NMF factors: 'float64', 'float32', or 'int8' (float32 features
+        with neighbor scores and item factors quantized to 8 bits per value
+        and one scale per row).
+        
+        cf_algorithm selects collaborative filtering: 'nmf' (matrix
+        factorization) or 'item' (item-item adjusted cosine over precomputed
+        sparse neighbors).
+        
+        Every recommendation method also takes filters, a MovieFilter or a
+        dict of its arguments (genres, year_range, min_rating, exclude),
+        applied before the top-k selection.
         """
         self.movies_df = movies_df
         self.ratings_df = ratings_df
-        self.user_movie_matrix = None
-        self.tfidf_matrix = None
-        self.cosine_sim = None
-        self.nmf_model = None
-        self._prepare_data()
+        self.catalog = MovieCatalog(movies_df)
+        self.n_jobs = n_jobs
+        self.n_neighbors = n_neighbors
+        self.rerank_budget_ms = rerank_budget_ms
+        self.cf_decay_half_life = cf_decay_half_life
+        self.cold_start_threshold = cold_start_threshold
+        self.precision = precision
+        self.dtype = float_dtype(precision)
+        if cf_algorithm not in self.CF_MODEL_NAMES:
+            raise ValueError(f"Unknown cf_algorithm '{cf_algorithm}'")
+        self.cf_algorithm = cf_algorithm
+        self._models = {}
+        self._model_locks = {}
+        self._filter_masks = {}
+        self._warmup_thread = None
+        self._warmup_error = None
+        
+        if not lazy:
+            self._prepare_data()
+        elif background_warmup:
+            self.warm_up(background=True)
+    
+    def _get_model(self, name, builder):
+        """
+        Return a model, building it exactly once even with concurrent callers
+
+        If a background warm-up failed, its error is raised by the first call
+        needing a model that is still unbuilt; later calls retry the build.
+        """
+        models = self._models
+        if name in models:
+            return models[name]
+        error, self._warmup_error = self._warmup_error, None
+        if error is not None:
+            raise error
+        with self._model_locks.setdefault(name, threading.Lock()):
+            if name not in models:
+                models[name] = getattr(self, builder)()
+            return models[name]
+    
+    @property
+    def model_names(self):
+        """
+        Names of the models warm_up() builds for this engine's configuration
+        """
+        return self.MODEL_NAMES + self.CF_MODEL_NAMES[self.cf_algorithm]
+    
+    def is_ready(self, name=None):
+        """
+        Check whether a model (or every model when name is None) is built
+        """
+        if name is None:
+            return all(model in self._models for model in self.model_names)
+        return name in self._models
+    
+    def warm_up(self, background=False, models=None, save_path=None):
+        """
+        Build models ahead of time, optionally in a background thread
+        
+        With save_path the engine is saved there once every model is built.
+        """
+        models = list(models or self.model_names)
+        
+        def build():
+            try:
+                for name in models:
+                    getattr(self, name)
+                if save_path:
+                    self.save(save_path)
+            except Exception as e:
+                # Leave the model unbuilt; the next access needing a model raises e
+                logger.exception("Background warm-up of the recommendation engine failed")
+                self._warmup_error = e
+        
+        if not background:
+            for name in models:
+                getattr(self, name)
+            if save_path:
+                self.save(save_path)
+            return None
+        
+        self._warmup_thread = threading.Thread(target=build, name='engine-warmup', daemon=True)
+        self._warmup_thread.start()
+        return self._warmup_thread
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state['_models'] = dict(self._models)
+        state['_model_locks'] = {}
+        state['_filter_masks'] = {}
+        state['_warmup_thread'] = None
+        state['_warmup_error'] = None
+        return state
+    
+    def save(self, path):
+        """
+        Save the engine with every model built so far to a file
+        
+        The file is written next to its destination and renamed into place,
+        so readers never see a partial artifact.
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    
+    @classmethod
+    def load(cls, path):
+        """
+        Load an engine saved with save(); its saved models are ready immediately
+        """
+        with open(path, 'rb') as f:
+            engine = pickle.load(f)
+        if not isinstance(engine, cls):
+            raise TypeError(f"{path} does not contain a {cls.__name__}")
+        return engine
     
     def _prepare_data(self):
         """
-        Prepare data for different recommendation algorithms
+        Prepare data for all recommendation algorithms up front
+        """
+        self.warm_up()
+    
+    def _build_rating_stats(self):
+        """
+        Count and sum ratings per catalog position
+        """
+        rating_positions = self.catalog.positions_for(self.ratings_df['movie_id'].to_numpy())
+        known = rating_positions >= 0
+        rating_count = np.bincount(rating_positions[known], minlength=len(self.catalog))
+        rating_sum = np.bincount(
+            rating_positions[known],
+            weights=self.ratings_df['rating'].to_numpy()[known],
+            minlength=len(self.catalog)
+        )
+        return rating_count, rating_sum
+    
+    def _build_ratings_time_index(self):
+        """
+        Bucket rating counts and sums per day and movie
+        """
+        return RatingsTimeIndex(self.catalog, self.ratings_df)
+    
+    def _build_search_index(self):
+        """
+        Build the trigram search index over titles, directors and cast
+        """
+        return MovieSearchIndex(self.movies_df, fields=('title', 'director', 'cast'))
+    
+    def _build_user_movie_matrix(self):
+        """
+        Create user-movie rating matrix
         """
-        # Create user-movie rating matrix
-        self.user_movie_matrix = self.ratings_df.pivot(
+        return self.ratings_df.pivot(
             index='user_id', 
             columns='movie_id', 
             values='rating'
         ).fillna(0)
-        
-        # Prepare content-based features
-        self.movies_df['features'] = (
-            self.movies_df['genre'] + ' ' + 
-            self.movies_df['director'] + ' ' + 
-            self.movies_df['cast'] + ' ' + 
-            self.movies_df['description']
-        )
-        
-        # Create TF-IDF matrix for content-based filtering
-        tfidf = TfidfVectorizer(stop_words='english', max_features=5000)
-        self.tfidf_matrix = tfidf.fit_transform(self.movies_df['features'])
-        self.cosine_sim = cosine_similarity(self.tfidf_matrix, self.tfidf_matrix)
-        
-        # Train NMF model for collaborative filtering
-        self._train_nmf()
+    
+    def _build_cf_training_matrix(self):
+        """
+        User-movie matrix used to train and query the NMF model, with ratings
+        decayed by age when cf_decay_half_life is set
+        """
+        if not self.cf_decay_half_life:
+            return self.user_movie_matrix
+        weights = self.ratings_time_index.rating_weights(self.ratings_df, self.cf_decay_half_life)
+        return self.ratings_df.assign(rating=self.ratings_df['rating'] * weights).pivot(
+            index='user_id',
+            columns='movie_id',
+            values='rating'
+        ).fillna(0)
+    
+    @property
+    def content_matrix(self):
+        """
+        Row-normalized content feature matrix (one row per catalog position)
+        """
+        return self.content_features.matrix
+    
+    # Kept for callers of the former free-text TF-IDF model
+    tfidf_matrix = content_matrix
+    
+    def _build_content_features(self):
+        """
+        Encode genre, director, cast and description for content-based filtering
+        """
+        features = build_content_features(self.movies_df, n_jobs=self.n_jobs)
+        features.matrix = features.matrix.astype(self.dtype, copy=False)
+        return features
+    
+    def _build_content_neighbors(self):
+        """
+        Precompute the most similar movies of every movie, block by block
+        """
+        indices, scores = top_k_neighbors(self.content_matrix, self.n_neighbors, n_jobs=self.n_jobs)
+        if self.precision == 'int8':
+            return indices, QuantizedMatrix.quantize(scores)
+        return indices, scores.astype(self.dtype, copy=False)
+    
+    def _build_cosine_sim(self):
+        """
+        Compute the full movie-movie cosine similarity matrix
+        """
+        return cosine_similarity(self.content_matrix, dense_output=True)
     
     def _train_nmf(self, n_components=50):
         """
         Train Non-negative Matrix Factorization model
         """
-        self.nmf_model = NMF(n_components=n_components, random_state=42)
-        self.nmf_model.fit(self.user_movie_matrix)
+        training_matrix = self.cf_training_matrix
+        if self.dtype != np.float64:
+            training_matrix = training_matrix.astype(self.dtype)
+        nmf_model = NMF(n_components=n_components, random_state=42)
+        nmf_model.fit(training_matrix)
+        return nmf_model
+    
+    def _build_item_factors(self):
+        """
+        Get the NMF item factors (one row per user_movie_matrix column)
+        
+        In int8 mode the factors are quantized and the float NMF model is
+        released; user factors are then inferred from the quantized factors.
+        """
+        factors = self.nmf_model.components_.T
+        if self.precision != 'int8':
+            return factors
+        quantized = QuantizedMatrix.quantize(factors)
+        self._models.pop('nmf_model', None)
+        return quantized
+    
+    def _build_factor_gram(self):
+        """
+        Gram matrix (factors x factors) of the quantized item factors
+        """
+        return self.item_factors.gram()
+    
+    def _user_factors(self, training_ratings, n_iter=200):
+        """
+        Infer the NMF factors of one user's (training) rating vector
+        """
+        if self.precision != 'int8':
+            return self.nmf_model.transform(training_ratings.reshape(1, -1).astype(self.dtype))[0]
+        
+        # Multiplicative updates with the item factors fixed; only the rated
+        # items' factors are needed besides the precomputed gram matrix
+        gram = self.factor_gram
+        rated = np.flatnonzero(training_ratings)
+        numerator = training_ratings[rated].astype(np.float32) @ self.item_factors[rated]
+        user_factors = np.full(len(gram), np.sqrt(training_ratings.mean() / len(gram)), dtype=np.float32)
+        for _ in range(n_iter):
+            user_factors *= numerator / np.maximum(user_factors @ gram, 1e-12)
+        return user_factors
+    
+    def _build_item_cf(self):
+        """
+        Build the item-item CF model with the top n_neighbors similar items per movie
+        """
+        return ItemCFModel(self.catalog, self.ratings_df, n_neighbors=self.n_neighbors,
+                           n_jobs=self.n_jobs)
     
-    def content_based_recommendations(self, movie_id, n_recommendations=10):
+    def _filter_mask(self, filters):
+        """
+        Compile filters to a boolean mask over catalog positions (None when
+        nothing is filtered); genre, year and rating masks are cached
+        """
+        filters = MovieFilter.coerce(filters)
+        if filters is None:
+            return None
+        mask = self._filter_masks.get(filters.key, False)
+        if mask is False:
+            if len(self._filter_masks) >= self.FILTER_CACHE_SIZE:
+                self._filter_masks.clear()
+            mask = self._filter_masks[filters.key] = filters.compile_static(self.catalog)
+        return filters.apply_exclusions(self.catalog, mask)
+    
+    def _top_k(self, scores, n, mask=None):
+        """
+        Get indices of the n highest scores in descending order, among the
+        indices allowed by mask when one is given
+        """
+        if mask is not None:
+            allowed = np.flatnonzero(mask)
+            return allowed[self._top_k(scores[allowed], n)]
+        n = min(n, len(scores))
+        if n <= 0:
+            return np.empty(0, dtype=np.int64)
+        if n < len(scores):
+            candidates = np.argpartition(-scores, n - 1)[:n]
+        else:
+            candidates = np.arange(len(scores))
+        return candidates[np.argsort(-scores[candidates], kind='stable')]
+    
+    def _candidate_count(self, n_recommendations, diversity):
+        """
+        Number of candidates to rank before the optional diversity re-rank
+        """
+        if not diversity:
+            return n_recommendations
+        return n_recommendations * self.CANDIDATE_FACTOR
+    
+    def _make_response(self, positions, scores, compact, n_recommendations=None, diversity=None):
+        """
+        Re-rank ranked candidates if asked to, cut them to n_recommendations and
+        package them as a compact result or a DataFrame
+        """
+        if n_recommendations is not None:
+            if diversity:
+                positions, scores = mmr_rerank(
+                    positions, scores, self.content_matrix, n_recommendations,
+                    diversity=diversity, time_budget_ms=self.rerank_budget_ms
+                )
+            else:
+                positions, scores = positions[:n_recommendations], scores[:n_recommendations]
+        
+        if compact:
+            return RecommendationResult(self.catalog, positions, scores)
+        return self.movies_df.iloc[positions][RESULT_COLUMNS]
+    
+    def content_based_recommendations(self, movie_id, n_recommendations=10, compact=False,
+                                      diversity=None, filters=None):
         """
         Get content-based recommendations based on movie similarity
         """
-        # Find movie index
-        movie_idx = self.movies_df[self.movies_df['movie_id'] == movie_id].index[0]
+        # Find movie position
+        movie_idx = self.catalog.position_of(movie_id)
+        if movie_idx < 0:
+            raise KeyError(f"Unknown movie_id {movie_id}")
+        n_candidates = self._candidate_count(n_recommendations, diversity)
+        mask = self._filter_mask(filters)
         
-        # Get similarity scores
-        sim_scores = list(enumerate(self.cosine_sim[movie_idx]))
-        sim_scores = sorted(sim_scores, key=lambda x: x[1], reverse=True)
+        # Use the precomputed neighbor lists when enough of them pass the filters
+        neighbor_indices, neighbor_scores = self.content_neighbors
+        if n_candidates <= neighbor_indices.shape[1]:
+            indices = neighbor_indices[movie_idx]
+            keep = np.arange(len(indices)) if mask is None else np.flatnonzero(mask[indices])
+            if len(keep) >= n_candidates:
+                keep = keep[:n_candidates]
+                return self._make_response(
+                    indices[keep],
+                    neighbor_scores[movie_idx, :][keep],
+                    compact, n_recommendations, diversity
+                )
         
-        # Get top similar movies (excluding the movie itself)
-        sim_scores = sim_scores[1:n_recommendations+1]
-        movie_indices = [i[0] for i in sim_scores]
+        # Otherwise score every movie against this one, excluding the movie itself
+        content_matrix = self.content_matrix
+        sim_scores = (content_matrix @ content_matrix[movie_idx].T).toarray().ravel()
+        sim_scores[movie_idx] = -np.inf
         
-        return self.movies_df.iloc[movie_indices][['movie_id', 'title', 'genre', 'rating']]
+        # Get top similar movies
+        if mask is not None:
+            mask = mask.copy()
+            mask[movie_idx] = False
+        movie_indices = self._top_k(sim_scores, n_candidates, mask)
+        
+        return self._make_response(movie_indices, sim_scores[movie_indices], compact,
+                                   n_recommendations, diversity)
     
-    def collaborative_filtering_recommendations(self, user_id, n_recommendations=10):
+    def collaborative_filtering_recommendations(self, user_id, n_recommendations=10, compact=False,
+                                                diversity=None, algorithm=None, filters=None):
         """
-        Get collaborative filtering recommendations using NMF
+        Get collaborative filtering recommendations using NMF, or item-item
+        similarity with algorithm='item' (defaults to the engine's cf_algorithm)
         """
+        algorithm = algorithm or self.cf_algorithm
+        if algorithm == 'item':
+            return self._item_cf_recommendations(user_id, n_recommendations, compact, diversity,
+                                                 filters)
+        if algorithm != 'nmf':
+            raise ValueError(f"Unknown cf algorithm '{algorithm}'")
+        
         if user_id not in self.user_movie_matrix.index:
+            if compact:
+                return RecommendationResult.empty_result(self.catalog)
             return pd.DataFrame()
         
         # Get user's rating vector
         user_ratings = self.user_movie_matrix.loc[user_id].values.reshape(1, -1)
         
         # Transform user ratings using NMF
-        user_factors = self.nmf_model.transform(user_ratings)
+        training_ratings = self.cf_training_matrix.loc[user_id].to_numpy()
+        user_factors = self._user_factors(training_ratings)
         
         # Reconstruct ratings
-        predicted_ratings = np.dot(user_factors, self.nmf_model.components_)
+        predicted_ratings = self.item_factors @ user_factors
         
         # Get movies user hasn't rated
-        user_rated = self.user_movie_matrix.loc[user_id] > 0
-        unrated_movies = ~user_rated
+        unrated_movies = user_ratings[0] <= 0
+        mask = self._filter_mask(filters)
+        if mask is not None:
+            column_positions = self.catalog.positions_for(self.user_movie_matrix.columns.to_numpy())
+            unrated_movies &= (column_positions >= 0) & mask[column_positions]
         
         # Get top recommendations
-        unrated_ratings = predicted_ratings[0][unrated_movies]
-        top_indices = np.argsort(unrated_ratings)[::-1][:n_recommendations]
+        unrated_ratings = predicted_ratings[unrated_movies]
+        top_indices = self._top_k(unrated_ratings, self._candidate_count(n_recommendations, diversity))
         
-        # Get movie IDs for unrated movies
-        unrated_movie_ids = self.user_movie_matrix.columns[unrated_movies]
-        recommended_movie_ids = unrated_movie_ids[top_indices]
+        # Map matrix columns of the unrated movies to catalog positions
+        unrated_movie_ids = self.user_movie_matrix.columns.to_numpy()[unrated_movies]
+        positions = self.catalog.positions_for(unrated_movie_ids[top_indices])
         
-        return self.movies_df[self.movies_df['movie_id'].isin(recommended_movie_ids)][
-            ['movie_id', 'title', 'genre', 'rating']
-        ]
+        return self._make_response(positions, unrated_ratings[top_indices], compact,
+                                   n_recommendations, diversity)
     
-    def hybrid_recommendations(self, user_id, movie_id=None, n_recommendations=10):
+    def _item_cf_recommendations(self, user_id, n_recommendations, compact, diversity, filters=None):
+        """
+        Rank the unrated neighbors of a user's rated movies by predicted rating
+        """
+        prediction = self.item_cf.predict(user_id)
+        if prediction is None:
+            if compact:
+                return RecommendationResult.empty_result(self.catalog)
+            return pd.DataFrame()
+        
+        positions, predicted_ratings = prediction
+        mask = self._filter_mask(filters)
+        if mask is not None:
+            allowed = mask[positions]
+            positions, predicted_ratings = positions[allowed], predicted_ratings[allowed]
+        top_indices = self._top_k(predicted_ratings, self._candidate_count(n_recommendations, diversity))
+        return self._make_response(positions[top_indices], predicted_ratings[top_indices], compact,
+                                   n_recommendations, diversity)
+    
+    def _user_history(self, user_id):
+        """
+        Get (catalog positions, ratings) of the movies a user rated
+        """
+        if self.cf_algorithm == 'item':
+            history = self.item_cf.user_history(user_id)
+            if history is None:
+                return np.empty(0, dtype=np.int64), np.empty(0)
+            return history
+        
+        user_movie_matrix = self.user_movie_matrix
+        if user_id not in user_movie_matrix.index:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        user_ratings = user_movie_matrix.loc[user_id].to_numpy()
+        rated = np.flatnonzero(user_ratings > 0)
+        positions = self.catalog.positions_for(user_movie_matrix.columns.to_numpy()[rated])
+        known = positions >= 0
+        return positions[known], user_ratings[rated][known]
+    
+    def cold_start_recommendations(self, rated_movie_ids=None, ratings=None, genres=None,
+                                   n_recommendations=10, compact=False, diversity=None, filters=None):
+        """
+        Get recommendations for a user with few or no ratings
+        
+        The user's taste vector is the rating-weighted sum of the content
+        features of the movies they rated plus the columns of the chosen
+        genres; every movie is then scored with one sparse-dense product.
+        Without any rated movie or genre the popular movies are returned.
+        """
+        if rated_movie_ids is None:
+            rated_movie_ids = []
+        positions = self.catalog.positions_for(np.asarray(rated_movie_ids, dtype=np.int64))
+        weights = np.ones(len(positions)) if ratings is None else np.asarray(ratings, dtype=np.float64)
+        known = positions >= 0
+        return self._cold_start_response(positions[known], weights[known], genres,
+                                         n_recommendations, compact, diversity, filters)
+    
+    def _cold_start_response(self, positions, weights, genres, n_recommendations, compact, diversity,
+                             filters=None):
+        """
+        Rank movies against a taste vector built from rated positions and genres
+        """
+        features = self.content_features
+        taste = np.zeros(features.matrix.shape[1])
+        if len(positions):
+            taste += normalize((features.matrix[positions].T @ weights).reshape(1, -1)).ravel()
+        if genres:
+            genre_columns = np.flatnonzero(np.isin(features.labels['genre'], list(genres)))
+            if len(genre_columns):
+                taste[features.blocks['genre'].start + genre_columns] += 1.0 / np.sqrt(len(genre_columns))
+        if not taste.any():
+            return self.get_popular_movies(n_recommendations, compact=compact, diversity=diversity,
+                                           filters=filters)
+        
+        # Score every movie, excluding the ones already rated
+        scores = features.matrix @ taste
+        scores[positions] = -np.inf
+        mask = self._filter_mask(filters)
+        if mask is not None:
+            mask = mask.copy()
+            mask[positions] = False
+        top_positions = self._top_k(scores, self._candidate_count(n_recommendations, diversity), mask)
+        return self._make_response(top_positions, scores[top_positions], compact,
+                                   n_recommendations, diversity)
+    
+    def hybrid_recommendations(self, user_id, movie_id=None, n_recommendations=10, compact=False,
+                               diversity=None, filters=None):
         """
         Get hybrid recommendations combining content-based and collaborative filtering
+        
+        Users with fewer than cold_start_threshold ratings are served by the
+        cold-start path, with movie_id counted as a liked movie.
         """
+        positions, ratings = self._user_history(user_id)
+        if len(positions) < self.cold_start_threshold:
+            if movie_id is not None:
+                movie_idx = self.catalog.position_of(movie_id)
+                if movie_idx >= 0 and movie_idx not in positions:
+                    positions = np.append(positions, movie_idx)
+                    ratings = np.append(ratings, ratings.max() if len(ratings) else 1.0)
+            return self._cold_start_response(positions, ratings, None, n_recommendations,
+                                             compact, diversity, filters)
+        
+        n_candidates = self._candidate_count(n_recommendations, diversity)
+        
         # Get collaborative filtering recommendations
-        cf_recommendations = self.collaborative_filtering_recommendations(user_id, n_recommendations)
+        cf_recommendations = self.collaborative_filtering_recommendations(
+            user_id, n_candidates, compact=True, filters=filters
+        )
         
         if movie_id and not cf_recommendations.empty:
             # Get content-based recommendations
-            cb_recommendations = self.content_based_recommendations(movie_id, n_recommendations)
+            cb_recommendations = self.content_based_recommendations(
+                movie_id, n_candidates, compact=True, filters=filters
+            )
             
-            # Combine recommendations (simple average of scores)
-            combined = pd.concat([cf_recommendations, cb_recommendations])
-            combined = combined.drop_duplicates(subset=['movie_id'])
+            # Combine recommendations, keeping the first occurrence of each movie
+            combined = np.concatenate([cf_recommendations.positions, cb_recommendations.positions])
+            _, first = np.unique(combined, return_index=True)
+            combined = combined[np.sort(first)]
             
             # Sort by rating (you could implement more sophisticated ranking)
-            combined = combined.sort_values('rating', ascending=False)
+            ratings = self.catalog.column('rating')[combined].astype(np.float64)
+            order = np.argsort(-ratings, kind='stable')
             
-            return combined.head(n_recommendations)
+            return self._make_response(combined[order], ratings[order], compact,
+                                       n_recommendations, diversity)
         
-        return cf_recommendations
+        if cf_recommendations.empty and not compact:
+            return pd.DataFrame()
+        return self._make_response(cf_recommendations.positions, cf_recommendations.scores, compact,
+                                   n_recommendations, diversity)
     
-    def get_popular_movies(self, n_recommendations=10):
+    def _rank_popular(self, rating_count, rating_sum, n_recommendations, compact, diversity,
+                      filters=None):
         """
-        Get most popular movies based on average rating and number of ratings
+        Rank movies by average rating among those with enough ratings
+        
+        The minimum is the 0.6 quantile of the rating counts of the rated
+        movies passing the filters, lowered when fewer movies than requested
+        reach it.
         """
-        # Calculate average rating and count for each movie
-        movie_stats = self.ratings_df.groupby('movie_id').agg({
-            'rating': ['mean', 'count']
-        }).reset_index()
-        movie_stats.columns = ['movie_id', 'avg_rating', 'rating_count']
+        rated = rating_count > 0
+        mask = self._filter_mask(filters)
+        if mask is not None:
+            rated &= mask
+        if not rated.any():
+            return self._make_response(np.empty(0, dtype=np.int64), np.empty(0), compact)
         
         # Filter movies with minimum number of ratings
-        min_ratings = movie_stats['rating_count'].quantile(0.6)
-        qualified_movies = movie_stats[movie_stats['rating_count'] >= min_ratings]
+        n_candidates = self._candidate_count(n_recommendations, diversity)
+        counts = rating_count[rated]
+        min_ratings = np.quantile(counts, 0.6)
+        if n_candidates < len(counts):
+            # Let at least n_candidates movies qualify: at most the n_candidates-th highest count
+            min_ratings = min(min_ratings, np.partition(counts, -n_candidates)[-n_candidates])
+        else:
+            min_ratings = counts.min()
+        qualified = np.flatnonzero(rated & (rating_count >= min_ratings))
+        avg_rating = rating_sum[qualified] / rating_count[qualified]
         
         # Sort by average rating
-        qualified_movies = qualified_movies.sort_values('avg_rating', ascending=False)
+        order = self._top_k(avg_rating, n_candidates)
         
-        # Get movie details
-        top_movies = qualified_movies.head(n_recommendations)
-        return self.movies_df[self.movies_df['movie_id'].isin(top_movies['movie_id'])][
-            ['movie_id', 'title', 'genre', 'rating']
-        ]
+        return self._make_response(qualified[order], avg_rating[order], compact,
+                                   n_recommendations, diversity)
+    
+    def get_popular_movies(self, n_recommendations=10, compact=False, diversity=None,
+                           half_life_days=None, filters=None):
+        """
+        Get most popular movies based on average rating and number of ratings
+        
+        With half_life_days every rating is weighted by 0.5 ** (age / half_life_days),
+        so recently rated movies rank higher.
+        """
+        # Average rating and count for each movie
+        if half_life_days:
+            rating_count, rating_sum = self.ratings_time_index.decayed(half_life_days)
+        else:
+            rating_count, rating_sum = self.rating_stats
+        return self._rank_popular(rating_count, rating_sum, n_recommendations, compact, diversity,
+                                  filters)
     
-    def get_genre_recommendations(self, genre, n_recommendations=10):
+    def get_trending_movies(self, days=30, n_recommendations=10, compact=False, diversity=None,
+                            filters=None):
+        """
+        Get the most popular movies among ratings from the last days days
+        """
+        rating_count, rating_sum = self.ratings_time_index.window(days)
+        return self._rank_popular(rating_count, rating_sum, n_recommendations, compact, diversity,
+                                  filters)
+    
+    def get_genre_recommendations(self, genre, n_recommendations=10, compact=False, diversity=None,
+                                  filters=None):
         """
         Get movie recommendations based on genre
         """
-        genre_movies = self.movies_df[self.movies_df['genre'] == genre]
-        return genre_movies.sort_values('rating', ascending=False).head(n_recommendations)[
-            ['movie_id', 'title', 'genre', 'rating']
-        ]
+        genre_positions = self.catalog.groups('genre').get(genre, np.empty(0, dtype=np.int64))
+        mask = self._filter_mask(filters)
+        if mask is not None:
+            genre_positions = genre_positions[mask[genre_positions]]
+        ratings = self.catalog.column('rating')[genre_positions].astype(np.float64)
+        order = self._top_k(ratings, self._candidate_count(n_recommendations, diversity))
+        return self._make_response(genre_positions[order], ratings[order], compact,
+                                   n_recommendations, diversity)
+    
+    def search_movies(self, query, limit=20, offset=0):
+        """
+        Search movies by title, director or cast; returns one ranked page
+        """
+        return self.search_index.search(query, limit=limit, offset=offset)
     
     def get_user_profile(self, user_id):
         """
         Get user's movie preferences and rating history
         """
-        if user_id not in self.user_movie_matrix.index:
+        user_ratings = self.ratings_df[self.ratings_df['user_id'] == user_id]
+        if user_ratings.empty:
             return None
         
-        user_ratings = self.ratings_df[self.ratings_df['user_id'] == user_id]
         user_movies = user_ratings.merge(self.movies_df, on='movie_id', suffixes=('_user', '_movie'))
         
         # Get favorite genres (use user rating, not movie rating)
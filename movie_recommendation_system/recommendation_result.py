@@ -0,0 +1,172 @@
+import numpy as np
+import pandas as pd
+
+# Columns returned by the DataFrame-based recommendation methods
+RESULT_COLUMNS = ['movie_id', 'title', 'genre', 'rating']
+
+
+class MovieCatalog:
+    """
+    Columnar, read-only copy of the movie metadata.
+
+    Every column is stored once as a NumPy array and rows are addressed by
+    catalog position (the row number in the movies DataFrame), so result
+    objects only need to carry integer positions.
+    """
+    def __init__(self, movies_df):
+        self.columns = {name: movies_df[name].to_numpy() for name in movies_df.columns}
+        self.movie_ids = self.columns['movie_id']
+        self._groups = {}
+        self._build_id_lookup()
+
+    def __len__(self):
+        return len(self.movie_ids)
+
+    def _build_id_lookup(self):
+        """
+        Build the movie_id -> position lookup (dense array for compact integer ids)
+        """
+        ids = self.movie_ids
+        self._dense_lookup = None
+        self._sorted_ids = None
+        self._sorted_positions = None
+
+        if len(ids) and np.issubdtype(ids.dtype, np.integer) and ids.min() >= 0 \
+                and ids.max() < 4 * len(ids) + 1024:
+            self._dense_lookup = np.full(int(ids.max()) + 1, -1, dtype=np.int64)
+            self._dense_lookup[ids] = np.arange(len(ids))
+        else:
+            order = np.argsort(ids, kind='stable')
+            self._sorted_ids = ids[order]
+            self._sorted_positions = order
+
+    def column(self, name):
+        """
+        Get a metadata column as an array indexed by catalog position
+        """
+        try:
+            return self.columns[name]
+        except KeyError:
+            raise AttributeError(f"Unknown movie attribute '{name}'") from None
+
+    def groups(self, name):
+        """
+        Get the positions of the movies sharing each value of a column (cached)
+        """
+        groups = self._groups.get(name)
+        if groups is None:
+            codes, values = pd.factorize(self.column(name))
+            order = np.argsort(codes, kind='stable')
+            bounds = np.searchsorted(codes[order], np.arange(len(values) + 1))
+            groups = {value: order[bounds[i]:bounds[i + 1]] for i, value in enumerate(values)}
+            self._groups[name] = groups
+        return groups
+
+    def positions_for(self, movie_ids):
+        """
+        Map movie ids to catalog positions (-1 for unknown ids)
+        """
+        movie_ids = np.asarray(movie_ids)
+        if self._dense_lookup is not None:
+            positions = np.full(movie_ids.shape, -1, dtype=np.int64)
+            if not np.issubdtype(movie_ids.dtype, np.integer):
+                return positions
+            valid = (movie_ids >= 0) & (movie_ids < len(self._dense_lookup))
+            positions[valid] = self._dense_lookup[movie_ids[valid]]
+            return positions
+
+        idx = np.searchsorted(self._sorted_ids, movie_ids)
+        idx = np.clip(idx, 0, max(len(self._sorted_ids) - 1, 0))
+        found = self._sorted_ids[idx] == movie_ids if len(self._sorted_ids) else np.zeros(movie_ids.shape, bool)
+        return np.where(found, self._sorted_positions[idx], -1)
+
+    def position_of(self, movie_id):
+        """
+        Get the catalog position of a single movie id (-1 if unknown)
+        """
+        return int(self.positions_for(np.array([movie_id]))[0])
+
+
+class RecommendedMovie:
+    """
+    One entry of a RecommendationResult, resolved lazily from the catalog
+    """
+    __slots__ = ('_result', 'rank')
+
+    def __init__(self, result, rank):
+        self._result = result
+        self.rank = rank
+
+    @property
+    def score(self):
+        return self._result.scores[self.rank]
+
+    def __getattr__(self, name):
+        return getattr(self._result, name)[self.rank]
+
+    def __getitem__(self, name):
+        return getattr(self, name)
+
+    def __repr__(self):
+        return f"RecommendedMovie(movie_id={self.movie_id!r}, title={self.title!r}, score={self.score:.4f})"
+
+
+class RecommendationResult:
+    """
+    Compact, ranked recommendation response.
+
+    Holds parallel arrays of catalog positions, movie ids and scores in rank
+    order. Any other movie attribute (``title``, ``genre``, ``year``...) is
+    looked up from the catalog on first access and cached on the result.
+    """
+    __slots__ = ('positions', 'movie_ids', 'scores', '_catalog', '_columns')
+
+    def __init__(self, catalog, positions, scores):
+        self._catalog = catalog
+        self.positions = np.asarray(positions, dtype=np.int64)
+        self.scores = np.asarray(scores, dtype=np.float64)
+        self.movie_ids = catalog.movie_ids[self.positions]
+        self._columns = {}
+
+    @classmethod
+    def empty_result(cls, catalog):
+        return cls(catalog, np.empty(0, dtype=np.int64), np.empty(0))
+
+    @property
+    def empty(self):
+        return len(self.positions) == 0
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __iter__(self):
+        for rank in range(len(self.positions)):
+            yield RecommendedMovie(self, rank)
+
+    def __getitem__(self, rank):
+        return RecommendedMovie(self, range(len(self.positions))[rank])
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        columns = self._columns
+        if name not in columns:
+            columns[name] = self._catalog.column(name)[self.positions]
+        return columns[name]
+
+    def head(self, n):
+        """
+        Get the first n entries as a new result
+        """
+        return RecommendationResult(self._catalog, self.positions[:n], self.scores[:n])
+
+    def to_frame(self, columns=RESULT_COLUMNS):
+        """
+        Materialize the result as a DataFrame in rank order, including scores
+        """
+        data = {name: getattr(self, name) for name in columns}
+        data['score'] = self.scores
+        return pd.DataFrame(data)
+
+    def __repr__(self):
+        return f"RecommendationResult(n={len(self)}, movie_ids={self.movie_ids.tolist()!r})"
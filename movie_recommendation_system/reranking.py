@@ -0,0 +1,66 @@
+import time
+import numpy as np
+
+
+def _normalize_relevance(scores):
+    """
+    Scale relevance scores of the candidates to [0, 1]
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    finite = np.isfinite(scores)
+    if not finite.any():
+        return np.zeros(len(scores))
+    low = scores[finite].min()
+    span = scores[finite].max() - low
+    relevance = np.where(finite, scores - low, 0.0)
+    return relevance / span if span > 0 else np.where(finite, 1.0, 0.0)
+
+
+def mmr_rerank(positions, scores, item_matrix, n, diversity=0.3, time_budget_ms=None):
+    """
+    Re-rank candidates with maximal marginal relevance.
+
+    positions/scores are the candidates in relevance order and item_matrix
+    holds one L2-normalized row per catalog position. Each step picks the
+    candidate maximizing (1 - diversity) * relevance - diversity * max
+    similarity to the items already picked, then updates the running max
+    similarity with a single sparse product over the candidates, so the cost
+    is O(candidates * n). When time_budget_ms runs out the remaining slots are
+    filled in relevance order.
+    """
+    positions = np.asarray(positions)
+    scores = np.asarray(scores)
+    n = min(n, len(positions))
+    if n <= 1 or not diversity:
+        return positions[:n], scores[:n]
+
+    deadline = None
+    if time_budget_ms is not None:
+        deadline = time.perf_counter() + time_budget_ms / 1000.0
+
+    relevance = (1.0 - diversity) * _normalize_relevance(scores)
+    vectors = item_matrix[positions]
+    max_sim = np.zeros(len(positions))
+    available = np.ones(len(positions), dtype=bool)
+    selected = []
+
+    for _ in range(n):
+        mmr = relevance - diversity * max_sim
+        mmr[~available] = -np.inf
+        best = int(np.argmax(mmr))
+        selected.append(best)
+        available[best] = False
+
+        if len(selected) == n or (deadline is not None and time.perf_counter() > deadline):
+            break
+
+        sims = vectors @ vectors[best].T
+        sims = sims.toarray().ravel() if hasattr(sims, 'toarray') else np.asarray(sims).ravel()
+        np.maximum(max_sim, sims, out=max_sim)
+
+    if len(selected) < n:
+        # Out of budget: keep the remaining candidates in relevance order
+        selected.extend(np.flatnonzero(available)[:n - len(selected)])
+
+    selected = np.asarray(selected)
+    return positions[selected], scores[selected]
@@ -0,0 +1,273 @@
+import re
+from collections import OrderedDict
+import numpy as np
+from recommendation_result import MovieCatalog, RecommendationResult
+
+# Searchable fields and how much a match on each counts
+FIELD_WEIGHTS = {'title': 1.0, 'director': 0.8, 'cast': 0.8}
+
+# Queries shorter than this are looked up in the postings of 1 and 2
+# character grams (and of text prefixes) instead of the trigram postings
+MIN_NGRAM_QUERY = 3
+
+# Marks prefix postings keys; normalized text never contains it
+PREFIX_MARK = '^'
+
+# Score boost of a field that equals, starts with or contains the query
+EXACT_BOOST, PREFIX_BOOST, SUBSTRING_BOOST = 1.0, 0.5, 0.25
+
+# Grams occurring in more than this share of documents are skipped when the
+# query also has rarer grams; they barely change the ranking
+COMMON_GRAM_SHARE = 0.2
+
+_NON_ALNUM = re.compile(r'[^0-9a-z]+')
+
+
+def normalize_text(text):
+    """
+    Lowercase text and collapse everything but letters and digits to single spaces
+    """
+    return _NON_ALNUM.sub(' ', str(text).lower()).strip()
+
+
+def trigrams(text):
+    """
+    Get the set of padded character trigrams of normalized text
+    """
+    padded = f'  {text} '
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def short_grams(text):
+    """
+    Get the set of 1 and 2 character grams of normalized text that a short
+    query can equal (no leading or trailing space)
+    """
+    grams = set(text.replace(' ', ''))
+    grams.update(text[i:i + 2] for i in range(len(text) - 1) if ' ' not in text[i:i + 2])
+    return grams
+
+
+class _FieldIndex:
+    """
+    Trigram postings for one text field
+
+    The same postings also hold, for short queries, every 1 and 2 character
+    gram and the 1 and 2 character prefixes (keyed PREFIX_MARK + prefix,
+    documents equal to the prefix first). Trigram keys are always 3
+    characters, so the key sets do not overlap.
+    """
+    def __init__(self, values):
+        self.texts = [normalize_text(value) for value in values]
+        n_docs = len(self.texts)
+
+        postings = {}
+        exact = {}
+        gram_counts = np.zeros(n_docs, dtype=np.int32)
+        for doc, text in enumerate(self.texts):
+            grams = trigrams(text) if text else ()
+            gram_counts[doc] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(doc)
+            for gram in short_grams(text):
+                postings.setdefault(gram, []).append(doc)
+            for length in range(1, min(len(text), MIN_NGRAM_QUERY - 1) + 1):
+                key = PREFIX_MARK + text[:length]
+                (exact if length == len(text) else postings).setdefault(key, []).append(doc)
+        for key, docs in exact.items():
+            postings[key] = docs + postings.get(key, [])
+
+        self.postings = {gram: np.asarray(docs, dtype=np.int64) for gram, docs in postings.items()}
+        self.gram_counts = gram_counts
+
+    def short_matches(self, query):
+        """
+        Get (documents starting with the query, exact matches first; documents
+        containing it, in document order) for a query shorter than MIN_NGRAM_QUERY
+        """
+        empty = np.empty(0, dtype=np.int64)
+        return self.postings.get(PREFIX_MARK + query, empty), self.postings.get(query, empty)
+
+    def boosts(self, query, docs):
+        """
+        Get the exact, prefix or substring match boost of each document's text (0 for none)
+        """
+        texts = self.texts
+        return np.array([
+            EXACT_BOOST if texts[doc] == query else
+            PREFIX_BOOST if texts[doc].startswith(query) else
+            SUBSTRING_BOOST if query in texts[doc] else 0.0
+            for doc in docs
+        ])
+
+    def scores(self, query):
+        """
+        Score documents sharing trigrams with the query.
+
+        The score mixes the share of query trigrams found in the document
+        (typo tolerant containment) with the trigram Jaccard similarity
+        (prefers titles close in length). Returns (docs, scores).
+        """
+        query_grams = trigrams(query)
+        grams = [gram for gram in query_grams if gram in self.postings]
+        if not grams:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+
+        common_limit = COMMON_GRAM_SHARE * len(self.texts)
+        rare = [gram for gram in grams if len(self.postings[gram]) <= common_limit]
+        assumed = 0
+        if rare:
+            # Credit the common grams to every candidate instead of scanning them
+            assumed = len(grams) - len(rare)
+            grams = rare
+
+        docs = np.concatenate([self.postings[gram] for gram in grams])
+        if len(docs) * 16 < len(self.texts):
+            docs, hits = np.unique(docs, return_counts=True)
+        else:
+            hits = np.bincount(docs, minlength=len(self.texts))
+            docs = np.flatnonzero(hits)
+            hits = hits[docs]
+
+        hits = hits + assumed
+        n_query = len(query_grams)
+        containment = hits / n_query
+        jaccard = hits / (n_query + self.gram_counts[docs] - hits)
+        return docs, np.minimum(0.8 * containment + 0.2 * jaccard, 1.0)
+
+
+class MovieSearchIndex:
+    """
+    Prebuilt, typo-tolerant search over movie titles (and optionally
+    director and cast).
+
+    Queries are matched by character trigram overlap, with exact, prefix and
+    substring matches of any field ranked first; queries of 1 or 2
+    characters match substrings of any field through their own postings. At
+    most max_results matches are ranked per query and the ranked matches of
+    recent queries are cached, so paging does not search again.
+    """
+    def __init__(self, movies_df, fields=('title',), min_score=0.45, max_results=1000,
+                 cache_size=64):
+        self.catalog = MovieCatalog(movies_df)
+        self.fields = list(fields)
+        self.min_score = min_score
+        self.max_results = max_results
+        self.cache_size = cache_size
+        self._indexes = {field: _FieldIndex(movies_df[field].fillna('')) for field in self.fields}
+        self._cache = OrderedDict()
+
+    def __len__(self):
+        return len(self.catalog)
+
+    def _candidates(self, query):
+        """
+        Get (positions, scores) of every document matching a normalized query
+        """
+        docs, scores = [], []
+        for field, index in self._indexes.items():
+            field_docs, field_scores = index.scores(query)
+            docs.append(field_docs)
+            scores.append(FIELD_WEIGHTS.get(field, 1.0) * field_scores)
+        docs, scores = np.concatenate(docs), np.concatenate(scores)
+
+        if len(self._indexes) > 1:
+            # A document matched on several fields keeps its best score
+            docs, inverse = np.unique(docs, return_inverse=True)
+            best = np.zeros(len(docs))
+            np.maximum.at(best, inverse, scores)
+            scores = best
+
+        keep = scores >= self.min_score
+        return docs[keep], scores[keep]
+
+    def _rank(self, query):
+        """
+        Rank the best matches of a normalized query; returns (positions, scores, total)
+        """
+        if len(query) < MIN_NGRAM_QUERY:
+            return self._rank_short(query)
+
+        positions, scores = self._candidates(query)
+        total = len(positions)
+
+        if total > self.max_results:
+            top = np.argpartition(-scores, self.max_results - 1)[:self.max_results]
+            positions, scores = positions[top], scores[top]
+
+        if total:
+            scores = scores + self._boosts(query, positions)
+        order = np.argsort(-scores, kind='stable')
+        return positions[order], scores[order], total
+
+    def _rank_short(self, query):
+        """
+        Rank a query too short for trigrams by the best boost of its matches
+
+        Only the first max_results prefix matches (exact ones first) and
+        substring matches of each field are ranked; the total still counts
+        every document containing the query.
+        """
+        limit = self.max_results
+        candidates = []
+        matches = []
+        for index in self._indexes.values():
+            prefixed, contained = index.short_matches(query)
+            candidates += [prefixed[:limit], contained[:limit]]
+            matches.append(contained)
+
+        if len(matches) == 1:
+            total = len(matches[0])
+        else:
+            matched = np.zeros(len(self.catalog), dtype=bool)
+            for docs in matches:
+                matched[docs] = True
+            total = int(np.count_nonzero(matched))
+
+        positions = np.unique(np.concatenate(candidates))
+        scores = self._boosts(query, positions)
+        order = np.argsort(-scores, kind='stable')[:limit]
+        return positions[order], scores[order], total
+
+    def _boosts(self, query, positions):
+        """
+        Get the best weighted exact, prefix or substring match boost of each
+        document over the indexed fields
+        """
+        boosts = np.zeros(len(positions))
+        for field, index in self._indexes.items():
+            np.maximum(boosts, FIELD_WEIGHTS.get(field, 1.0) * index.boosts(query, positions), out=boosts)
+        return boosts
+
+    def match(self, query):
+        """
+        Get (positions, scores, total) for a query: the ranked matches (best
+        first, at most max_results) and the total number of matches
+        """
+        query = normalize_text(query)
+        if not query:
+            return np.empty(0, dtype=np.int64), np.empty(0), 0
+
+        cached = self._cache.get(query)
+        if cached is None:
+            cached = self._rank(query)
+            self._cache[query] = cached
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        else:
+            self._cache.move_to_end(query)
+        return cached
+
+    def count(self, query):
+        """
+        Get the total number of matches for a query
+        """
+        return self.match(query)[2]
+
+    def search(self, query, limit=20, offset=0):
+        """
+        Get one page of ranked matches as a RecommendationResult
+        """
+        positions, scores, _ = self.match(query)
+        page = slice(offset, offset + limit)
+        return RecommendationResult(self.catalog, positions[page], scores[page])
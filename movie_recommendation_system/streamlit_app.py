@@ -1,12 +1,37 @@
+import os
+import pickle
+import logging
 import streamlit as st
 import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
 from recommendation_engine import MovieRecommendationEngine
-from data_generator import save_sample_data
+from data_generator import save_sample_data, dataset_fingerprint
+from analytics import get_aggregates
+from engine_registry import EngineRegistry
 import time
 
+# Saved engines, one file per dataset version
+ENGINE_CACHE_DIR = 'engine_cache'
+
+# Saved engines kept in ENGINE_CACHE_DIR; older ones are deleted before a new one is built
+MAX_CACHED_ENGINES = 3
+
+# Shared engine registry; when it has a published version, every app process serves it
+ENGINE_REGISTRY_DIR = os.environ.get('MOVIE_ENGINE_REGISTRY', 'engine_registry')
+
+# Rows rendered per page of search and genre results
+RESULTS_PAGE_SIZE = 25
+
+# Catalog columns shown in result tables, with their headers
+RESULT_TABLE_COLUMNS = {'title': 'Title', 'genre': 'Genre', 'rating': 'Rating', 'year': 'Year'}
+
+# Result table sort options; None keeps the relevance order
+SORT_OPTIONS = {"Relevance": None, "Rating": 'rating', "Year": 'year', "Title": 'title'}
+
+logger = logging.getLogger(__name__)
+
 # Page configuration
 st.set_page_config(
     page_title="🎬 Movie Recommendation System",
@@ -44,9 +69,9 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-@st.cache_data
-def load_data():
-    """Load or generate movie data"""
+@st.cache_resource(max_entries=2)
+def load_data(version):
+    """Load or generate movie data, once per dataset version"""
     try:
         movies_df = pd.read_csv('movies.csv')
         ratings_df = pd.read_csv('ratings.csv')
@@ -56,42 +81,101 @@ def load_data():
             movies_df, ratings_df = save_sample_data()
         return movies_df, ratings_df
 
-@st.cache_resource
-def initialize_engine(movies_df, ratings_df):
-    """Initialize the recommendation engine"""
-    with st.spinner("Initializing recommendation engine..."):
-        engine = MovieRecommendationEngine(movies_df, ratings_df)
+def prune_engine_cache(keep=MAX_CACHED_ENGINES):
+    """Delete all but the newest keep saved engines"""
+    try:
+        names = [name for name in os.listdir(ENGINE_CACHE_DIR) if name.startswith('engine_') and name.endswith('.pkl')]
+    except FileNotFoundError:
+        return
+    artifacts = []
+    for name in names:
+        path = os.path.join(ENGINE_CACHE_DIR, name)
+        try:
+            artifacts.append((os.stat(path).st_mtime_ns, path))
+        except FileNotFoundError:
+            continue  # Pruned by another app process
+    for _, path in sorted(artifacts)[:-keep] if keep else artifacts:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+@st.cache_resource(max_entries=2)
+def initialize_engine(version, _movies_df, _ratings_df):
+    """
+    Initialize the recommendation engine for a dataset version
+    
+    Only the version string is hashed on reruns. On a cache miss the engine
+    saved for that version is loaded from disk; otherwise a new engine warms
+    its models up in the background and saves itself once they are built.
+    """
+    if version is None:
+        return MovieRecommendationEngine(_movies_df, _ratings_df, background_warmup=True)
+    
+    artifact_path = os.path.join(ENGINE_CACHE_DIR, f"engine_{version}.pkl")
+    if os.path.exists(artifact_path):
+        try:
+            return MovieRecommendationEngine.load(artifact_path)
+        except (OSError, EOFError, pickle.UnpicklingError, AttributeError, ImportError, TypeError, ValueError) as e:
+            # Unreadable artifact (e.g. truncated, or written by another version of the code): rebuild it
+            logger.warning("Could not load saved engine %s, rebuilding it: %r", artifact_path, e)
+    
+    # Make room for the engine saved once this one is built
+    prune_engine_cache(MAX_CACHED_ENGINES - 1)
+    engine = MovieRecommendationEngine(_movies_df, _ratings_df)
+    engine.warm_up(background=True, save_path=artifact_path)
     return engine
 
+@st.cache_resource
+def get_engine_registry(registry_dir):
+    """Open the shared engine registry once per process"""
+    return EngineRegistry(registry_dir)
+
 def main():
     # Header
     st.markdown('<h1 class="main-header">🎬 Movie Recommendation System</h1>', unsafe_allow_html=True)
     
-    # Load data
-    movies_df, ratings_df = load_data()
-    
-    # Initialize engine
-    engine = initialize_engine(movies_df, ratings_df)
+    # Serve the current published engine if there is one; it is memory-mapped
+    # and shared with the other app processes, and swapped when a new one is published
+    registry = get_engine_registry(ENGINE_REGISTRY_DIR)
+    engine = registry.get()
+    if engine is not None:
+        version = registry.version
+        movies_df, ratings_df = engine.movies_df, engine.ratings_df
+    else:
+        # Load data; the dataset version comes from file sizes and mtimes only
+        version = dataset_fingerprint()
+        movies_df, ratings_df = load_data(version)
+        if version is None:
+            version = dataset_fingerprint()
+        
+        # Initialize engine
+        engine = initialize_engine(version, movies_df, ratings_df)
     
     # Sidebar
     st.sidebar.title("🎯 Navigation")
+    if not engine.is_ready():
+        st.sidebar.caption("⏳ Recommendation models are warming up...")
     page = st.sidebar.selectbox(
         "Choose a page:",
         ["🏠 Dashboard", "🎬 Get Recommendations", "👤 User Profiles", "📊 Analytics", "🔍 Search Movies"]
     )
     
+    # Dashboard statistics, computed once per dataset version
+    aggregates = get_aggregates(movies_df, ratings_df, version)
+    
     if page == "🏠 Dashboard":
-        show_dashboard(movies_df, ratings_df, engine)
+        show_dashboard(aggregates, engine)
     elif page == "🎬 Get Recommendations":
         show_recommendations(movies_df, engine)
     elif page == "👤 User Profiles":
         show_user_profiles(engine)
     elif page == "📊 Analytics":
-        show_analytics(movies_df, ratings_df)
+        show_analytics(aggregates)
     elif page == "🔍 Search Movies":
-        show_search(movies_df)
+        show_search(engine, version)
 
-def show_dashboard(movies_df, ratings_df, engine):
+def show_dashboard(aggregates, engine):
     """Show the main dashboard"""
     st.header("📊 Dashboard Overview")
     
@@ -99,22 +183,22 @@ def show_dashboard(movies_df, ratings_df, engine):
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Movies", len(movies_df))
+        st.metric("Total Movies", aggregates.total_movies)
     
     with col2:
-        st.metric("Total Users", ratings_df['user_id'].nunique())
+        st.metric("Total Users", aggregates.total_users)
     
     with col3:
-        st.metric("Total Ratings", len(ratings_df))
+        st.metric("Total Ratings", aggregates.total_ratings)
     
     with col4:
-        st.metric("Avg Rating", f"{ratings_df['rating'].mean():.2f}")
+        st.metric("Avg Rating", f"{aggregates.average_rating:.2f}")
     
     # Quick recommendations
     st.subheader("🔥 Popular Movies")
-    popular_movies = engine.get_popular_movies(5)
+    popular_movies = engine.get_popular_movies(5, compact=True)
     
-    for idx, row in popular_movies.iterrows():
+    for row in popular_movies:
         with st.container():
             col1, col2, col3 = st.columns([3, 1, 1])
             with col1:
@@ -126,7 +210,7 @@ def show_dashboard(movies_df, ratings_df, engine):
     
     # Genre distribution
     st.subheader("🎭 Genre Distribution")
-    genre_counts = movies_df['genre'].value_counts()
+    genre_counts = aggregates.genre_counts
     fig = px.pie(values=genre_counts.values, names=genre_counts.index, title="Movies by Genre")
     st.plotly_chart(fig, use_container_width=True)
 
@@ -137,8 +221,24 @@ def show_recommendations(movies_df, engine):
     # Recommendation type selection
     rec_type = st.selectbox(
         "Choose recommendation type:",
-        ["Content-Based", "Collaborative Filtering", "Hybrid", "Genre-Based", "Popular Movies"]
+        ["Content-Based", "Collaborative Filtering", "Hybrid", "Genre-Based", "Popular Movies", "Trending Movies"]
     )
+    diversity = st.slider(
+        "Diversity (0 = most relevant only):", 0.0, 1.0, 0.0, 0.1,
+        help="Re-rank results to spread them across genres, directors and cast"
+    ) or None
+    
+    # Filters are applied inside the ranking, so the full number of results is returned
+    with st.expander("Filters"):
+        filter_genres = st.multiselect("Only these genres:", sorted(movies_df['genre'].unique()))
+        min_year, max_year = int(movies_df['year'].min()), int(movies_df['year'].max())
+        year_range = st.slider("Release year:", min_year, max_year, (min_year, max_year))
+        min_rating = st.slider("Minimum movie rating:", 0.0, 10.0, 0.0, 0.5)
+    filters = {
+        'genres': filter_genres or None,
+        'year_range': year_range if year_range != (min_year, max_year) else None,
+        'min_rating': min_rating or None,
+    }
     
     if rec_type == "Content-Based":
         st.subheader("🎯 Content-Based Recommendations")
@@ -152,10 +252,10 @@ def show_recommendations(movies_df, engine):
         
         if st.button("Get Recommendations"):
             movie_id = movies_df[movies_df['title'] == selected_movie]['movie_id'].iloc[0]
-            recommendations = engine.content_based_recommendations(movie_id, 10)
+            recommendations = engine.content_based_recommendations(movie_id, 10, compact=True, diversity=diversity, filters=filters)
             
             st.subheader(f"Movies similar to '{selected_movie}':")
-            for idx, row in recommendations.iterrows():
+            for row in recommendations:
                 with st.container():
                     col1, col2, col3 = st.columns([3, 1, 1])
                     with col1:
@@ -170,13 +270,19 @@ def show_recommendations(movies_df, engine):
         st.write("Get recommendations based on similar users")
         
         user_id = st.number_input("Enter User ID (1-500):", min_value=1, max_value=500, value=1)
+        algorithm = st.radio(
+            "Algorithm:", ["nmf", "item"], horizontal=True,
+            format_func={"nmf": "Matrix factorization (NMF)", "item": "Item-item similarity"}.get
+        )
         
         if st.button("Get Recommendations"):
-            recommendations = engine.collaborative_filtering_recommendations(user_id, 10)
+            recommendations = engine.collaborative_filtering_recommendations(
+                user_id, 10, compact=True, diversity=diversity, algorithm=algorithm, filters=filters
+            )
             
             if not recommendations.empty:
                 st.subheader(f"Recommended movies for User {user_id}:")
-                for idx, row in recommendations.iterrows():
+                for row in recommendations:
                     with st.container():
                         col1, col2, col3 = st.columns([3, 1, 1])
                         with col1:
@@ -206,11 +312,11 @@ def show_recommendations(movies_df, engine):
             if selected_movie != "None":
                 movie_id = movies_df[movies_df['title'] == selected_movie]['movie_id'].iloc[0]
             
-            recommendations = engine.hybrid_recommendations(user_id, movie_id, 10)
+            recommendations = engine.hybrid_recommendations(user_id, movie_id, 10, compact=True, diversity=diversity, filters=filters)
             
             if not recommendations.empty:
                 st.subheader(f"Hybrid recommendations for User {user_id}:")
-                for idx, row in recommendations.iterrows():
+                for row in recommendations:
                     with st.container():
                         col1, col2, col3 = st.columns([3, 1, 1])
                         with col1:
@@ -229,10 +335,10 @@ def show_recommendations(movies_df, engine):
         genre = st.selectbox("Select genre:", movies_df['genre'].unique())
         
         if st.button("Get Genre Recommendations"):
-            recommendations = engine.get_genre_recommendations(genre, 10)
+            recommendations = engine.get_genre_recommendations(genre, 10, compact=True, diversity=diversity, filters=filters)
             
             st.subheader(f"Top {genre} Movies:")
-            for idx, row in recommendations.iterrows():
+            for row in recommendations:
                 with st.container():
                     col1, col2, col3 = st.columns([3, 1, 1])
                     with col1:
@@ -249,10 +355,10 @@ def show_recommendations(movies_df, engine):
         n_movies = st.slider("Number of movies:", 5, 20, 10)
         
         if st.button("Get Popular Movies"):
-            recommendations = engine.get_popular_movies(n_movies)
+            recommendations = engine.get_popular_movies(n_movies, compact=True, diversity=diversity, filters=filters)
             
             st.subheader("Most Popular Movies:")
-            for idx, row in recommendations.iterrows():
+            for row in recommendations:
                 with st.container():
                     col1, col2, col3 = st.columns([3, 1, 1])
                     with col1:
@@ -261,6 +367,30 @@ def show_recommendations(movies_df, engine):
                         st.write(f"🎭 {row['genre']}")
                     with col3:
                         st.write(f"⭐ {row['rating']}")
+    
+    elif rec_type == "Trending Movies":
+        st.subheader("📈 Trending Movies")
+        st.write("Most popular movies among recent ratings")
+        
+        days = st.slider("Rated in the last N days:", 7, 365, 30)
+        n_movies = st.slider("Number of movies:", 5, 20, 10)
+        
+        if st.button("Get Trending Movies"):
+            recommendations = engine.get_trending_movies(days, n_movies, compact=True, diversity=diversity, filters=filters)
+            
+            if not recommendations.empty:
+                st.subheader(f"Trending in the last {days} days:")
+                for row in recommendations:
+                    with st.container():
+                        col1, col2, col3 = st.columns([3, 1, 1])
+                        with col1:
+                            st.write(f"**{row['title']}**")
+                        with col2:
+                            st.write(f"🎭 {row['genre']}")
+                        with col3:
+                            st.write(f"⭐ {row['rating']}")
+            else:
+                st.warning("No ratings in this period.")
 
 def show_user_profiles(engine):
     """Show user profile analysis"""
@@ -296,17 +426,17 @@ def show_user_profiles(engine):
                     with col3:
                         st.write(f"⭐ {row['rating']}")
                     with col4:
-                        st.write(f"📅 {row['timestamp'].split()[0]}")
+                        st.write(f"📅 {str(row['timestamp']).split()[0]}")
         else:
             st.error("User not found!")
 
-def show_analytics(movies_df, ratings_df):
+def show_analytics(aggregates):
     """Show data analytics and visualizations"""
     st.header("📊 Analytics")
     
     # Rating distribution
     st.subheader("⭐ Rating Distribution")
-    rating_counts = ratings_df['rating'].value_counts().sort_index()
+    rating_counts = aggregates.rating_distribution
     fig = px.bar(x=rating_counts.index, y=rating_counts.values, 
                  title="Distribution of Ratings",
                  labels={'x': 'Rating', 'y': 'Count'})
@@ -314,7 +444,7 @@ def show_analytics(movies_df, ratings_df):
     
     # Average rating by genre
     st.subheader("🎭 Average Rating by Genre")
-    genre_ratings = ratings_df.merge(movies_df, on='movie_id').groupby('genre')['rating'].mean().sort_values(ascending=False)
+    genre_ratings = aggregates.genre_average_rating
     fig = px.bar(x=genre_ratings.index, y=genre_ratings.values,
                  title="Average Rating by Genre",
                  labels={'x': 'Genre', 'y': 'Average Rating'})
@@ -323,57 +453,83 @@ def show_analytics(movies_df, ratings_df):
     
     # Movies by year
     st.subheader("📅 Movies by Year")
-    year_counts = movies_df['year'].value_counts().sort_index()
+    year_counts = aggregates.year_counts
     fig = px.line(x=year_counts.index, y=year_counts.values,
                   title="Number of Movies by Year",
                   labels={'x': 'Year', 'y': 'Number of Movies'})
     st.plotly_chart(fig, use_container_width=True)
 
-def show_search(movies_df):
+def result_positions(engine, kind, key):
+    """Get the catalog positions of a search query or genre, in relevance order"""
+    if kind == "search":
+        positions, _, total = engine.search_index.match(key)
+        return positions, total
+    positions = engine.catalog.groups('genre').get(key, np.empty(0, dtype=np.int64))
+    return positions, len(positions)
+
+@st.cache_data(max_entries=256, show_spinner=False)
+def load_results_page(version, kind, key, sort_by, descending, page, _engine):
+    """Materialize one page of results as a small DataFrame
+    
+    The cache key is the dataset version plus the query, sort and page; the
+    engine is excluded from hashing.
+    """
+    catalog = _engine.catalog
+    positions, _ = result_positions(_engine, kind, key)
+    
+    # Sort server-side over the matching positions only
+    if sort_by is not None:
+        order = np.argsort(catalog.column(sort_by)[positions], kind='stable')
+        positions = positions[order[::-1] if descending else order]
+    
+    page_positions = positions[page * RESULTS_PAGE_SIZE:(page + 1) * RESULTS_PAGE_SIZE]
+    return pd.DataFrame({
+        label: catalog.column(column)[page_positions] for column, label in RESULT_TABLE_COLUMNS.items()
+    })
+
+def show_results_table(engine, version, kind, key):
+    """Render search or genre results as one paginated, sortable table"""
+    positions, total = result_positions(engine, kind, key)
+    n_pages = max(1, -(-len(positions) // RESULTS_PAGE_SIZE))
+    
+    col1, col2, col3 = st.columns([2, 1, 1])
+    with col1:
+        sort_label = st.selectbox("Sort by:", list(SORT_OPTIONS), key=f"{kind}_sort")
+    with col2:
+        descending = st.checkbox("Descending", value=True, key=f"{kind}_descending")
+    with col3:
+        page = st.number_input("Page:", min_value=1, max_value=n_pages, value=1, key=f"{kind}_page")
+    
+    page_df = load_results_page(version, kind, key, SORT_OPTIONS[sort_label], descending, page - 1, engine)
+    st.dataframe(page_df, hide_index=True, use_container_width=True)
+    
+    caption = f"Page {page} of {n_pages} · {total} matches"
+    if total > len(positions):
+        caption += f" (best {len(positions)} shown)"
+    st.caption(caption)
+
+def show_search(engine, version):
     """Show movie search functionality"""
     st.header("🔍 Search Movies")
     
-    # Search by title
-    search_term = st.text_input("Search movies by title:")
+    # Search by title, director or cast
+    search_term = st.text_input("Search movies by title, director or cast:")
     
     if search_term:
-        filtered_movies = movies_df[movies_df['title'].str.contains(search_term, case=False)]
-        
-        if not filtered_movies.empty:
+        if engine.search_index.count(search_term):
             st.subheader(f"Search results for '{search_term}':")
-            for idx, row in filtered_movies.iterrows():
-                with st.container():
-                    col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
-                    with col1:
-                        st.write(f"**{row['title']}**")
-                    with col2:
-                        st.write(f"🎭 {row['genre']}")
-                    with col3:
-                        st.write(f"⭐ {row['rating']}")
-                    with col4:
-                        st.write(f"📅 {row['year']}")
+            show_results_table(engine, version, "search", search_term)
         else:
             st.info("No movies found matching your search.")
     
     # Filter by genre
     st.subheader("Filter by Genre")
-    selected_genre = st.selectbox("Select genre:", ["All"] + movies_df['genre'].unique().tolist())
+    genres = list(engine.catalog.groups('genre'))
+    selected_genre = st.selectbox("Select genre:", ["All"] + genres)
     
     if selected_genre != "All":
-        genre_movies = movies_df[movies_df['genre'] == selected_genre]
         st.subheader(f"Movies in {selected_genre} genre:")
-        
-        for idx, row in genre_movies.head(20).iterrows():
-            with st.container():
-                col1, col2, col3, col4 = st.columns([3, 1, 1, 1])
-                with col1:
-                    st.write(f"**{row['title']}**")
-                with col2:
-                    st.write(f"🎭 {row['genre']}")
-                with col3:
-                    st.write(f"⭐ {row['rating']}")
-                with col4:
-                    st.write(f"📅 {row['year']}")
+        show_results_table(engine, version, "genre", selected_genre)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+def rating_days(timestamps):
+    """
+    Convert rating timestamps to whole days since the epoch (-1 where missing)
+    """
+    timestamps = pd.to_datetime(pd.Series(timestamps).reset_index(drop=True), errors='coerce')
+    days = timestamps.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(np.int64)
+    return np.where(timestamps.isna().to_numpy(), -1, days)
+
+
+def decay_weights(ages, half_life_days):
+    """
+    Exponential decay weight of events that are ages days old
+    """
+    return np.power(0.5, np.maximum(ages, 0) / half_life_days)
+
+
+class RatingsTimeIndex:
+    """
+    Ratings bucketed by day.
+
+    Holds two sparse (days x movies) matrices with the number and sum of the
+    ratings each movie received on each day, so windowed and time-decayed
+    statistics only touch the buckets involved instead of rescanning ratings.
+    Ages are measured from the last day with a rating unless a day is given.
+    """
+    def __init__(self, catalog, ratings_df):
+        self.catalog = catalog
+        positions = catalog.positions_for(ratings_df['movie_id'].to_numpy())
+        days = rating_days(ratings_df['timestamp'])
+        known = (positions >= 0) & (days >= 0)
+
+        positions, days = positions[known], days[known]
+        ratings = ratings_df['rating'].to_numpy(dtype=np.float64)[known]
+        self.first_day = int(days.min()) if len(days) else 0
+        self.last_day = int(days.max()) if len(days) else -1
+        shape = (self.last_day - self.first_day + 1, len(catalog))
+
+        buckets = days - self.first_day
+        self.counts = sparse.csr_matrix((np.ones(len(buckets)), (buckets, positions)), shape=shape)
+        self.sums = sparse.csr_matrix((ratings, (buckets, positions)), shape=shape)
+
+    @property
+    def n_days(self):
+        return self.counts.shape[0]
+
+    def _day_of(self, day):
+        """
+        Epoch day number of a day (epoch day number or timestamp); None means the last day
+        """
+        if day is None:
+            return self.last_day
+        if not isinstance(day, (int, np.integer)):
+            day = int(rating_days([day])[0])
+        return int(day)
+
+    def window(self, days, end=None):
+        """
+        Get per-movie (counts, sums) of the ratings in the days days up to and
+        including end (zeros where the window holds no rating days)
+        """
+        end_bucket = self._day_of(end) - self.first_day
+        start = max(end_bucket - days + 1, 0)
+        stop = min(end_bucket + 1, self.n_days)
+        if stop <= start:
+            return np.zeros(len(self.catalog)), np.zeros(len(self.catalog))
+        counts = np.asarray(self.counts[start:stop].sum(axis=0)).ravel()
+        sums = np.asarray(self.sums[start:stop].sum(axis=0)).ravel()
+        return counts, sums
+
+    def decayed(self, half_life_days, now=None):
+        """
+        Get per-movie (counts, sums) with every rating weighted by
+        0.5 ** (age / half_life_days); ratings after now are ignored
+        """
+        now_bucket = self._day_of(now) - self.first_day
+        stop = min(now_bucket + 1, self.n_days)
+        if stop <= 0:
+            return np.zeros(len(self.catalog)), np.zeros(len(self.catalog))
+        weights = decay_weights(now_bucket - np.arange(stop), half_life_days)
+        counts = self.counts[:stop].T @ weights
+        sums = self.sums[:stop].T @ weights
+        return counts, sums
+
+    def rating_weights(self, ratings_df, half_life_days, now=None):
+        """
+        Decay weight of every rating row, for time-weighted model training
+
+        Ages match decayed(): ratings after now get weight 0, and ratings
+        without a timestamp keep weight 1.
+        """
+        now_day = self._day_of(now)
+        days = rating_days(ratings_df['timestamp'])
+        weights = np.where(days > now_day, 0.0, decay_weights(now_day - days, half_life_days))
+        return np.where(days >= 0, weights, 1.0)
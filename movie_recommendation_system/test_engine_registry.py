@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Tests for the versioned, memory-mapped engine registry
+"""
+
+import os
+import random
+import tempfile
+import numpy as np
+import pandas as pd
+import engine_registry
+from data_generator import generate_movie_data
+from engine_registry import EngineRegistry, STATE_FILE, load_engine_arrays
+from recommendation_engine import MovieRecommendationEngine
+
+
+def make_data():
+    """A small, reproducible dataset read back as from the CSV files, with a missing director"""
+    random.seed(7)
+    movies_df, ratings_df = generate_movie_data(num_movies=200, num_users=80)
+    movies_df.loc[3, 'director'] = None
+    ratings_df['timestamp'] = ratings_df['timestamp'].astype(str)
+    return movies_df, ratings_df
+
+
+def results(engine):
+    """Movie ids of a few recommendation, search and popularity calls"""
+    return [
+        engine.collaborative_filtering_recommendations(3, 5, compact=True).movie_ids.tolist(),
+        engine.content_based_recommendations(5, 5, compact=True).movie_ids.tolist(),
+        engine.hybrid_recommendations(3, 10, 5, compact=True).movie_ids.tolist(),
+        engine.search_movies('Movie 12', 3).movie_ids.tolist(),
+        engine.search_movies('a', 3).movie_ids.tolist(),
+        engine.get_popular_movies(5, compact=True, filters={'genres': ['Drama']}).movie_ids.tolist(),
+    ]
+
+
+def test_saved_version_reopens():
+    """A published version reopens with the same results, text and timestamps out of state.pkl"""
+    movies_df, ratings_df = make_data()
+    engine = MovieRecommendationEngine(movies_df, ratings_df)
+    with tempfile.TemporaryDirectory() as directory:
+        registry = EngineRegistry(directory)
+        registry.publish(engine, version='v1')
+        version_dir = os.path.join(directory, 'versions', 'v1')
+        assert os.path.getsize(os.path.join(version_dir, STATE_FILE)) < 64 * 1024
+
+        loaded = registry.get()
+        assert registry.version == 'v1'
+        assert results(loaded) == results(engine)
+        assert loaded.ratings_df['timestamp'].dtype.kind == 'M'
+        assert loaded.ratings_df['timestamp'].equals(pd.to_datetime(ratings_df['timestamp']))
+        for column in ('title', 'director', 'description'):
+            assert loaded.movies_df[column].isna().tolist() == movies_df[column].isna().tolist()
+            assert loaded.movies_df[column].dropna().tolist() == movies_df[column].dropna().tolist()
+            assert list(loaded.catalog.column(column)[:10]) == list(engine.catalog.column(column)[:10])
+
+        # Without pyarrow the text is decoded into the process instead
+        pa = engine_registry.pa
+        engine_registry.pa = None
+        try:
+            decoded = load_engine_arrays(version_dir)
+        finally:
+            engine_registry.pa = pa
+        assert isinstance(decoded.catalog.column('title'), np.ndarray)
+        assert decoded.movies_df['director'].isna().sum() == 1
+        assert results(decoded) == results(engine)
+
+
+def test_publish_swaps_current():
+    """Readers switch to a newly published version, keep old engines usable, and follow activate()"""
+    movies_df, ratings_df = make_data()
+    first = MovieRecommendationEngine(movies_df, ratings_df)
+    second = MovieRecommendationEngine(movies_df, ratings_df, cf_algorithm='item')
+    with tempfile.TemporaryDirectory() as directory:
+        publisher = EngineRegistry(directory)
+        reader = EngineRegistry(directory, check_interval=0)
+        assert reader.get() is None
+
+        publisher.publish(first, version='v1')
+        old = reader.get()
+        assert reader.version == 'v1'
+
+        publisher.publish(second, version='v2')
+        assert publisher.current_version() == 'v2'
+        new = reader.get()
+        assert reader.version == 'v2' and new is not old
+        assert results(new) == results(second)
+        assert results(old) == results(first)
+
+        publisher.activate('v1')
+        assert reader.get() is not new and reader.version == 'v1'
+        assert publisher.prune(keep=1) == []
+        assert publisher.prune(keep=0) == ['v2']
+        assert publisher.versions() == ['v1']
+
+
+if __name__ == "__main__":
+    test_saved_version_reopens()
+    test_publish_swaps_current()
+    print("All engine registry tests passed")
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for recommendation filters
+"""
+
+import random
+import numpy as np
+from data_generator import generate_movie_data
+from filters import MovieFilter
+from recommendation_engine import MovieRecommendationEngine
+
+
+def make_engine():
+    """Build an engine over a small, reproducible dataset"""
+    random.seed(7)
+    movies_df, ratings_df = generate_movie_data(num_movies=300, num_users=120)
+    return MovieRecommendationEngine(movies_df, ratings_df)
+
+
+def expected_mask(movies_df, genres=None, year_range=None, min_rating=None, exclude=None):
+    """The filter predicates evaluated row by row on the movies DataFrame"""
+    mask = np.ones(len(movies_df), dtype=bool)
+    for i, movie in enumerate(movies_df.itertuples()):
+        first, last = year_range or (None, None)
+        mask[i] = ((genres is None or movie.genre in genres)
+                   and (first is None or movie.year >= first)
+                   and (last is None or movie.year <= last)
+                   and (min_rating is None or movie.rating >= min_rating)
+                   and (exclude is None or movie.movie_id not in exclude))
+    return mask
+
+
+def test_filter_masks():
+    """Compiled masks match the predicates, with exclusions applied on top"""
+    engine = make_engine()
+    movies_df = engine.movies_df
+    cases = [
+        {'genres': ['Drama']},
+        {'genres': ['Drama', 'Comedy'], 'year_range': (2000, None)},
+        {'year_range': (None, 2005), 'min_rating': 6.5},
+        {'genres': 'Horror', 'year_range': (1995, 2015), 'min_rating': 3.0, 'exclude': [1, 2, 3]},
+        {'exclude': movies_df['movie_id'].iloc[:50].tolist()},
+    ]
+    for arguments in cases:
+        filters = MovieFilter(**arguments)
+        if isinstance(arguments.get('genres'), str):
+            arguments = dict(arguments, genres=[arguments['genres']])
+        mask = filters.apply_exclusions(engine.catalog, filters.compile_static(engine.catalog))
+        assert np.array_equal(mask, expected_mask(movies_df, **arguments)), arguments
+        assert np.array_equal(engine._filter_mask(arguments), mask), arguments
+
+    assert MovieFilter().compile_static(engine.catalog) is None
+    assert engine._filter_mask(None) is None
+    assert MovieFilter.coerce({'genres': ['Drama']}).genres == ('Drama',)
+
+
+def test_filtered_results_match_filters():
+    """Every recommendation method only returns movies passing the filters"""
+    engine = make_engine()
+    arguments = {'genres': ['Drama', 'Action', 'Comedy'], 'year_range': (2000, None)}
+    allowed = set(engine.movies_df['movie_id'][expected_mask(engine.movies_df, **arguments)])
+    results = [
+        engine.get_popular_movies(10, compact=True, filters=arguments),
+        engine.get_trending_movies(60, 10, compact=True, filters=arguments),
+        engine.get_genre_recommendations('Drama', 10, compact=True, filters=arguments),
+        engine.content_based_recommendations(1, 10, compact=True, filters=arguments),
+    ]
+    for result in results:
+        assert len(result) > 0
+        assert set(result.movie_ids) <= allowed
+
+
+def test_filtered_popular_returns_n_items():
+    """Popular movies fill n results whenever n rated movies pass the filters"""
+    engine = make_engine()
+    rating_count = engine.rating_stats[0]
+    for arguments in ({'genres': ['Drama']}, {'genres': ['Drama'], 'year_range': (2010, None)},
+                      {'year_range': (2020, None), 'min_rating': 5.0}, {'min_rating': 9.5}):
+        available = int(((rating_count > 0) & expected_mask(engine.movies_df, **arguments)).sum())
+        for n in (5, 10, 30):
+            result = engine.get_popular_movies(n, compact=True, filters=arguments)
+            assert len(result) == min(n, available), (arguments, n, available)
+            diverse = engine.get_popular_movies(n, compact=True, diversity=0.5, filters=arguments)
+            assert len(diverse) == min(n, available), (arguments, n, available)
+
+
+if __name__ == "__main__":
+    test_filter_masks()
+    test_filtered_results_match_filters()
+    test_filtered_popular_returns_n_items()
+    print("All filter tests passed")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for item-item collaborative filtering
+"""
+
+import numpy as np
+import pandas as pd
+from item_cf import ItemCFModel, SIMILARITY_SHRINKAGE
+from recommendation_engine import MovieRecommendationEngine
+from recommendation_result import MovieCatalog
+
+# Movies A, B, C, D (ids 1-4) and four users with a mean rating of 3 each;
+# centered on those means the item vectors over users 1-4 are
+#   A = (2, 2, 0, -2), B = (2, 0, -2, 0), C = (-2, -2, 2, 0), D = (-2, 0, 0, 2)
+# so cos(A, B) = cos(C, D) = 1 / sqrt(6) and every other pair is negative
+RATINGS = {
+    1: {1: 5, 2: 5, 3: 1, 4: 1},
+    2: {1: 5, 2: 3, 3: 1},
+    3: {2: 1, 3: 5, 4: 3},
+    4: {1: 1, 4: 5},
+}
+SIMILARITY = 1 / np.sqrt(6)
+
+
+def make_frames():
+    """Movie and rating frames of the hand-computed example"""
+    movies_df = pd.DataFrame({
+        'movie_id': [1, 2, 3, 4],
+        'title': ['A', 'B', 'C', 'D'],
+        'genre': ['Action', 'Drama', 'Comedy', 'Drama'],
+        'year': [2001, 2002, 2003, 2004],
+        'rating': [7.0, 6.0, 8.0, 5.0],
+        'director': ['Director 1'] * 4,
+        'cast': ['Actor 1'] * 4,
+        'description': ['A movie'] * 4,
+    })
+    ratings_df = pd.DataFrame([(user, movie, rating) for user, movies in RATINGS.items()
+                               for movie, rating in movies.items()],
+                              columns=['user_id', 'movie_id', 'rating'])
+    return movies_df, ratings_df
+
+
+def reference_similarity(ratings, n_neighbors):
+    """Dense adjusted cosine of a (users x items) matrix with 0 for unrated, top n_neighbors positive per row"""
+    rated = ratings > 0
+    means = ratings.sum(axis=1) / np.maximum(rated.sum(axis=1), 1)
+    centered = np.where(rated, ratings - means[:, None], 0.0)
+    norms = np.linalg.norm(centered, axis=0)
+    norms[norms == 0] = 1
+    similarity = centered.T @ centered / np.outer(norms, norms)
+    np.fill_diagonal(similarity, 0)
+    kept = np.zeros_like(similarity)
+    for item, row in enumerate(similarity):
+        top = np.argsort(-row, kind='stable')[:n_neighbors]
+        top = top[row[top] > 1e-12]
+        kept[item, top] = row[top]
+    return kept
+
+
+def test_user_mean_centering():
+    """Similarities are cosines of ratings centered on each user's mean, keeping positive ones"""
+    movies_df, ratings_df = make_frames()
+    model = ItemCFModel(MovieCatalog(movies_df), ratings_df)
+    assert np.allclose(model.user_means, [3, 3, 3, 3])
+    expected = np.zeros((4, 4))
+    expected[0, 1] = expected[1, 0] = expected[2, 3] = expected[3, 2] = SIMILARITY
+    assert np.allclose(model.similarity.toarray(), expected)
+
+    # User 4 rated A 1 and D 5: B is pulled down by A, C up by D
+    positions, predicted = model.predict(4)
+    shift = 2 * SIMILARITY / (SIMILARITY + SIMILARITY_SHRINKAGE)
+    assert positions.tolist() == [1, 2]
+    assert np.allclose(predicted, [3 - shift, 3 + shift])
+    assert model.predict(99) is None
+
+
+def test_top_k_neighbors():
+    """Only the n_neighbors most similar items are kept, matching a dense reference"""
+    rng = np.random.default_rng(3)
+    n_users, n_items = 40, 30
+    ratings = np.where(rng.random((n_users, n_items)) < 0.4, rng.integers(1, 6, (n_users, n_items)), 0)
+    users, items = np.nonzero(ratings)
+    ratings_df = pd.DataFrame({'user_id': users + 100, 'movie_id': items + 1, 'rating': ratings[users, items]})
+    catalog = MovieCatalog(pd.DataFrame({'movie_id': np.arange(1, n_items + 1)}))
+    for n_neighbors in (1, 3, n_items):
+        model = ItemCFModel(catalog, ratings_df, n_neighbors=n_neighbors)
+        similarity = model.similarity.toarray()
+        assert (np.count_nonzero(similarity, axis=1) <= n_neighbors).all()
+        assert np.allclose(similarity, reference_similarity(ratings.astype(float), n_neighbors))
+
+
+def test_filters_can_return_fewer_items():
+    """Filters drop candidates before the top-k, so a strict filter returns fewer than n items"""
+    movies_df, ratings_df = make_frames()
+    engine = MovieRecommendationEngine(movies_df, ratings_df, cf_algorithm='item')
+    assert engine.collaborative_filtering_recommendations(4, 5, compact=True).movie_ids.tolist() == [3, 2]
+    drama = engine.collaborative_filtering_recommendations(4, 5, compact=True, filters={'genres': ['Drama']})
+    assert drama.movie_ids.tolist() == [2]
+    assert len(engine.collaborative_filtering_recommendations(
+        4, 5, compact=True, filters={'genres': ['Drama'], 'min_rating': 7.0})) == 0
+    assert len(engine.collaborative_filtering_recommendations(99, 5, compact=True)) == 0
+
+
+if __name__ == "__main__":
+    test_user_mean_centering()
+    test_top_k_neighbors()
+    test_filters_can_return_fewer_items()
+    print("All item CF tests passed")
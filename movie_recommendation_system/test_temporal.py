@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Tests for the day-bucketed ratings time index
+"""
+
+import numpy as np
+import pandas as pd
+from recommendation_result import MovieCatalog
+from temporal import RatingsTimeIndex, rating_days
+
+FIRST_DAY = pd.Timestamp('2024-01-01')
+
+
+def make_index():
+    """Two movies rated on days 0, 2 and 4 of January 2024"""
+    movies_df = pd.DataFrame({'movie_id': [1, 2], 'title': ['A', 'B']})
+    ratings_df = pd.DataFrame({
+        'movie_id': [1, 1, 2, 2],
+        'rating': [4, 2, 5, 3],
+        'timestamp': ['2024-01-01 09:00:00', '2024-01-03 10:00:00', '2024-01-03 11:00:00', '2024-01-05 12:00:00'],
+    })
+    return RatingsTimeIndex(MovieCatalog(movies_df), ratings_df), ratings_df
+
+
+def day(offset):
+    """Timestamp offset days after the first rating day"""
+    return FIRST_DAY + pd.Timedelta(days=offset)
+
+
+def test_window_uses_real_end():
+    """Windows ending after the data only count the days they actually cover"""
+    index, _ = make_index()
+    counts, sums = index.window(3)
+    assert counts.tolist() == [1, 2] and sums.tolist() == [2, 8]
+    counts, sums = index.window(3, end=day(2))
+    assert counts.tolist() == [2, 1] and sums.tolist() == [6, 5]
+    # Days 4..6 only hold day 4's rating, days 10..12 hold none
+    assert index.window(3, end=day(6))[0].tolist() == [0, 1]
+    assert index.window(3, end=day(12))[0].tolist() == [0, 0]
+    assert index.window(3, end=day(-5))[0].tolist() == [0, 0]
+
+
+def test_decay_uses_real_now():
+    """Decay ages count from now even past the data, and agree with rating_weights"""
+    index, ratings_df = make_index()
+    for now in (None, day(2), day(10)):
+        now_day = rating_days([day(4) if now is None else now])[0]
+        counts, sums = index.decayed(2, now=now)
+        weights = index.rating_weights(ratings_df, 2, now=now)
+        ages = now_day - rating_days(ratings_df['timestamp'])
+        assert np.allclose(weights, np.where(ages >= 0, 0.5 ** (ages / 2), 0.0))
+        for position, movie_id in enumerate((1, 2)):
+            rows = (ratings_df['movie_id'] == movie_id).to_numpy()
+            assert np.isclose(counts[position], weights[rows].sum())
+            assert np.isclose(sums[position], (weights * ratings_df['rating'])[rows].sum())
+    assert index.decayed(2, now=day(-1))[0].tolist() == [0, 0]
+
+
+if __name__ == "__main__":
+    test_window_uses_real_end()
+    test_decay_uses_real_now()
+    print("All temporal tests passed")
@@ -1,15 +1,56 @@
 import random
-from typing import Tuple, Optional
+import time
+from typing import Dict, List, Tuple, Optional
 from game_logic import TicTacToe
+from bitboard import BitBoard, SYMBOLS, FULL_WIDTH_CELLS, popcount, candidate_cells
+from transposition import (TranspositionTable, EXACT, LOWER, UPPER, canonical_key,
+                           to_canonical_cell, from_canonical_cell, table_capacity)
+import solution_table
+
+# Line score tables by win length, shared by every SmartAIPlayer
+_LINE_SCORES: Dict[int, List[List[int]]] = {}
+
+# Transposition tables of the process by search settings (win score and
+# evaluation), each with the (board size, win length) it was made for
+_TABLES: Dict[tuple, Tuple[Tuple[int, int], TranspositionTable]] = {}
+
+def clear_tables():
+    """Drop every transposition table of the process"""
+    _TABLES.clear()
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the move's time budget runs out"""
 
 class AIPlayer:
-    def __init__(self, difficulty: str = "medium"):
+    # Score of a win, less one per move it takes; above any evaluation
+    win_score = 10 ** 9
+    # Moves searched past the root move before evaluating (None searches to the end)
+    max_depth: Optional[int] = None
+    # Wall-clock seconds per move (None never stops the search early)
+    time_limit: Optional[float] = 1.0
+    # Boards with more cells only search the empty cells next to a stone
+    full_width_cells = FULL_WIDTH_CELLS
+    # Order moves by transposition table, killer moves, history and cell preference
+    move_ordering = True
+    # Transposition table entries (None sizes the table from the board)
+    table_capacity: Optional[int] = None
+    
+    def __init__(self, difficulty: str = "medium", time_limit: Optional[float] = None):
         """
         Initialize AI player with specified difficulty
         difficulty: "easy", "medium", "hard", "unbeatable"
+        time_limit: seconds per move, overriding the class default
         """
         self.difficulty = difficulty
         self.player_symbol = None
+        if time_limit is not None:
+            self.time_limit = time_limit
+        self.transpositions: Optional[TranspositionTable] = None  # Table of the last search
+        self.nodes = 0  # Positions searched for the last move
+        self.depth_reached = 0  # Deepest completed iteration of the last move
+        self.expanded = 0  # Positions whose moves were searched
+        self.cutoffs = 0  # Of those, positions that ended early on a beta cutoff
+        self.first_move_cutoffs = 0  # Of those, cutoffs on the first move searched
     
     def set_player_symbol(self, symbol: str):
         """Set the AI player's symbol (X or O)"""
@@ -28,6 +69,15 @@ class AIPlayer:
         else:
             return self._random_move(game)
     
+    def search_stats(self) -> Dict[str, float]:
+        """Get the node and cutoff counts of the last move's search"""
+        return {
+            'nodes': self.nodes,
+            'depth': self.depth_reached,
+            'cutoff_rate': self.cutoffs / self.expanded if self.expanded else 0.0,
+            'first_move_cutoff_rate': self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0,
+        }
+    
     def _random_move(self, game: TicTacToe) -> Tuple[int, int]:
         """Make a random move"""
         available_moves = game.get_available_moves()
@@ -51,207 +101,266 @@ class AIPlayer:
         """Unbeatable: Always make the best move"""
         return self._smart_move(game)
     
+    def _search_board(self, game: TicTacToe) -> BitBoard:
+        """Copy the game's bitboard for searching, with the AI to move"""
+        board = game.bitboard.copy()
+        board.side = SYMBOLS.index(self.player_symbol)
+        return board
+    
     def _smart_move(self, game: TicTacToe) -> Tuple[int, int]:
         """Make a smart move using minimax algorithm"""
-        best_score = float('-inf')
-        best_move = None
+        board = self._search_board(game)
+        me = board.side
+        self.nodes = self.expanded = self.cutoffs = self.first_move_cutoffs = 0
         
-        for move in game.get_available_moves():
-            # Make the move
-            row, col = move
-            game.board[row][col] = self.player_symbol
-            
-            # Check if this move wins immediately
-            if game.check_win(row, col):
-                game.board[row][col] = ' '  # Undo move
-                return move
-            
-            # Check if opponent can win next move (block them)
-            opponent_symbol = 'O' if self.player_symbol == 'X' else 'X'
-            game.board[row][col] = opponent_symbol
-            if game.check_win(row, col):
-                game.board[row][col] = ' '  # Undo move
-                return move
-            
+        # Look perfect play up when the solution table has been built
+        if solution_table.SOLUTION is not None:
+            cell = solution_table.SOLUTION.best_move(board)
+            if cell is not None:
+                return board.row_col(cell)
+        
+        # Take an immediate win, otherwise block the opponent's
+        for side in (me, me ^ 1):
+            for cell in board.empty_cells():
+                if board.wins_with(cell, side):
+                    return board.row_col(cell)
+        
+        self._start_table(board)
+        return board.row_col(self._search(board))
+    
+    def _start_table(self, board: BitBoard):
+        """
+        Get the process's transposition table for this player's search
+        settings, replacing it with one sized for board if its shape differs
+        """
+        settings = (self.win_score, type(self)._evaluate_position)
+        shape = (board.size, board.win_length)
+        entry = _TABLES.get(settings)
+        if entry is None or entry[0] != shape:
+            entry = (shape, TranspositionTable(self.table_capacity or table_capacity(board.size)))
+            _TABLES[settings] = entry
+        self.transpositions = entry[1]
+    
+    def _order_moves(self, board: BitBoard, depth: int, tt_cell: Optional[int]) -> List[int]:
+        """
+        Order a position's moves: the transposition table's best move, then
+        this depth's killer moves, then by history score and by the number
+        of win lines through the cell (center first, then corners on 3x3)
+        """
+        cells = candidate_cells(board, self.full_width_cells)
+        if not self.move_ordering:
+            return cells
+        history = self._history[board.side]
+        lines = board.cell_lines
+        cells.sort(key=lambda cell: (history[cell], len(lines[cell])), reverse=True)
+        for cell in reversed(self._killers[depth]):
+            if cell in cells:
+                cells.remove(cell)
+                cells.insert(0, cell)
+        if tt_cell in cells:
+            cells.remove(tt_cell)
+            cells.insert(0, tt_cell)
+        return cells
+    
+    def _search(self, board: BitBoard) -> int:
+        """
+        Iterative-deepening alpha-beta search from the root, returning the
+        best cell of the deepest iteration completed within time_limit
+        """
+        cells = candidate_cells(board, self.full_width_cells)
+        if self.move_ordering:
+            lines = board.cell_lines
+            cells.sort(key=lambda cell: len(lines[cell]), reverse=True)
+        empties = popcount(board.empty)
+        last_depth = empties - 1 if self.max_depth is None else min(self.max_depth, empties - 1)
+        threshold = self.win_score - board.n_cells - 1
+        self._deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+        self._root_best = None
+        # Two killer moves per depth, and a history score per side and cell
+        self._killers = [[None, None] for _ in range(board.n_cells + 1)]
+        self._history = [[0] * board.n_cells, [0] * board.n_cells]
+        best_cell = None
+        
+        for depth_limit in range(last_depth + 1):
+            self._depth_limit = depth_limit
+            base = len(board.stack)
+            try:
+                score, cell = self._search_root(board, cells)
+            except SearchTimeout:
+                # Unwind the interrupted iteration and keep the last completed one
+                while len(board.stack) > base:
+                    board.pop()
+                break
+            best_cell = cell
+            self.depth_reached = depth_limit
+            if abs(score) > threshold:
+                break  # A forced win or loss was found; deeper search cannot change it
+            if self.move_ordering:
+                # Search the best move of this iteration first in the next one
+                cells.remove(cell)
+                cells.insert(0, cell)
+        
+        if best_cell is None:
+            best_cell = self._root_best if self._root_best is not None else cells[0]
+        return best_cell
+    
+    def _search_root(self, board: BitBoard, cells: List[int]) -> Tuple[float, int]:
+        """Search every root move to the current depth limit"""
+        best_score = float('-inf')
+        best_cell = None
+        for cell in cells:
             # Use minimax for deeper analysis
-            game.board[row][col] = self.player_symbol
-            score = self._minimax(game, 0, False, float('-inf'), float('inf'))
-            game.board[row][col] = ' '  # Undo move
+            board.push(cell)
+            score = -self._negamax(board, 0, float('-inf'), -best_score)
+            board.pop()
             
             if score > best_score:
                 best_score = score
-                best_move = move
-        
-        return best_move if best_move else game.get_available_moves()[0]
+                best_cell = cell
+                if self._root_best is None:
+                    self._root_best = cell
+        return best_score, best_cell
     
-    def _minimax(self, game: TicTacToe, depth: int, is_maximizing: bool, 
-                 alpha: float, beta: float) -> float:
-        """Minimax algorithm with alpha-beta pruning"""
-        # Terminal states
-        if game.game_over:
-            if game.winner == self.player_symbol:
-                return 10 - depth
-            elif game.winner == 'Draw':
-                return 0
-            else:
-                return depth - 10
+    def _negamax(self, board: BitBoard, depth: int, alpha: float, beta: float) -> float:
+        """
+        Alpha-beta search scoring the position for the side to move, with
+        results cached in the transposition table under the canonical key
+        """
+        self.nodes += 1
+        if self._deadline is not None and not self.nodes & 63 and time.perf_counter() > self._deadline:
+            raise SearchTimeout()
+        
+        # Terminal states: the last move won, or filled the board
+        if board.last_move_won():
+            return depth - self.win_score  # The side to move lost; prefer slower losses
+        if board.is_full():
+            return 0
+        
+        if depth > self._depth_limit:
+            return self._evaluate_position(board, board.side)
+        draft = self._depth_limit - depth + 1
+        
+        key, transform = canonical_key(board)
+        entry = self.transpositions.probe(key)
+        tt_cell = None
+        alpha_orig = alpha
+        if entry is not None:
+            entry_draft, kind, value, move = entry
+            if move is not None:
+                tt_cell = from_canonical_cell(board.size, transform, move)
+            if entry_draft >= draft:
+                value = self._from_table(value, depth, board)
+                # Bounds only end the search when they fall outside the window
+                if (kind == EXACT or (kind == LOWER and value >= beta)
+                        or (kind == UPPER and value <= alpha)):
+                    return value
         
-        if is_maximizing:
-            max_eval = float('-inf')
-            for move in game.get_available_moves():
-                row, col = move
-                game.board[row][col] = self.player_symbol
-                eval_score = self._minimax(game, depth + 1, False, alpha, beta)
-                game.board[row][col] = ' '  # Undo move
-                max_eval = max(max_eval, eval_score)
-                alpha = max(alpha, eval_score)
-                if beta <= alpha:
-                    break
-            return max_eval
+        best = float('-inf')
+        best_cell = None
+        self.expanded += 1
+        for index, cell in enumerate(self._order_moves(board, depth, tt_cell)):
+            board.push(cell)
+            score = -self._negamax(board, depth + 1, -beta, -alpha)
+            board.pop()
+            if score > best:
+                best = score
+                best_cell = cell
+            alpha = max(alpha, score)
+            if alpha >= beta:
+                self._record_cutoff(board, depth, draft, cell, index)
+                break
+        
+        if best <= alpha_orig:
+            kind = UPPER
+        elif best >= beta:
+            kind = LOWER
         else:
-            min_eval = float('inf')
-            opponent_symbol = 'O' if self.player_symbol == 'X' else 'X'
-            for move in game.get_available_moves():
-                row, col = move
-                game.board[row][col] = opponent_symbol
-                eval_score = self._minimax(game, depth + 1, True, alpha, beta)
-                game.board[row][col] = ' '  # Undo move
-                min_eval = min(min_eval, eval_score)
-                beta = min(beta, eval_score)
-                if beta <= alpha:
-                    break
-            return min_eval
+            kind = EXACT
+        self.transpositions.store(key, draft, kind, self._to_table(best, depth, board),
+                                  to_canonical_cell(board.size, transform, best_cell))
+        return best
+    
+    def _record_cutoff(self, board: BitBoard, depth: int, draft: int, cell: int, index: int):
+        """Count a beta cutoff and remember its move as a killer and in the history table"""
+        self.cutoffs += 1
+        if index == 0:
+            self.first_move_cutoffs += 1
+        killers = self._killers[depth]
+        if cell != killers[0]:
+            killers[1] = killers[0]
+            killers[0] = cell
+        self._history[board.side][cell] += draft * draft
+    
+    def _evaluate_position(self, board: BitBoard, side: int) -> float:
+        """Score a non-terminal position for side at the search horizon"""
+        return 0
+    
+    def _to_table(self, value: float, depth: int, board: BitBoard) -> float:
+        """Make a win/loss score relative to the node before storing it"""
+        threshold = self.win_score - board.n_cells - 1
+        if value > threshold:
+            return value + depth
+        if value < -threshold:
+            return value - depth
+        return value
+    
+    def _from_table(self, value: float, depth: int, board: BitBoard) -> float:
+        """Turn a stored node-relative win/loss score back into a score at depth"""
+        threshold = self.win_score - board.n_cells - 1
+        if value > threshold:
+            return value - depth
+        if value < -threshold:
+            return value + depth
+        return value
 
 class SmartAIPlayer(AIPlayer):
     """Enhanced AI player with additional strategies"""
     
-    def __init__(self, difficulty: str = "unbeatable"):
-        super().__init__(difficulty)
+    # Early termination for efficiency
+    max_depth = 6
+    
+    def __init__(self, difficulty: str = "unbeatable", time_limit: Optional[float] = None):
+        super().__init__(difficulty, time_limit)
         self.opening_moves = [(0, 0), (0, 2), (2, 0), (2, 2), (1, 1)]
     
     def _smart_move(self, game: TicTacToe) -> Tuple[int, int]:
         """Enhanced smart move with opening strategy"""
         available_moves = game.get_available_moves()
         
-        # If it's the first move, prefer corners and center
+        # If it's the first move, prefer corners and center (only the center on larger boards)
         if len(game.moves_history) == 0:
+            if game.size != 3:
+                return (game.size // 2, game.size // 2)
             corner_moves = [move for move in available_moves if move in self.opening_moves]
             if corner_moves:
                 return random.choice(corner_moves)
         
-        # Check for immediate win
-        for move in available_moves:
-            row, col = move
-            game.board[row][col] = self.player_symbol
-            if game.check_win(row, col):
-                game.board[row][col] = ' '
-                return move
-            game.board[row][col] = ' '
-        
-        # Check for opponent's immediate win (block)
-        opponent_symbol = 'O' if self.player_symbol == 'X' else 'X'
-        for move in available_moves:
-            row, col = move
-            game.board[row][col] = opponent_symbol
-            if game.check_win(row, col):
-                game.board[row][col] = ' '
-                return move
-            game.board[row][col] = ' '
-        
-        # Use minimax for deeper analysis
+        # Win/block checks and minimax
         return super()._smart_move(game)
     
-    def _minimax(self, game: TicTacToe, depth: int, is_maximizing: bool, 
-                 alpha: float, beta: float) -> float:
-        """Enhanced minimax with better evaluation"""
-        # Terminal states
-        if game.game_over:
-            if game.winner == self.player_symbol:
-                return 100 - depth  # Prefer faster wins
-            elif game.winner == 'Draw':
-                return 0
-            else:
-                return depth - 100  # Prefer slower losses
-        
-        # Early termination for efficiency
-        if depth > 6:
-            return self._evaluate_position(game)
-        
-        if is_maximizing:
-            max_eval = float('-inf')
-            for move in game.get_available_moves():
-                row, col = move
-                game.board[row][col] = self.player_symbol
-                eval_score = self._minimax(game, depth + 1, False, alpha, beta)
-                game.board[row][col] = ' '
-                max_eval = max(max_eval, eval_score)
-                alpha = max(alpha, eval_score)
-                if beta <= alpha:
-                    break
-            return max_eval
-        else:
-            min_eval = float('inf')
-            opponent_symbol = 'O' if self.player_symbol == 'X' else 'X'
-            for move in game.get_available_moves():
-                row, col = move
-                game.board[row][col] = opponent_symbol
-                eval_score = self._minimax(game, depth + 1, True, alpha, beta)
-                game.board[row][col] = ' '
-                min_eval = min(min_eval, eval_score)
-                beta = min(beta, eval_score)
-                if beta <= alpha:
-                    break
-            return min_eval
+    def _search_board(self, game: TicTacToe) -> BitBoard:
+        """Copy the game's bitboard for searching, tracking the line scores it evaluates"""
+        board = super()._search_board(game)
+        board.track_lines(self._line_scores(board.win_length))
+        return board
     
-    def _evaluate_position(self, game: TicTacToe) -> float:
-        """Evaluate board position for non-terminal states"""
-        score = 0
-        
-        # Evaluate rows, columns, and diagonals
-        lines = [
-            # Rows
-            [(0, 0), (0, 1), (0, 2)],
-            [(1, 0), (1, 1), (1, 2)],
-            [(2, 0), (2, 1), (2, 2)],
-            # Columns
-            [(0, 0), (1, 0), (2, 0)],
-            [(0, 1), (1, 1), (2, 1)],
-            [(0, 2), (1, 2), (2, 2)],
-            # Diagonals
-            [(0, 0), (1, 1), (2, 2)],
-            [(0, 2), (1, 1), (2, 0)]
-        ]
-        
-        for line in lines:
-            line_score = self._evaluate_line(game, line)
-            score += line_score
-        
-        return score
+    def _evaluate_position(self, board: BitBoard, side: int) -> float:
+        """Evaluate board position for non-terminal states from the incrementally kept line score"""
+        return board.score if side == 0 else -board.score
     
-    def _evaluate_line(self, game: TicTacToe, line: list) -> float:
-        """Evaluate a single line (row, column, or diagonal)"""
-        player_count = 0
-        opponent_count = 0
-        empty_count = 0
-        opponent_symbol = 'O' if self.player_symbol == 'X' else 'X'
-        
-        for row, col in line:
-            cell = game.board[row][col]
-            if cell == self.player_symbol:
-                player_count += 1
-            elif cell == opponent_symbol:
-                opponent_count += 1
-            else:
-                empty_count += 1
-        
-        # Scoring logic
-        if player_count == 2 and empty_count == 1:
-            return 10  # Two in a row with space
-        elif opponent_count == 2 and empty_count == 1:
-            return -10  # Opponent has two in a row
-        elif player_count == 1 and empty_count == 2:
-            return 1  # One with two spaces
-        elif opponent_count == 1 and empty_count == 2:
-            return -1  # Opponent has one with two spaces
+    @staticmethod
+    def _line_scores(win_length: int) -> List[List[int]]:
+        """
+        Score of a line by its (X stones, O stones), from X's side
         
-        return 0 
\ No newline at end of file
+        A line only one side can still complete is worth 1, 10, 100... for
+        1, 2, 3... of its stones (on 3x3: one with two spaces is 1, two in a
+        row with space is 10); lines holding both or neither are worth 0.
+        """
+        if win_length not in _LINE_SCORES:
+            table = [[0] * (win_length + 1) for _ in range(win_length + 1)]
+            for count in range(1, win_length + 1):
+                table[count][0] = 10 ** (count - 1)
+                table[0][count] = -10 ** (count - 1)
+            _LINE_SCORES[win_length] = table
+        return _LINE_SCORES[win_length]
\ No newline at end of file
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Batch Tic Tac Toe environment
+This module keeps many boards in NumPy arrays and advances all of them by
+one move per step: wins are found from per-line stone counts updated for
+every board at once, and finished boards start a new game straight away.
+Policies choose the moves of a subset of the boards, so vectorized
+policies and the existing AI players can drive the same batch. Running it
+as a script compares random self-play against one TicTacToe at a time.
+"""
+
+import time
+import random
+import argparse
+import numpy as np
+from abc import ABC, abstractmethod
+from typing import List, Optional, Tuple
+from game_logic import TicTacToe, DRAW, X_WINS, O_WINS
+from ai_player import AIPlayer
+from bitboard import SYMBOLS, win_line_masks
+
+# Result of a board whose game is still being played
+ONGOING = -1
+# Result of a board that had already finished (without auto_reset) and was not played
+FINISHED = -2
+
+
+class BatchTicTacToe:
+    """
+    n_boards games of Tic Tac Toe stored as arrays.
+
+    cells[b, cell] is 0 for empty, 1 for X and 2 for O; side[b] is the side
+    to move (0 = X, 1 = O); line_counts[b, side, line] counts that side's
+    stones on each win line; moves[b, :n_moves[b]] are the cells played.
+    Without auto_reset, done[b] marks a finished board waiting for reset().
+    """
+
+    def __init__(self, n_boards: int, size: int = 3, win_length: Optional[int] = None,
+                 auto_reset: bool = True):
+        self.n_boards = n_boards
+        self.size = size
+        self.win_length = win_length or size
+        self.n_cells = size * size
+        self.auto_reset = auto_reset
+        lines = win_line_masks(size, self.win_length)
+        # cell_lines[cell, line] is 1 when the line passes through the cell
+        self.cell_lines = np.array([[line >> cell & 1 for line in lines] for cell in range(self.n_cells)],
+                                   dtype=np.int16)
+        self.cells = np.zeros((n_boards, self.n_cells), dtype=np.int8)
+        self.line_counts = np.zeros((n_boards, 2, len(lines)), dtype=np.int16)
+        self.side = np.zeros(n_boards, dtype=np.int8)
+        self.n_moves = np.zeros(n_boards, dtype=np.int16)
+        self.moves = np.zeros((n_boards, self.n_cells), dtype=np.int16)
+        self.done = np.zeros(n_boards, dtype=bool)
+        # Finished games by result (DRAW, X_WINS, O_WINS)
+        self.results = np.zeros(3, dtype=np.int64)
+
+    @property
+    def games_played(self) -> int:
+        return int(self.results.sum())
+
+    def reset(self, boards: Optional[np.ndarray] = None):
+        """Clear some boards (all of them by default) for a new game"""
+        if boards is None:
+            boards = slice(None)
+        self.cells[boards] = 0
+        self.line_counts[boards] = 0
+        self.side[boards] = 0
+        self.n_moves[boards] = 0
+        self.done[boards] = False
+
+    def legal_moves(self, boards: Optional[np.ndarray] = None) -> np.ndarray:
+        """Get a (boards, cells) mask of the empty cells"""
+        cells = self.cells if boards is None else self.cells[boards]
+        return cells == 0
+
+    def winning_moves(self, boards: np.ndarray, side: np.ndarray) -> np.ndarray:
+        """Get a (boards, cells) mask of the empty cells where side would complete a line"""
+        counts = self.line_counts[boards, side]
+        blocked = self.line_counts[boards, side ^ 1]
+        open_lines = (counts == self.win_length - 1) & (blocked == 0)
+        return (open_lines.astype(np.int16) @ self.cell_lines.T > 0) & self.legal_moves(boards)
+
+    def step(self, cells: np.ndarray) -> np.ndarray:
+        """
+        Play one move on every unfinished board, cells[b] for board b
+
+        Returns each board's result: ONGOING, or DRAW, X_WINS or O_WINS for
+        a game the move finished. With auto_reset the finished board is
+        cleared again; otherwise it is marked done and left as it is, its
+        cell ignored and its result FINISHED, until reset().
+        """
+        results = np.full(self.n_boards, FINISHED, dtype=np.int8)
+        boards = np.flatnonzero(~self.done)
+        cells = np.asarray(cells)[boards]
+        if not (self.cells[boards, cells] == 0).all():
+            raise ValueError("Cannot play on an occupied cell")
+        side = self.side[boards]
+        n_moves = self.n_moves[boards]
+        self.cells[boards, cells] = side + 1
+        self.moves[boards, n_moves] = cells
+        n_moves += 1
+        self.n_moves[boards] = n_moves
+        self.line_counts[boards, side] += self.cell_lines[cells]
+
+        won = (self.line_counts[boards, side] == self.win_length).any(axis=1)
+        played = np.full(len(boards), ONGOING, dtype=np.int8)
+        played[won] = np.where(side[won] == 0, X_WINS, O_WINS)
+        played[~won & (n_moves == self.n_cells)] = DRAW
+        self.side[boards] = side ^ 1
+        results[boards] = played
+
+        finished = played != ONGOING
+        self.results += np.bincount(played[finished], minlength=3)
+        if finished.any():
+            if self.auto_reset:
+                self.reset(boards[finished])
+            else:
+                self.done[boards[finished]] = True
+        return results
+
+    def to_game(self, board: int) -> TicTacToe:
+        """Replay one board's moves into a TicTacToe game"""
+        game = TicTacToe(self.size, self.win_length)
+        for cell in self.moves[board, :self.n_moves[board]]:
+            game.make_move(*divmod(int(cell), self.size))
+        return game
+
+
+class BatchPolicy(ABC):
+    """Chooses the moves of a subset of an environment's boards"""
+
+    @abstractmethod
+    def select(self, env: BatchTicTacToe, boards: np.ndarray) -> np.ndarray:
+        """Get one legal cell for each of the given boards"""
+
+
+class RandomPolicy(BatchPolicy):
+    """Easy difficulty: a uniformly random empty cell, for all boards at once"""
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = np.random.default_rng(seed)
+
+    def select(self, env: BatchTicTacToe, boards: np.ndarray) -> np.ndarray:
+        scores = self.rng.random((len(boards), env.n_cells))
+        scores[~env.legal_moves(boards)] = -1
+        return scores.argmax(axis=1)
+
+
+class ThreatPolicy(RandomPolicy):
+    """
+    Take a winning cell, otherwise block the opponent's, otherwise play at
+    random; smart_rate < 1 plays the random cell anyway on that share of moves
+    """
+
+    def __init__(self, smart_rate: float = 1.0, seed: Optional[int] = None):
+        super().__init__(seed)
+        self.smart_rate = smart_rate
+
+    def select(self, env: BatchTicTacToe, boards: np.ndarray) -> np.ndarray:
+        side = env.side[boards]
+        scores = self.rng.random((len(boards), env.n_cells))
+        scores[~env.legal_moves(boards)] = -1
+        smart = self.rng.random(len(boards)) < self.smart_rate
+        scores[env.winning_moves(boards, side ^ 1) & smart[:, None]] += 1
+        scores[env.winning_moves(boards, side) & smart[:, None]] += 2
+        return scores.argmax(axis=1)
+
+
+class PlayerPolicy(BatchPolicy):
+    """Ask an AIPlayer (any class and difficulty) for the move of each board in turn"""
+
+    def __init__(self, player: AIPlayer):
+        self.player = player
+
+    def select(self, env: BatchTicTacToe, boards: np.ndarray) -> np.ndarray:
+        cells = np.empty(len(boards), dtype=np.int64)
+        for i, board in enumerate(boards):
+            game = env.to_game(board)
+            self.player.set_player_symbol(game.current_player)
+            row, col = self.player.get_move(game)
+            cells[i] = row * env.size + col
+        return cells
+
+
+def difficulty_policy(difficulty: str, player_class=AIPlayer, seed: Optional[int] = None,
+                      time_limit: Optional[float] = None) -> BatchPolicy:
+    """Get the policy of a difficulty level: vectorized for "easy", the AI player otherwise"""
+    if difficulty == "easy":
+        return RandomPolicy(seed)
+    return PlayerPolicy(player_class(difficulty, time_limit=time_limit))
+
+
+def play_games(env: BatchTicTacToe, x_policy: BatchPolicy, o_policy: BatchPolicy, n_games: int) -> np.ndarray:
+    """
+    Step the environment until at least n_games more games finish (or, without
+    auto_reset, every board is done); returns their (draws, X wins, O wins)
+    """
+    start = env.results.copy()
+    cells = np.zeros(env.n_boards, dtype=np.int64)
+    while env.games_played - start.sum() < n_games and not env.done.all():
+        x_boards = np.flatnonzero((env.side == 0) & ~env.done)
+        o_boards = np.flatnonzero((env.side == 1) & ~env.done)
+        if len(x_boards):
+            cells[x_boards] = x_policy.select(env, x_boards)
+        if len(o_boards):
+            cells[o_boards] = o_policy.select(env, o_boards)
+        env.step(cells)
+    return env.results - start
+
+
+def play_single_random(n_games: int, size: int = 3, win_length: Optional[int] = None) -> List[int]:
+    """Play random games one TicTacToe at a time, for comparison; returns (draws, X wins, O wins)"""
+    counts = [0, 0, 0]
+    game = TicTacToe(size, win_length)
+    for _ in range(n_games):
+        game.reset_game()
+        while not game.game_over:
+            game.make_move(*random.choice(game.get_available_moves()))
+        counts[DRAW if game.winner == 'Draw' else X_WINS + SYMBOLS.index(game.winner)] += 1
+    return counts
+
+
+def _games_per_sec(play) -> Tuple[np.ndarray, float]:
+    start_time = time.perf_counter()
+    counts = play()
+    return np.asarray(counts), time.perf_counter() - start_time
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--games', type=int, default=100000)
+    parser.add_argument('--boards', type=int, default=4096, help="boards advanced per step")
+    parser.add_argument('--size', type=int, default=3)
+    parser.add_argument('--win-length', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    n_single = max(1, args.games // 10)
+    rows = [
+        ("TicTacToe, random", n_single, lambda: play_single_random(n_single, args.size, args.win_length)),
+        ("batch, random", args.games, lambda: play_games(
+            BatchTicTacToe(args.boards, args.size, args.win_length),
+            RandomPolicy(args.seed), RandomPolicy(args.seed + 1), args.games)),
+        ("batch, win/block", args.games, lambda: play_games(
+            BatchTicTacToe(args.boards, args.size, args.win_length),
+            ThreatPolicy(seed=args.seed), ThreatPolicy(seed=args.seed + 1), args.games)),
+    ]
+    print(f"{'engine':<20}{'games':>10}{'games/sec':>12}{'X wins':>9}{'O wins':>9}{'draws':>8}")
+    for name, n_games, play in rows:
+        counts, seconds = _games_per_sec(play)
+        total = counts.sum()
+        print(f"{name:<20}{total:>10,}{total / seconds:>12,.0f}{counts[X_WINS] / total:>9.1%}"
+              f"{counts[O_WINS] / total:>9.1%}{counts[DRAW] / total:>8.1%}")
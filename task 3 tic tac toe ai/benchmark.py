@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the Tic Tac Toe AI search
+This script plays the opening moves of AI vs AI games on several board
+sizes, with and without move ordering, and reports the nodes searched per
+second, the depth reached within the per-move time budget and how often
+the search cut off (and cut off on the first move it tried).
+"""
+
+import argparse
+import random
+import time
+from game_logic import TicTacToe
+from ai_player import SmartAIPlayer, clear_tables
+
+# (board size, stones in a row to win)
+BOARDS = [(3, 3), (4, 4), (5, 4), (15, 5)]
+
+def play_moves(size, win_length, n_moves, time_limit, move_ordering=True):
+    """Play up to n_moves of an AI vs AI game and collect per-move search statistics"""
+    clear_tables()
+    game = TicTacToe(size, win_length)
+    players = {}
+    for symbol in ('X', 'O'):
+        players[symbol] = SmartAIPlayer('unbeatable', time_limit=time_limit)
+        players[symbol].set_player_symbol(symbol)
+        players[symbol].move_ordering = move_ordering
+
+    moves = []
+    while not game.game_over and len(moves) < n_moves:
+        player = players[game.current_player]
+        start_time = time.perf_counter()
+        row, col = player.get_move(game)
+        elapsed = time.perf_counter() - start_time
+        game.make_move(row, col)
+        moves.append((player.nodes, elapsed, player.depth_reached,
+                      player.expanded, player.cutoffs, player.first_move_cutoffs))
+    return moves
+
+def run_benchmark(n_moves=8, time_limit=1.0):
+    """Report nodes/sec, move time, depth reached and cutoff rates for every board size"""
+    print(f"{'board':<14}{'ordering':>9}{'moves':>6}{'nodes':>10}{'nodes/sec':>12}{'ms/move':>10}"
+          f"{'max depth':>11}{'cutoffs':>9}{'1st move':>10}")
+    for size, win_length in BOARDS:
+        for move_ordering in (False, True):
+            random.seed(42)
+            moves = play_moves(size, win_length, n_moves, time_limit, move_ordering)
+            nodes = sum(move[0] for move in moves)
+            seconds = sum(move[1] for move in moves)
+            depth = max(move[2] for move in moves) + 2  # Plies, counting the root move and its reply
+            expanded, cutoffs, first_move = (sum(move[i] for move in moves) for i in (3, 4, 5))
+            board = f"{size}x{size} ({win_length})"
+            print(f"{board:<14}{'on' if move_ordering else 'off':>9}{len(moves):>6}{nodes:>10,}"
+                  f"{nodes / seconds:>12,.0f}{seconds * 1000 / len(moves):>10.1f}{depth:>11}"
+                  f"{cutoffs / max(expanded, 1):>9.0%}{first_move / max(cutoffs, 1):>10.0%}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--moves', type=int, default=8)
+    parser.add_argument('--time-limit', type=float, default=1.0)
+    args = parser.parse_args()
+    run_benchmark(args.moves, args.time_limit)
@@ -0,0 +1,304 @@
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Symbols of the two sides and of an empty cell
+SYMBOLS = ('X', 'O')
+EMPTY = ' '
+
+# Boards with more cells only consider the empty cells next to a stone
+FULL_WIDTH_CELLS = 16
+
+# Win-line masks per (size, win_length), shared by every board of that shape
+_line_masks: Dict[Tuple[int, int], List[int]] = {}
+_cell_lines: Dict[Tuple[int, int], List[List[int]]] = {}
+_cell_line_ids: Dict[Tuple[int, int], List[List[int]]] = {}
+
+
+def popcount(mask: int) -> int:
+    """Count the set bits of a mask"""
+    return bin(mask).count('1')
+
+
+def iter_bits(mask: int) -> Iterator[int]:
+    """Yield the indices of the set bits of a mask, lowest first"""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def win_line_masks(size: int, win_length: int) -> List[int]:
+    """Get the masks of every run of win_length cells in a row, column or diagonal"""
+    key = (size, win_length)
+    if key not in _line_masks:
+        masks = []
+        directions = [(0, 1), (1, 0), (1, 1), (1, -1)]
+        for row in range(size):
+            for col in range(size):
+                for d_row, d_col in directions:
+                    end_row = row + d_row * (win_length - 1)
+                    end_col = col + d_col * (win_length - 1)
+                    if 0 <= end_row < size and 0 <= end_col < size:
+                        mask = 0
+                        for step in range(win_length):
+                            mask |= 1 << ((row + d_row * step) * size + col + d_col * step)
+                        masks.append(mask)
+        _line_masks[key] = masks
+    return _line_masks[key]
+
+
+def cell_line_masks(size: int, win_length: int) -> List[List[int]]:
+    """Get, for every cell, the masks of the win lines passing through it"""
+    key = (size, win_length)
+    if key not in _cell_lines:
+        lines = win_line_masks(size, win_length)
+        _cell_lines[key] = [[line for line in lines if line >> cell & 1]
+                            for cell in range(size * size)]
+    return _cell_lines[key]
+
+
+def cell_line_indices(size: int, win_length: int) -> List[List[int]]:
+    """Get, for every cell, the indices in win_line_masks of the lines passing through it"""
+    key = (size, win_length)
+    if key not in _cell_line_ids:
+        lines = win_line_masks(size, win_length)
+        _cell_line_ids[key] = [[i for i, line in enumerate(lines) if line >> cell & 1]
+                               for cell in range(size * size)]
+    return _cell_line_ids[key]
+
+
+class BitBoard:
+    """
+    Board stored as one integer bit mask per side (bit row * size + col).
+
+    push()/pop() place and remove a stone of the side to move, so a search
+    can make and unmake moves without copying the board. After
+    track_lines(), every stone change also updates the per-line stone counts
+    and the running line score of the lines through that cell.
+    """
+
+    def __init__(self, size: int = 3, win_length: Optional[int] = None):
+        self.size = size
+        self.win_length = win_length or size
+        self.n_cells = size * size
+        self.full_mask = (1 << self.n_cells) - 1
+        self.first_col = sum(1 << row * size for row in range(size))
+        self.last_col = self.first_col << (size - 1)
+        self.line_masks = win_line_masks(size, self.win_length)
+        self.cell_lines = cell_line_masks(size, self.win_length)
+        self.cell_line_ids = cell_line_indices(size, self.win_length)
+        self.masks = [0, 0]
+        self.side = 0
+        self.stack: List[int] = []
+        # Set by track_lines(): line_counts[side][line] and the sum of line_scores over lines
+        self.line_scores: Optional[List[List[int]]] = None
+        self.line_counts: Optional[List[List[int]]] = None
+        self.score = 0
+
+    def copy(self) -> 'BitBoard':
+        """Copy the stones and side to move (the move stack starts empty)"""
+        board = BitBoard.__new__(BitBoard)
+        board.__dict__.update(self.__dict__)
+        board.masks = self.masks[:]
+        board.stack = []
+        if self.line_counts is not None:
+            board.line_counts = [self.line_counts[0][:], self.line_counts[1][:]]
+        return board
+
+    def track_lines(self, line_scores: List[List[int]]):
+        """
+        Keep per-line stone counts and score = the sum over lines of
+        line_scores[X stones][O stones], updated as stones are placed and removed
+        """
+        self.line_scores = line_scores
+        self.line_counts = [[popcount(self.masks[side] & line) for line in self.line_masks]
+                            for side in (0, 1)]
+        self.score = sum(line_scores[x][o] for x, o in zip(*self.line_counts))
+
+    def _update_lines(self, cell: int, side: int, delta: int):
+        """Add delta stones of side to the counts and score of the lines through cell"""
+        x_counts, o_counts = self.line_counts
+        counts = self.line_counts[side]
+        scores = self.line_scores
+        score = self.score
+        for line in self.cell_line_ids[cell]:
+            score -= scores[x_counts[line]][o_counts[line]]
+            counts[line] += delta
+            score += scores[x_counts[line]][o_counts[line]]
+        self.score = score
+
+    def cell(self, row: int, col: int) -> int:
+        """Get the cell index of a row and column"""
+        return row * self.size + col
+
+    def row_col(self, cell: int) -> Tuple[int, int]:
+        """Get the row and column of a cell index"""
+        return divmod(cell, self.size)
+
+    @property
+    def occupied(self) -> int:
+        return self.masks[0] | self.masks[1]
+
+    @property
+    def empty(self) -> int:
+        return self.full_mask & ~(self.masks[0] | self.masks[1])
+
+    def empty_cells(self) -> Iterator[int]:
+        """Yield the empty cells in index order"""
+        return iter_bits(self.empty)
+
+    def near_cells(self) -> Iterator[int]:
+        """Yield the empty cells next to a stone in any direction, in index order"""
+        occupied = self.occupied
+        # Spread the stones one column each way (without wrapping rows), then one row each way
+        spread = occupied | ((occupied >> 1) & ~self.last_col) | ((occupied << 1) & ~self.first_col)
+        spread |= (spread >> self.size) | (spread << self.size)
+        return iter_bits(spread & self.empty)
+
+    def get(self, cell: int) -> Optional[int]:
+        """Get the side owning a cell, or None if it is empty"""
+        bit = 1 << cell
+        if self.masks[0] & bit:
+            return 0
+        if self.masks[1] & bit:
+            return 1
+        return None
+
+    def set(self, cell: int, side: Optional[int]):
+        """Put a stone of side on a cell (None clears it)"""
+        if self.line_counts is not None:
+            owner = self.get(cell)
+            if owner is not None:
+                self._update_lines(cell, owner, -1)
+            if side is not None:
+                self._update_lines(cell, side, 1)
+        bit = 1 << cell
+        self.masks[0] &= ~bit
+        self.masks[1] &= ~bit
+        if side is not None:
+            self.masks[side] |= bit
+
+    def push(self, cell: int):
+        """Place a stone of the side to move and pass the turn"""
+        self.masks[self.side] |= 1 << cell
+        if self.line_counts is not None:
+            self._update_lines(cell, self.side, 1)
+        self.stack.append(cell)
+        self.side ^= 1
+
+    def pop(self) -> int:
+        """Take back the last pushed move"""
+        cell = self.stack.pop()
+        self.side ^= 1
+        self.masks[self.side] &= ~(1 << cell)
+        if self.line_counts is not None:
+            self._update_lines(cell, self.side, -1)
+        return cell
+
+    def is_win(self, side: int) -> bool:
+        """Check whether a side has a complete line"""
+        stones = self.masks[side]
+        return any(stones & line == line for line in self.line_masks)
+
+    def wins_with(self, cell: int, side: int) -> bool:
+        """Check whether a stone of side on cell completes a line (placed or not)"""
+        stones = self.masks[side] | 1 << cell
+        return any(stones & line == line for line in self.cell_lines[cell])
+
+    def last_move_won(self) -> bool:
+        """Check whether the last pushed move completed a line"""
+        return bool(self.stack) and self.wins_with(self.stack[-1], self.side ^ 1)
+
+    def is_full(self) -> bool:
+        return self.occupied == self.full_mask
+
+    def get_symbol(self, cell: int) -> str:
+        side = self.get(cell)
+        return EMPTY if side is None else SYMBOLS[side]
+
+    def set_symbol(self, cell: int, symbol: str):
+        self.set(cell, SYMBOLS.index(symbol) if symbol in SYMBOLS else None)
+
+
+def candidate_cells(board: BitBoard, full_width_cells: int = FULL_WIDTH_CELLS) -> List[int]:
+    """
+    Get the moves a search considers: every empty cell, or on boards over
+    full_width_cells cells the center of an empty board and otherwise the
+    empty cells next to a stone
+    """
+    if board.n_cells <= full_width_cells:
+        return list(board.empty_cells())
+    if not board.occupied:
+        return [board.cell(board.size // 2, board.size // 2)]
+    return list(board.near_cells())
+
+
+class _RowView:
+    """One row of a BoardView"""
+
+    def __init__(self, board: BitBoard, row: int):
+        self._board = board
+        self._start = row * board.size
+
+    def __len__(self) -> int:
+        return self._board.size
+
+    def __getitem__(self, col):
+        if isinstance(col, slice):
+            return [self[i] for i in range(self._board.size)[col]]
+        if col < 0:
+            col += self._board.size
+        if not 0 <= col < self._board.size:
+            raise IndexError("board column out of range")
+        return self._board.get_symbol(self._start + col)
+
+    def __setitem__(self, col: int, symbol: str):
+        if col < 0:
+            col += self._board.size
+        if not 0 <= col < self._board.size:
+            raise IndexError("board column out of range")
+        self._board.set_symbol(self._start + col, symbol)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self[:])
+
+    def __eq__(self, other) -> bool:
+        return list(self) == list(other)
+
+    def __repr__(self) -> str:
+        return repr(self[:])
+
+
+class BoardView:
+    """
+    List-of-lists view of a BitBoard: board[row][col] reads and writes the
+    symbols 'X', 'O' and ' ' straight from the bit masks.
+    """
+
+    def __init__(self, board: BitBoard):
+        self._board = board
+
+    def __len__(self) -> int:
+        return self._board.size
+
+    def __getitem__(self, row):
+        if isinstance(row, slice):
+            return [self[i] for i in range(self._board.size)[row]]
+        if row < 0:
+            row += self._board.size
+        if not 0 <= row < self._board.size:
+            raise IndexError("board row out of range")
+        return _RowView(self._board, row)
+
+    def __setitem__(self, row: int, symbols: List[str]):
+        row_view = self[row]
+        for col, symbol in enumerate(symbols):
+            row_view[col] = symbol
+
+    def __iter__(self) -> Iterator[_RowView]:
+        return iter(self[:])
+
+    def __eq__(self, other) -> bool:
+        return [list(row) for row in self] == [list(row) for row in other]
+
+    def __repr__(self) -> str:
+        return repr([row[:] for row in self])
@@ -1,18 +1,45 @@
 import random
 from typing import List, Tuple, Optional
+from bitboard import BitBoard, BoardView
+
+# Results of a finished game, as counted and stored by tournaments and batch play
+DRAW, X_WINS, O_WINS = 0, 1, 2
 
 class TicTacToe:
-    def __init__(self):
-        """Initialize a new Tic Tac Toe game"""
-        self.board = [[' ' for _ in range(3)] for _ in range(3)]
+    def __init__(self, size: int = 3, win_length: Optional[int] = None):
+        """
+        Initialize a new Tic Tac Toe game
+        size: board width and height, win_length: stones in a row to win (default size)
+        """
+        self.size = size
+        self.win_length = win_length or size
+        self.bitboard = BitBoard(size, self.win_length)
         self.current_player = 'X'
         self.game_over = False
         self.winner = None
         self.moves_history = []
     
+    @property
+    def board(self) -> BoardView:
+        """List-of-lists view of the bitboard; board[row][col] is 'X', 'O' or ' '"""
+        return BoardView(self.bitboard)
+    
+    @board.setter
+    def board(self, rows: List[List[str]]):
+        """Replace the board contents from a list of lists of symbols"""
+        bitboard = self.bitboard
+        line_scores = bitboard.line_scores if bitboard.line_counts is not None else None
+        bitboard.line_counts = None  # Recounted once below instead of per stone
+        bitboard.masks = [0, 0]
+        for i, row in enumerate(rows):
+            for j, symbol in enumerate(row):
+                bitboard.set_symbol(bitboard.cell(i, j), symbol)
+        if line_scores is not None:
+            bitboard.track_lines(line_scores)
+    
     def reset_game(self):
         """Reset the game to initial state"""
-        self.board = [[' ' for _ in range(3)] for _ in range(3)]
+        self.bitboard = BitBoard(self.size, self.win_length)
         self.current_player = 'X'
         self.game_over = False
         self.winner = None
@@ -24,17 +51,12 @@ class TicTacToe:
     
     def get_available_moves(self) -> List[Tuple[int, int]]:
         """Get list of available moves (empty positions)"""
-        moves = []
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] == ' ':
-                    moves.append((i, j))
-        return moves
+        return [self.bitboard.row_col(cell) for cell in self.bitboard.empty_cells()]
     
     def is_valid_move(self, row: int, col: int) -> bool:
         """Check if a move is valid"""
-        return (0 <= row < 3 and 0 <= col < 3 and 
-                self.board[row][col] == ' ' and 
+        return (0 <= row < self.size and 0 <= col < self.size and 
+                self.bitboard.get(self.bitboard.cell(row, col)) is None and 
                 not self.game_over)
     
     def make_move(self, row: int, col: int) -> bool:
@@ -42,7 +64,7 @@ class TicTacToe:
         if not self.is_valid_move(row, col):
             return False
         
-        self.board[row][col] = self.current_player
+        self.bitboard.set_symbol(self.bitboard.cell(row, col), self.current_player)
         self.moves_history.append((row, col, self.current_player))
         
         # Check for win
@@ -50,7 +72,7 @@ class TicTacToe:
             self.game_over = True
             self.winner = self.current_player
         # Check for draw
-        elif len(self.get_available_moves()) == 0:
+        elif self.bitboard.is_full():
             self.game_over = True
             self.winner = 'Draw'
         else:
@@ -61,24 +83,13 @@ class TicTacToe:
     
     def check_win(self, row: int, col: int) -> bool:
         """Check if the last move resulted in a win"""
-        player = self.board[row][col]
-        
-        # Check row
-        if all(self.board[row][i] == player for i in range(3)):
-            return True
-        
-        # Check column
-        if all(self.board[i][col] == player for i in range(3)):
-            return True
-        
-        # Check diagonals
-        if row == col and all(self.board[i][i] == player for i in range(3)):
-            return True
-        
-        if row + col == 2 and all(self.board[i][2-i] == player for i in range(3)):
-            return True
+        cell = self.bitboard.cell(row, col)
+        side = self.bitboard.get(cell)
+        if side is None:
+            return False
         
-        return False
+        # Check the rows, columns and diagonals through this cell
+        return self.bitboard.wins_with(cell, side)
     
     def get_game_state(self) -> str:
         """Get current game state"""
@@ -93,22 +104,23 @@ class TicTacToe:
     def display_board(self) -> str:
         """Return a string representation of the board"""
         board_str = ""
-        for i in range(3):
+        for i in range(self.size):
             board_str += " " + " | ".join(self.board[i]) + " \n"
-            if i < 2:
-                board_str += "-----------\n"
+            if i < self.size - 1:
+                board_str += "-" * (4 * self.size - 1) + "\n"
         return board_str
     
     def get_board_for_display(self) -> List[List[str]]:
         """Get board with numbered positions for display"""
         display_board = []
-        for i in range(3):
+        width = len(str(self.size * self.size))
+        for i in range(self.size):
             row = []
-            for j in range(3):
+            for j in range(self.size):
                 if self.board[i][j] == ' ':
-                    row.append(str(i * 3 + j + 1))
+                    row.append(str(i * self.size + j + 1).rjust(width))
                 else:
-                    row.append(self.board[i][j])
+                    row.append(self.board[i][j].rjust(width))
             display_board.append(row)
         return display_board
     
@@ -118,7 +130,7 @@ class TicTacToe:
             return False
         
         row, col, player = self.moves_history.pop()
-        self.board[row][col] = ' '
+        self.bitboard.set(self.bitboard.cell(row, col), None)
         self.current_player = player
         self.game_over = False
         self.winner = None
@@ -6,12 +6,13 @@ A comprehensive Tic Tac Toe game with multiple AI difficulty levels
 
 import os
 import time
+import argparse
 from game_logic import TicTacToe
 from ai_player import AIPlayer, SmartAIPlayer
 
 class TicTacToeGame:
-    def __init__(self):
-        self.game = TicTacToe()
+    def __init__(self, size=3, win_length=None):
+        self.game = TicTacToe(size, win_length)
         self.ai_player = None
         self.game_mode = None
         self.player_symbol = 'X'
@@ -34,16 +35,19 @@ class TicTacToeGame:
         print("🎯 GAME BOARD")
         print("=" * 30)
         
-        board = self.game.get_board_for_display()
-        for i in range(3):
-            print(f" {' | '.join(board[i])} ")
-            if i < 2:
-                print("-----------")
+        self.print_grid(self.game.get_board_for_display())
         
         print("\n" + "=" * 30)
         print(f"📊 Game State: {self.game.get_game_state()}")
         print("=" * 30)
     
+    def print_grid(self, rows):
+        """Print rows of cell labels as a grid"""
+        for i, row in enumerate(rows):
+            print(f" {' | '.join(row)} ")
+            if i < len(rows) - 1:
+                print("-" * len(f" {' | '.join(row)} "))
+    
     def display_stats(self):
         """Display game statistics"""
         print(f"\n📈 GAME STATISTICS:")
@@ -121,28 +125,27 @@ class TicTacToeGame:
     
     def get_player_move(self):
         """Get move from human player"""
+        size = self.game.size
+        last = size * size
+        width = len(str(last))
         print(f"\n🎯 Your turn ({self.player_symbol})!")
-        print("Enter position (1-9):")
-        print(" 1 | 2 | 3 ")
-        print("-----------")
-        print(" 4 | 5 | 6 ")
-        print("-----------")
-        print(" 7 | 8 | 9 ")
+        print(f"Enter position (1-{last}):")
+        self.print_grid([[str(i * size + j + 1).rjust(width) for j in range(size)] for i in range(size)])
         
         while True:
             try:
-                position = int(input("\nEnter position (1-9): "))
-                if 1 <= position <= 9:
+                position = int(input(f"\nEnter position (1-{last}): "))
+                if 1 <= position <= last:
                     # Convert position to row, col
-                    row = (position - 1) // 3
-                    col = (position - 1) % 3
+                    row = (position - 1) // size
+                    col = (position - 1) % size
                     
                     if self.game.is_valid_move(row, col):
                         return row, col
                     else:
                         print("❌ That position is already taken!")
                 else:
-                    print("❌ Please enter a number between 1 and 9.")
+                    print(f"❌ Please enter a number between 1 and {last}.")
             except ValueError:
                 print("❌ Please enter a valid number.")
     
@@ -152,7 +155,7 @@ class TicTacToeGame:
         time.sleep(1)  # Add some delay for better UX
         
         move = self.ai_player.get_move(self.game)
-        print(f"AI chose position: {move[0] * 3 + move[1] + 1}")
+        print(f"AI chose position: {move[0] * self.game.size + move[1] + 1}")
         return move
     
     def play_pvp_game(self):
@@ -330,7 +333,11 @@ class TicTacToeGame:
 
 def main():
     """Main function"""
-    game = TicTacToeGame()
+    parser = argparse.ArgumentParser(description="Tic Tac Toe with AI")
+    parser.add_argument('--size', type=int, default=3, help="board width and height")
+    parser.add_argument('--win-length', type=int, default=None, help="stones in a row to win (default: size)")
+    args = parser.parse_args()
+    game = TicTacToeGame(args.size, args.win_length)
     try:
         game.run()
     except KeyboardInterrupt:
@@ -0,0 +1,256 @@
+import math
+import time
+import random
+import multiprocessing
+from typing import Dict, List, Optional, Tuple
+from game_logic import TicTacToe
+from bitboard import BitBoard, SYMBOLS, FULL_WIDTH_CELLS, candidate_cells
+
+# Search budget (iterations per move) of each difficulty level
+DIFFICULTY_ITERATIONS = {'easy': 30, 'medium': 300, 'hard': 1500, 'unbeatable': 6000}
+
+
+class Node:
+    """
+    A position in the search tree, reached by move.
+
+    wins counts the rollouts won by the side that played move (draws count
+    half), so a parent picks the child with the best wins / visits.
+    """
+    __slots__ = ('move', 'parent', 'children', 'untried', 'visits', 'wins', 'result')
+
+    def __init__(self, move: Optional[int], parent: Optional['Node'], untried: List[int],
+                 result: Optional[float] = None):
+        self.move = move
+        self.parent = parent
+        self.children: List['Node'] = []
+        self.untried = untried
+        self.visits = 0
+        self.wins = 0.0
+        # Set for finished games: 1.0 if move won, 0.5 for a draw
+        self.result = result
+
+
+def _terminal_result(board: BitBoard) -> Optional[float]:
+    """Get the result for the side that made the last move: 1.0 for a win, 0.5 for a draw, None if not over"""
+    if board.last_move_won():
+        return 1.0
+    if board.is_full():
+        return 0.5
+    return None
+
+
+def _rollout(board: BitBoard, rng: random.Random) -> Optional[int]:
+    """Play random moves to the end of the game and return the winning side, or None for a draw"""
+    cells = list(board.empty_cells())
+    side = board.side
+    while cells:
+        # Take a random cell out of the list by swapping the last one into its place
+        index = rng.randrange(len(cells))
+        cell = cells[index]
+        cells[index] = cells[-1]
+        cells.pop()
+        board.push(cell)
+        if board.wins_with(cell, side):
+            return side
+        side ^= 1
+    return None
+
+
+def _search_tree(root: Node, board: BitBoard, iterations: Optional[int], deadline: Optional[float],
+                 exploration: float, rng: random.Random, full_width_cells: int) -> int:
+    """Grow the tree below root by UCT until the budget runs out; returns the iterations run"""
+    depth = len(board.stack)
+    done = 0
+    while (iterations is None or done < iterations) and (deadline is None or time.perf_counter() < deadline):
+        node = root
+        # Selection: descend through fully expanded nodes by the UCT score
+        while not node.untried and node.children and node.result is None:
+            log_visits = math.log(node.visits)
+            node = max(node.children, key=lambda child: child.wins / child.visits
+                       + exploration * math.sqrt(log_visits / child.visits))
+            board.push(node.move)
+
+        # Expansion: add one untried move
+        if node.untried and node.result is None:
+            cell = node.untried.pop(rng.randrange(len(node.untried)))
+            board.push(cell)
+            result = _terminal_result(board)
+            child = Node(cell, node, [] if result is not None else candidate_cells(board, full_width_cells),
+                         result)
+            node.children.append(child)
+            node = child
+
+        # Simulation: the winning side of a random game from here (a finished game is its own result)
+        mover = board.side ^ 1  # The side that moved into node
+        if node.result is not None:
+            winner = None if node.result == 0.5 else mover
+        else:
+            winner = _rollout(board, rng)
+
+        # Backpropagation: credit each node from the side that moved into it
+        while node is not None:
+            node.visits += 1
+            if node.move is not None:
+                if winner is None:
+                    node.wins += 0.5
+                elif winner == mover:
+                    node.wins += 1.0
+            mover ^= 1
+            node = node.parent
+
+        while len(board.stack) > depth:
+            board.pop()
+        done += 1
+    return done
+
+
+def _root_stats(root: Node) -> Dict[int, Tuple[int, float]]:
+    """Get (visits, wins) of every move searched from the root"""
+    return {child.move: (child.visits, child.wins) for child in root.children}
+
+
+def _search_worker(task: tuple) -> Tuple[Dict[int, Tuple[int, float]], int]:
+    """Worker: search a position with a fresh tree and return its root statistics and iteration count"""
+    board, iterations, time_limit, exploration, seed, full_width_cells = task
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    root = Node(None, None, candidate_cells(board, full_width_cells))
+    done = _search_tree(root, board, iterations, deadline, exploration, random.Random(seed), full_width_cells)
+    return _root_stats(root), done
+
+
+class MCTSPlayer:
+    """
+    Monte Carlo Tree Search player: UCT selection, random bitboard rollouts
+    and the tree kept between moves.
+
+    Strength is set by the search budget rather than by random moves: the
+    difficulty picks the iterations per move (DIFFICULTY_ITERATIONS), and a
+    time_limit searches for that many seconds instead. With processes > 1
+    the root is searched in parallel: every worker grows its own tree and
+    the visit counts of the root moves are added up. The worker processes
+    belong to the player and run until close(), or the end of a with block.
+    """
+
+    # UCT exploration constant (sqrt(2) for rewards between 0 and 1)
+    exploration = math.sqrt(2)
+    # Boards with more cells only consider the empty cells next to a stone
+    full_width_cells = FULL_WIDTH_CELLS
+
+    def __init__(self, difficulty: str = "medium", time_limit: Optional[float] = None,
+                 iterations: Optional[int] = None, processes: int = 1, seed: Optional[int] = None):
+        """
+        Initialize MCTS player with specified difficulty
+        difficulty: "easy", "medium", "hard", "unbeatable" (iterations per move)
+        time_limit: seconds per move; replaces the difficulty's iterations unless iterations is given
+        iterations: iterations per move (per process), overriding the difficulty
+        processes: processes searching the root in parallel
+        seed: seed of the player's random generator (drawn from the random module by default)
+        """
+        self.difficulty = difficulty
+        self.player_symbol = None
+        self.time_limit = time_limit
+        if iterations is None and time_limit is None:
+            iterations = DIFFICULTY_ITERATIONS.get(difficulty, DIFFICULTY_ITERATIONS['medium'])
+        self.iterations = iterations
+        self.processes = processes
+        # Seeds the rollouts of this process and of every worker search
+        self.rng = random.Random(random.getrandbits(64) if seed is None else seed)
+        self._pool: Optional['multiprocessing.pool.Pool'] = None  # Started by the first parallel search
+        self._root: Optional[Node] = None
+        self._root_moves: List[int] = []  # Moves played before the kept tree's root
+        self.iterations_run = 0  # Iterations of the last move, over all processes
+        self.reused_visits = 0  # Visits the kept tree already had at the last move's root
+        self.win_rate = 0.0  # Share of the last move's rollouts it won (draws count half)
+
+    def set_player_symbol(self, symbol: str):
+        """Set the AI player's symbol (X or O)"""
+        self.player_symbol = symbol
+
+    def get_move(self, game: TicTacToe) -> Tuple[int, int]:
+        """Search the position and play the most visited move"""
+        board = game.bitboard.copy()
+        board.side = SYMBOLS.index(self.player_symbol)
+        root = self._reuse_root(game, board)
+        self.reused_visits = root.visits
+        deadline = None if self.time_limit is None else time.perf_counter() + self.time_limit
+
+        results = None
+        if self.processes > 1:
+            tasks = [(board.copy(), self.iterations, self.time_limit, self.exploration,
+                      self.rng.getrandbits(32), self.full_width_cells) for _ in range(self.processes - 1)]
+            if self._pool is None:
+                self._pool = multiprocessing.Pool(self.processes - 1)
+            results = self._pool.map_async(_search_worker, tasks)
+
+        # This process searches the kept tree while the workers search fresh ones
+        self.iterations_run = _search_tree(root, board, self.iterations, deadline, self.exploration,
+                                           self.rng, self.full_width_cells)
+        stats = _root_stats(root)
+        if results is not None:
+            stats = dict(stats)
+            for worker_stats, done in results.get():
+                self.iterations_run += done
+                for move, (visits, wins) in worker_stats.items():
+                    total_visits, total_wins = stats.get(move, (0, 0.0))
+                    stats[move] = (total_visits + visits, total_wins + wins)
+
+        if not stats:
+            # The budget allowed no iteration: play a random candidate move
+            move = self.rng.choice(candidate_cells(board, self.full_width_cells))
+            self.win_rate = 0.5
+            self._root = None
+            return board.row_col(move)
+        move = max(stats, key=lambda cell: stats[cell][0])
+        self.win_rate = stats[move][1] / stats[move][0]
+        self._keep_subtree(root, move)
+        return board.row_col(move)
+
+    def close(self):
+        """Stop the worker processes (a later parallel search starts new ones)"""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self) -> 'MCTSPlayer':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def search_stats(self) -> Dict[str, float]:
+        """Get the iterations and the chosen move's win rate of the last move's search"""
+        return {
+            'iterations': self.iterations_run,
+            'reused_visits': self.reused_visits,
+            'win_rate': self.win_rate,
+        }
+
+    def _reuse_root(self, game: TicTacToe, board: BitBoard) -> Node:
+        """Get the kept tree's node for the game's position, or a new root if it was not searched"""
+        moves = [board.cell(row, col) for row, col, _ in game.moves_history]
+        node = self._root
+        if node is not None and moves[:len(self._root_moves)] == self._root_moves:
+            for move in moves[len(self._root_moves):]:
+                node = next((child for child in node.children if child.move == move), None)
+                if node is None:
+                    break
+        else:
+            node = None
+        if node is None or node.result is not None:
+            node = Node(None, None, candidate_cells(board, self.full_width_cells))
+        node.parent = None
+        node.move = None
+        self._root = node
+        self._root_moves = moves
+        return node
+
+    def _keep_subtree(self, root: Node, move: int):
+        """Keep the chosen move's subtree as the tree for the next move"""
+        child = next((child for child in root.children if child.move == move), None)
+        if child is None:
+            self._root = None
+            return
+        self._root = child
+        self._root_moves = self._root_moves + [move]
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Perfect-play solution table for 3x3 Tic Tac Toe
+Running this script solves every reachable position once, backwards from
+the finished games, and writes solution_table.bin. The AI memory-maps the
+file at import and looks its moves up instead of searching.
+"""
+
+import os
+import mmap
+from typing import List, Optional, Tuple
+from bitboard import BitBoard, popcount
+
+SOLUTION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'solution_table.bin')
+MAGIC = b'TTT3'
+SIZE = 3
+N_CELLS = SIZE * SIZE
+N_STATES = 3 ** N_CELLS
+NO_MOVE = 0xFF
+# Value of a win for the side to move, less one per move until the game ends
+WIN_VALUE = 100
+
+# Base-3 index contribution of each 9-bit mask (cell i adds 3**i)
+_BASE3 = [sum(3 ** cell for cell in range(N_CELLS) if mask >> cell & 1) for mask in range(1 << N_CELLS)]
+
+
+def state_index(x_mask: int, o_mask: int) -> int:
+    """Get the base-3 index of a position (empty = 0, X = 1, O = 2 per cell)"""
+    return _BASE3[x_mask] + 2 * _BASE3[o_mask]
+
+
+def solve() -> Tuple[List[int], List[int]]:
+    """
+    Retrograde-solve every reachable position
+
+    Positions are collected layer by layer by number of stones, then valued
+    from the last layer back to the empty board, so every successor is
+    solved before the positions leading to it. Returns the value for the
+    side to move (WIN_VALUE - moves left for a win, its negative for a
+    loss, 0 for a draw) and the best move of every state index.
+    """
+    board = BitBoard(SIZE)
+    layers = [[(0, 0)]]
+    seen = {state_index(0, 0)}
+    for n_stones in range(N_CELLS):
+        layer = []
+        side = n_stones % 2
+        for masks in layers[-1]:
+            board.masks = list(masks)
+            if board.is_win(side ^ 1):
+                continue
+            for cell in board.empty_cells():
+                child = list(masks)
+                child[side] |= 1 << cell
+                index = state_index(*child)
+                if index not in seen:
+                    seen.add(index)
+                    layer.append(tuple(child))
+        layers.append(layer)
+
+    values = [0] * N_STATES
+    moves = [NO_MOVE] * N_STATES
+    for n_stones in range(N_CELLS, -1, -1):
+        side = n_stones % 2
+        for masks in layers[n_stones]:
+            index = state_index(*masks)
+            board.masks = list(masks)
+            if board.is_win(side ^ 1):
+                values[index] = -WIN_VALUE
+                continue
+            best_value, best_move = None, NO_MOVE
+            for cell in board.empty_cells():
+                child = list(masks)
+                child[side] |= 1 << cell
+                value = -values[state_index(*child)]
+                # One move further from the end: wins shrink, losses grow
+                value -= (value > 0) - (value < 0)
+                if best_value is None or value > best_value:
+                    best_value, best_move = value, cell
+            values[index] = best_value or 0
+            moves[index] = best_move
+    return values, moves
+
+
+def build_solution_table(path: str = SOLUTION_FILE) -> int:
+    """Solve the game and write the table (a header plus one value and move byte per state)"""
+    values, moves = solve()
+    data = bytearray(MAGIC)
+    for value, move in zip(values, moves):
+        data.append(value & 0xFF)
+        data.append(move)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+class SolutionTable:
+    """Read-only view of a solution table file, memory-mapped so lookups touch two bytes"""
+
+    def __init__(self, path: str = SOLUTION_FILE):
+        with open(path, 'rb') as f:
+            self._data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._data[:len(MAGIC)] != MAGIC or len(self._data) != len(MAGIC) + 2 * N_STATES:
+            self._data.close()
+            raise ValueError(f"{path} is not a Tic Tac Toe solution table")
+
+    def lookup(self, board: BitBoard) -> Optional[Tuple[int, Optional[int]]]:
+        """
+        Get (value for the side to move, best cell or None if the game is over)
+        of a standard 3x3 position, or None if the table does not cover it
+        """
+        if board.size != SIZE or board.win_length != SIZE:
+            return None
+        x_mask, o_mask = board.masks
+        # The table follows X moving first; other positions fall back to search
+        if board.side != popcount(x_mask) - popcount(o_mask):
+            return None
+        offset = len(MAGIC) + 2 * state_index(x_mask, o_mask)
+        value, move = self._data[offset], self._data[offset + 1]
+        if move == NO_MOVE:
+            if value == 0 and board.empty:
+                return None  # Not a reachable position
+            return (value - 256 if value > 127 else value), None
+        return (value - 256 if value > 127 else value), move
+
+    def best_move(self, board: BitBoard) -> Optional[int]:
+        """Get the best cell of a covered, unfinished position, or None"""
+        entry = self.lookup(board)
+        return None if entry is None else entry[1]
+
+    def close(self):
+        """Unmap the table file"""
+        self._data.close()
+
+
+def load_solution_table(path: str = SOLUTION_FILE) -> Optional[SolutionTable]:
+    """Open the solution table, or None if it has not been built"""
+    try:
+        return SolutionTable(path)
+    except (OSError, ValueError):
+        return None
+
+
+# Mapped once per process; None until `python solution_table.py` has been run
+SOLUTION = load_solution_table()
+
+
+if __name__ == "__main__":
+    size = build_solution_table()
+    print(f"Wrote {size:,} bytes to {SOLUTION_FILE}")
@@ -67,6 +67,14 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+# Board choices: (size, stones in a row to win)
+BOARD_SIZES = {
+    "3×3": (3, 3),
+    "4×4": (4, 4),
+    "5×5 (4 in a row)": (5, 4),
+    "15×15 (5 in a row)": (15, 5),
+}
+
 @st.cache_resource
 def initialize_game():
     """Initialize a new game"""
@@ -82,15 +90,15 @@ def display_board(game):
     """Display the game board with interactive buttons"""
     st.markdown('<h3 style="text-align: center;">🎯 Game Board</h3>', unsafe_allow_html=True)
     
-    # Create a 3x3 grid of buttons
-    cols = st.columns(3)
+    # Create a size x size grid of buttons
+    cols = st.columns(game.size)
     
-    for i in range(3):
-        for j in range(3):
+    for i in range(game.size):
+        for j in range(game.size):
             with cols[j]:
                 cell_value = game.board[i][j]
                 if cell_value == ' ':
-                    cell_value = str(i * 3 + j + 1)
+                    cell_value = str(i * game.size + j + 1)
                 
                 # Determine button color and style
                 if game.board[i][j] == 'X':
@@ -105,7 +113,7 @@ def display_board(game):
                     cell_value,
                     key=f"cell_{i}_{j}",
                     use_container_width=True,
-                    help=f"Position {i * 3 + j + 1}"
+                    help=f"Position {i * game.size + j + 1}"
                 ):
                     if game.is_valid_move(i, j):
                         st.session_state.last_move = (i, j)
@@ -223,6 +231,13 @@ def main():
             st.session_state.game.reset_game()
             st.session_state.last_move = None
         
+        # Board size selection
+        board_size = st.selectbox("Board size:", list(BOARD_SIZES))
+        size, win_length = BOARD_SIZES[board_size]
+        if (size, win_length) != (st.session_state.game.size, st.session_state.game.win_length):
+            st.session_state.game = TicTacToe(size, win_length)
+            st.session_state.last_move = None
+        
         # AI difficulty selection
         if "AI" in game_mode:
             st.subheader("AI Settings")
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for the batch Tic Tac Toe environment
+"""
+
+import numpy as np
+from batch_env import BatchTicTacToe, RandomPolicy, play_games, ONGOING, FINISHED
+from game_logic import DRAW, X_WINS, O_WINS
+
+# Board 0: X wins along the top row on the 5th move; board 1: a draw on the 9th
+X_WIN_CELLS = [0, 3, 1, 4, 2]
+DRAW_CELLS = [0, 1, 2, 4, 3, 5, 7, 6, 8]
+
+
+def board_state(env, board):
+    """Copies of everything step() may change on one board"""
+    return (env.cells[board].copy(), env.moves[board].copy(), int(env.n_moves[board]),
+            int(env.side[board]), env.line_counts[board].copy())
+
+
+def assert_same_state(first, second):
+    """Check two board_state() snapshots are equal"""
+    assert all(np.array_equal(a, b) for a, b in zip(first, second))
+
+
+def test_finished_boards_stay_frozen():
+    """Without auto_reset a finished board keeps its stones and reports FINISHED until reset()"""
+    env = BatchTicTacToe(2, auto_reset=False)
+    for step, draw_cell in enumerate(DRAW_CELLS):
+        if step < len(X_WIN_CELLS):
+            win_cell = X_WIN_CELLS[step]
+        else:
+            # An occupied cell: the finished board's cell must be ignored
+            win_cell = X_WIN_CELLS[0]
+            frozen = board_state(env, 0)
+        results = env.step(np.array([win_cell, draw_cell]))
+
+        if step < len(X_WIN_CELLS) - 1:
+            assert results[0] == ONGOING
+        elif step == len(X_WIN_CELLS) - 1:
+            assert results[0] == X_WINS and env.done[0]
+        else:
+            assert results[0] == FINISHED and env.done[0]
+            assert_same_state(board_state(env, 0), frozen)
+        assert results[1] == (DRAW if step == len(DRAW_CELLS) - 1 else ONGOING)
+
+    assert env.results.tolist() == [1, 1, 0]
+    assert env.moves[0, :env.n_moves[0]].tolist() == X_WIN_CELLS
+    assert env.to_game(0).winner == 'X' and env.to_game(1).winner == 'Draw'
+
+    # Stepping a fully finished batch changes nothing and counts no games
+    frozen = [board_state(env, board) for board in range(2)]
+    assert (env.step(np.zeros(2, dtype=np.int64)) == FINISHED).all()
+    for board in range(2):
+        assert_same_state(board_state(env, board), frozen[board])
+    assert env.results.tolist() == [1, 1, 0]
+
+    env.reset(np.array([0]))
+    assert not env.done[0] and env.done[1]
+    assert env.n_moves[0] == 0 and not env.cells[0].any()
+    assert env.step(np.array([4, 0]))[1] == FINISHED
+
+
+def test_play_games_until_all_done():
+    """play_games stops once every board is done; each board's moves replay to its counted result"""
+    env = BatchTicTacToe(64, auto_reset=False)
+    counts = play_games(env, RandomPolicy(1), RandomPolicy(2), 10 ** 6)
+    assert env.done.all() and counts.sum() == 64
+    winners = [env.to_game(board).winner for board in range(64)]
+    assert [winners.count('Draw'), winners.count('X'), winners.count('O')] == counts.tolist()
+    assert counts[X_WINS] + counts[O_WINS] + counts[DRAW] == env.games_played
+
+
+if __name__ == "__main__":
+    test_finished_boards_stay_frozen()
+    test_play_games_until_all_done()
+    print("All batch environment tests passed")
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Tests for the bitboard and its push/pop search primitives
+"""
+
+import random
+from bitboard import BitBoard, SYMBOLS, EMPTY
+from game_logic import TicTacToe
+
+# (board size, stones in a row to win)
+SHAPES = [(3, 3), (4, 4), (5, 4), (6, 5), (15, 5)]
+LINE_SCORES = [[0, -1, -10, -100, -1000, -10000]] + [[10 ** (x - 1)] + [0] * 5 for x in range(1, 6)]
+
+
+def has_run(cells, size, win_length):
+    """Check a set of (row, col) cells for win_length in a row by walking every direction"""
+    for row, col in cells:
+        for d_row, d_col in ((0, 1), (1, 0), (1, 1), (1, -1)):
+            if all((row + d_row * step, col + d_col * step) in cells for step in range(win_length)):
+                return True
+    return False
+
+
+def counted_lines(board):
+    """Line stone counts and score recomputed from scratch"""
+    fresh = board.copy()
+    fresh.track_lines(board.line_scores)
+    return fresh.line_counts, fresh.score
+
+
+def test_push_pop_restores_board():
+    """Pushing moves and popping them back restores stones, side and line counts"""
+    rng = random.Random(5)
+    for size, win_length in SHAPES:
+        board = BitBoard(size, win_length)
+        board.track_lines(LINE_SCORES)
+        cells = rng.sample(range(size * size), min(size * size, 20))
+        snapshots = []
+        for cell in cells:
+            snapshots.append((board.masks[:], board.side, [counts[:] for counts in board.line_counts], board.score))
+            board.push(cell)
+            assert board.get(cell) == board.side ^ 1
+            assert (board.line_counts, board.score) == counted_lines(board)
+        for cell in reversed(cells):
+            assert board.pop() == cell
+            masks, side, line_counts, score = snapshots.pop()
+            assert (board.masks, board.side, board.line_counts, board.score) == (masks, side, line_counts, score)
+        assert board.masks == [0, 0] and not board.stack
+
+
+def test_win_detection():
+    """is_win, wins_with and last_move_won agree with a direct scan on N x N boards with K in a row"""
+    rng = random.Random(11)
+    for size, win_length in SHAPES:
+        for _ in range(40):
+            board = BitBoard(size, win_length)
+            stones = [set(), set()]
+            for cell in rng.sample(range(size * size), rng.randint(1, size * size)):
+                side = board.side
+                won = has_run(stones[side] | {board.row_col(cell)}, size, win_length)
+                assert board.wins_with(cell, side) == won
+                board.push(cell)
+                stones[side].add(board.row_col(cell))
+                assert board.last_move_won() == won
+                assert board.is_win(side) == has_run(stones[side], size, win_length)
+                if won:
+                    break
+            assert board.is_full() == (len(stones[0]) + len(stones[1]) == size * size)
+
+
+def test_board_setter_recounts_lines():
+    """Replacing a game's board keeps a line-tracking bitboard's counts in step"""
+    game = TicTacToe(5, 4)
+    game.bitboard.track_lines(LINE_SCORES)
+    game.make_move(2, 2)
+    game.make_move(0, 0)
+    rows = [[EMPTY] * 5 for _ in range(5)]
+    rows[1][1] = rows[1][2] = SYMBOLS[0]
+    rows[4][4] = SYMBOLS[1]
+    game.board = rows
+    assert game.get_board() == rows
+    assert (game.bitboard.line_counts, game.bitboard.score) == counted_lines(game.bitboard)
+
+
+if __name__ == "__main__":
+    test_push_pop_restores_board()
+    test_win_detection()
+    test_board_setter_recounts_lines()
+    print("All bitboard tests passed")
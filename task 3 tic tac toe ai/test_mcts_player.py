@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Tests for the Monte Carlo Tree Search player
+"""
+
+import random
+from game_logic import TicTacToe
+from mcts_player import MCTSPlayer
+
+
+def play(game, x_player, o_player, rng):
+    """Play a game to the end; a None player moves at random. Returns the winner ('X', 'O' or 'Draw')"""
+    for player, symbol in ((x_player, 'X'), (o_player, 'O')):
+        if player is not None:
+            player.set_player_symbol(symbol)
+    while not game.game_over:
+        player = x_player if game.current_player == 'X' else o_player
+        if player is None:
+            move = rng.choice(game.get_available_moves())
+        else:
+            move = player.get_move(game)
+            assert move in game.get_available_moves()
+        assert game.make_move(*move)
+    return game.winner
+
+
+def test_legal_moves():
+    """Moves are legal on 3x3 and larger boards, including with no search budget at all"""
+    rng = random.Random(1)
+    for size, win_length, player in ((3, 3, MCTSPlayer("medium", seed=1)),
+                                     (5, 4, MCTSPlayer(iterations=50, seed=2)),
+                                     (6, 4, MCTSPlayer(time_limit=0.0, seed=3))):
+        for _ in range(2):
+            play(TicTacToe(size, win_length), player, None, rng)
+            play(TicTacToe(size, win_length), None, player, rng)
+
+
+def test_seeded_players_repeat():
+    """Players with the same seed and iteration budget play the same games"""
+    games = []
+    for _ in range(2):
+        game = TicTacToe()
+        play(game, MCTSPlayer("medium", seed=7), MCTSPlayer("easy", seed=8), random.Random(0))
+        games.append(game.moves_history)
+    assert games[0] == games[1]
+
+
+def test_never_loses_to_random():
+    """Unbeatable never loses a 3x3 game to random moves, as X or O"""
+    rng = random.Random(5)
+    player = MCTSPlayer("unbeatable", seed=5)
+    for _ in range(5):
+        assert play(TicTacToe(), player, None, rng) != 'O'
+        assert play(TicTacToe(), None, player, rng) != 'X'
+
+
+def test_parallel_pool():
+    """A parallel player starts its own worker pool, adds up their iterations and stops it on close"""
+    with MCTSPlayer(iterations=100, processes=3, seed=11) as player:
+        player.set_player_symbol('X')
+        game = TicTacToe(4, 4)
+        move = player.get_move(game)
+        assert move in game.get_available_moves()
+        assert player.iterations_run == 300
+        assert player._pool is not None
+    assert player._pool is None
+
+
+if __name__ == "__main__":
+    test_legal_moves()
+    test_seeded_players_repeat()
+    test_never_loses_to_random()
+    test_parallel_pool()
+    print("All MCTS player tests passed")
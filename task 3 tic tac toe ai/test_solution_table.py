@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the 3x3 perfect-play solution table
+"""
+
+import os
+import tempfile
+from bitboard import BitBoard
+from ai_player import AIPlayer
+from solution_table import SolutionTable, WIN_VALUE, N_CELLS, build_solution_table
+
+
+def search_value(player, board):
+    """Full-depth negamax value of a position for the side to move"""
+    player._start_table(board)
+    player._deadline = None
+    player._depth_limit = N_CELLS
+    player._killers = [[None, None] for _ in range(N_CELLS + 1)]
+    player._history = [[0] * N_CELLS, [0] * N_CELLS]
+    return player._negamax(board, 0, float('-inf'), float('inf'))
+
+
+def search_score(player, table_value):
+    """Turn a table value (WIN_VALUE less the moves to the end) into the search's score"""
+    if table_value == 0:
+        return 0
+    moves_left = WIN_VALUE - abs(table_value)
+    score = player.win_score - moves_left
+    return score if table_value > 0 else -score
+
+
+def reachable_positions():
+    """Every unfinished position reachable from the empty board, once each"""
+    board = BitBoard(3)
+    seen = set()
+    positions = []
+
+    def walk():
+        key = tuple(board.masks)
+        if key in seen or (board.stack and board.last_move_won()) or board.is_full():
+            return
+        seen.add(key)
+        positions.append(board.copy())
+        for cell in list(board.empty_cells()):
+            board.push(cell)
+            walk()
+            board.pop()
+
+    walk()
+    return positions
+
+
+def test_lookups_match_negamax():
+    """Table values equal the search's on every reachable position, and table moves keep that value"""
+    player = AIPlayer("unbeatable", time_limit=None)
+    positions = reachable_positions()
+    assert len(positions) == 4520
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'solution_table.bin')
+        build_solution_table(path)
+        table = SolutionTable(path)
+        for board in positions:
+            value, move = table.lookup(board)
+            score = search_value(player, board)
+            assert score == search_score(player, value), (board.masks, value, score)
+            board.push(move)
+            # Seen from the position before it, the game lasts one more move
+            child = -search_value(player, board)
+            child -= (child > 0) - (child < 0)
+            assert child == score, (board.masks, move)
+        table.close()
+
+
+def test_uncovered_positions():
+    """Boards other than 3x3, and positions where O moved first, fall back to the search"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'solution_table.bin')
+        build_solution_table(path)
+        table = SolutionTable(path)
+        assert table.lookup(BitBoard(4)) is None
+        board = BitBoard(3)
+        board.side = 1
+        board.push(4)
+        assert table.lookup(board) is None
+        assert table.best_move(BitBoard(3)) is not None
+        table.close()
+
+
+if __name__ == "__main__":
+    test_lookups_match_negamax()
+    test_uncovered_positions()
+    print("All solution table tests passed")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the symmetry-aware transposition table
+"""
+
+import random
+from bitboard import BitBoard
+from game_logic import TicTacToe
+from ai_player import AIPlayer, SmartAIPlayer, clear_tables
+from transposition import (TranspositionTable, EXACT, MAX_CAPACITY, canonical_key, dihedral_permutations,
+                           to_canonical_cell, from_canonical_cell, table_capacity)
+
+
+def random_board(size, n_stones, rng):
+    """Place n_stones alternating stones (X first) on random cells"""
+    board = BitBoard(size)
+    for cell in rng.sample(range(size * size), n_stones):
+        board.push(cell)
+    return board
+
+
+def transformed(board, perm):
+    """Get the image of a board under a cell permutation"""
+    image = BitBoard(board.size, board.win_length)
+    image.masks = [sum(1 << perm[cell] for cell in range(board.n_cells) if mask >> cell & 1)
+                   for mask in board.masks]
+    image.side = board.side
+    return image
+
+
+def test_canonical_cell_round_trip():
+    """Mapping a cell into the canonical numbering and back is the identity"""
+    for size in (3, 4, 5, 15):
+        for transform in range(8):
+            for cell in range(size * size):
+                canonical = to_canonical_cell(size, transform, cell)
+                assert from_canonical_cell(size, transform, canonical) == cell
+                assert to_canonical_cell(size, transform, from_canonical_cell(size, transform, cell)) == cell
+
+
+def test_symmetric_images_share_key_and_moves():
+    """All 8 images of a position share a key, and a stored move maps onto the matching cell of each"""
+    rng = random.Random(3)
+    for size in (3, 4, 5):
+        for _ in range(50):
+            board = random_board(size, rng.randint(1, size * size - 1), rng)
+            key, transform = canonical_key(board)
+            cell = rng.choice(list(board.empty_cells()))
+            stored = to_canonical_cell(size, transform, cell)
+            images = [transformed(board, perm) for perm in dihedral_permutations(size)]
+            for perm, image in zip(dihedral_permutations(size), images):
+                image_key, image_transform = canonical_key(image)
+                assert image_key == key
+                if len({tuple(other.masks) for other in images}) == 8:
+                    # Without a symmetry of its own, the position has one mapping onto the canonical image
+                    assert from_canonical_cell(size, image_transform, stored) == perm[cell]
+
+
+def test_table_capacity():
+    """Tables are sized from the board and evict the oldest entry when full"""
+    assert table_capacity(3) == 3 ** 9
+    assert table_capacity(15) == MAX_CAPACITY
+    table = TranspositionTable(capacity=4)
+    for key in range(6):
+        table.store(key, 1, EXACT, 0, None)
+    assert len(table) == 4
+    assert table.probe(0) is None and table.probe(5) is not None
+    assert table.stats()['evictions'] == 2
+
+
+def test_tables_shared_per_process():
+    """Players with the same search settings share one table across games until the board shape changes"""
+    clear_tables()
+    player = AIPlayer("unbeatable", time_limit=0.2)
+    player.set_player_symbol('X')
+    game = TicTacToe(4, 4)
+    game.make_move(0, 0)
+    game.make_move(1, 1)
+    player._smart_move(game)
+    table = player.transpositions
+    assert table.capacity == table_capacity(4)
+    stored = len(table)
+    assert stored > 0
+
+    # A new game with another player of the same class keeps the table and its entries
+    other = AIPlayer("unbeatable", time_limit=0.2)
+    other.set_player_symbol('O')
+    game = TicTacToe(4, 4)
+    game.make_move(3, 3)
+    other._smart_move(game)
+    assert other.transpositions is table and len(table) >= stored
+
+    # Another evaluation gets its own table; another board shape replaces it
+    smart = SmartAIPlayer("unbeatable", time_limit=0.2)
+    smart.set_player_symbol('O')
+    smart._smart_move(game)
+    assert smart.transpositions is not table
+    player._smart_move(TicTacToe(5, 4))
+    assert player.transpositions is not table and player.transpositions.capacity == table_capacity(5)
+    clear_tables()
+
+
+if __name__ == "__main__":
+    test_canonical_cell_round_trip()
+    test_symmetric_images_share_key_and_moves()
+    test_table_capacity()
+    test_tables_shared_per_process()
+    print("All transposition tests passed")
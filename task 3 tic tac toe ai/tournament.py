@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""
+Headless AI tournament for Tic Tac Toe
+This script plays round-robin matches between AI configurations across a
+process pool, streams compact game records to disk and reports games/sec,
+win/draw/loss matrices and Elo estimates.
+"""
+
+import os
+import json
+import time
+import random
+import struct
+import argparse
+import multiprocessing
+from itertools import combinations
+from typing import Dict, Iterator, List, Optional, Tuple
+from game_logic import TicTacToe, DRAW, X_WINS, O_WINS
+from ai_player import AIPlayer, SmartAIPlayer
+from mcts_player import MCTSPlayer
+
+# Player classes a spec such as "SmartAIPlayer:hard" may name
+PLAYER_CLASSES = {'AIPlayer': AIPlayer, 'SmartAIPlayer': SmartAIPlayer, 'MCTSPlayer': MCTSPlayer}
+DEFAULT_CLASS = 'SmartAIPlayer'
+
+# Records file: MAGIC, a uint32 length and a JSON header, then per game
+# (X player, O player, result) bytes and a uint16 move count, followed by
+# the moves as cells of the header's move_bytes each
+MAGIC = b'TTTG'
+RECORD_HEADER = struct.Struct('<BBBH')
+MAX_PLAYERS = 256
+
+def move_format(size: int) -> str:
+    """Get the struct code of a move cell: one byte up to 16x16 boards, two above"""
+    return 'B' if size * size <= 256 else 'H'
+
+def parse_player(spec: str) -> Tuple[str, str]:
+    """Split a player spec ("hard" or "AIPlayer:hard") into (class name, difficulty)"""
+    class_name, _, difficulty = spec.rpartition(':')
+    class_name = class_name or DEFAULT_CLASS
+    if class_name not in PLAYER_CLASSES:
+        raise ValueError(f"Unknown player class '{class_name}' in '{spec}'")
+    return class_name, difficulty
+
+def make_player(spec: str, time_limit: Optional[float] = None):
+    """Create the AI player described by a spec"""
+    class_name, difficulty = parse_player(spec)
+    return PLAYER_CLASSES[class_name](difficulty, time_limit=time_limit)
+
+def play_game(game: TicTacToe, x_player, o_player) -> Tuple[int, List[int]]:
+    """Play one game without any output and return (result, moves as cell indices)"""
+    game.reset_game()
+    x_player.set_player_symbol('X')
+    o_player.set_player_symbol('O')
+    moves = []
+    while not game.game_over:
+        player = x_player if game.current_player == 'X' else o_player
+        row, col = player.get_move(game)
+        game.make_move(row, col)
+        moves.append(row * game.size + col)
+    if game.winner == 'Draw':
+        return DRAW, moves
+    return (X_WINS if game.winner == 'X' else O_WINS), moves
+
+def play_match(task: tuple) -> Tuple[int, int, List[int], bytes]:
+    """
+    Worker: play a chunk of games between two players, alternating who plays X
+
+    Returns the player indices, (first player wins, draws, second player
+    wins) and the packed game records.
+    """
+    first, second, specs, n_games, seed, size, win_length, time_limit = task
+    random.seed(seed)
+    players = (make_player(specs[first], time_limit), make_player(specs[second], time_limit))
+    indices = (first, second)
+    game = TicTacToe(size, win_length)
+    cell_format = move_format(size)
+
+    counts = [0, 0, 0]
+    records = bytearray()
+    for i in range(n_games):
+        x = i % 2
+        result, moves = play_game(game, players[x], players[x ^ 1])
+        records += RECORD_HEADER.pack(indices[x], indices[x ^ 1], result, len(moves))
+        records += struct.pack(f'<{len(moves)}{cell_format}', *moves)
+        if result == DRAW:
+            counts[1] += 1
+        elif (result == X_WINS) == (x == 0):
+            counts[0] += 1
+        else:
+            counts[2] += 1
+    return first, second, counts, bytes(records)
+
+def make_tasks(specs: List[str], games_per_pair: int, chunk_size: int, seed: int,
+               size: int, win_length: Optional[int], time_limit: Optional[float]) -> List[tuple]:
+    """Split every pairing's games into chunks, each with its own seed"""
+    tasks = []
+    for first, second in combinations(range(len(specs)), 2):
+        for start in range(0, games_per_pair, chunk_size):
+            n_games = min(chunk_size, games_per_pair - start)
+            tasks.append((first, second, specs, n_games, seed + len(tasks), size, win_length, time_limit))
+    return tasks
+
+def elo_ratings(scores: List[List[float]], games: List[List[int]], iterations: int = 500,
+                prior_draws: float = 1.0) -> List[float]:
+    """
+    Estimate Elo ratings (averaging 1500) from points scored (win 1, draw 0.5)
+
+    Each player also gets prior_draws virtual draws against an average
+    opponent, so players who win or lose every game keep finite ratings.
+    """
+    n = len(scores)
+    ratings = [0.0] * n
+    for _ in range(iterations):
+        for i in range(n):
+            expected = prior_draws / (1 + 10 ** (-ratings[i] / 400))
+            actual = prior_draws / 2 + sum(scores[i])
+            total = prior_draws + sum(games[i])
+            for j in range(n):
+                if games[i][j]:
+                    expected += games[i][j] / (1 + 10 ** ((ratings[j] - ratings[i]) / 400))
+            ratings[i] += 400 * (actual - expected) / total
+        mean = sum(ratings) / n
+        ratings = [rating - mean for rating in ratings]
+    return [1500 + rating for rating in ratings]
+
+def read_records(path: str) -> Tuple[Dict, Iterator[Tuple[int, int, int, Tuple[int, ...]]]]:
+    """Open a records file and return its header and an iterator of (X player, O player, result, move cells)"""
+    f = open(path, 'rb')
+    if f.read(len(MAGIC)) != MAGIC:
+        f.close()
+        raise ValueError(f"{path} is not a tournament records file")
+    header_size, = struct.unpack('<I', f.read(4))
+    header = json.loads(f.read(header_size))
+    cell_format = 'B' if header['move_bytes'] == 1 else 'H'
+
+    def records():
+        with f:
+            while True:
+                head = f.read(RECORD_HEADER.size)
+                if len(head) < RECORD_HEADER.size:
+                    return
+                x_player, o_player, result, n_moves = RECORD_HEADER.unpack(head)
+                cells = struct.Struct(f'<{n_moves}{cell_format}')
+                yield x_player, o_player, result, cells.unpack(f.read(cells.size))
+
+    return header, records()
+
+def run_tournament(specs: List[str], games_per_pair: int = 1000, processes: Optional[int] = None,
+                   size: int = 3, win_length: Optional[int] = None, time_limit: Optional[float] = None,
+                   chunk_size: int = 500, seed: int = 0, output: Optional[str] = 'tournament_games.bin'):
+    """Play every pairing of specs and return the wins, draws and games matrices and Elo ratings"""
+    if len(specs) > MAX_PLAYERS:
+        raise ValueError(f"Game records hold at most {MAX_PLAYERS} players, got {len(specs)}")
+    chunk_size += chunk_size % 2  # Even chunks give each player X equally often
+    tasks = make_tasks(specs, games_per_pair, chunk_size, seed, size, win_length, time_limit)
+    n = len(specs)
+    wins = [[0] * n for _ in range(n)]
+    draws = [[0] * n for _ in range(n)]
+
+    out = None
+    if output:
+        out = open(output, 'wb')
+        header = json.dumps({'players': specs, 'size': size, 'win_length': win_length or size,
+                             'move_bytes': struct.calcsize(move_format(size))}).encode()
+        out.write(MAGIC + struct.pack('<I', len(header)) + header)
+
+    start_time = time.perf_counter()
+    try:
+        with multiprocessing.Pool(processes) as pool:
+            for first, second, counts, records in pool.imap_unordered(play_match, tasks):
+                wins[first][second] += counts[0]
+                draws[first][second] += counts[1]
+                draws[second][first] += counts[1]
+                wins[second][first] += counts[2]
+                if out is not None:
+                    out.write(records)
+    finally:
+        if out is not None:
+            out.close()
+    elapsed = time.perf_counter() - start_time
+
+    games = [[wins[i][j] + draws[i][j] + wins[j][i] for j in range(n)] for i in range(n)]
+    scores = [[wins[i][j] + draws[i][j] / 2 for j in range(n)] for i in range(n)]
+    total_games = sum(map(sum, games)) // 2
+    return {
+        'wins': wins,
+        'draws': draws,
+        'games': games,
+        'elo': elo_ratings(scores, games),
+        'total_games': total_games,
+        'seconds': elapsed,
+        'games_per_sec': total_games / elapsed if elapsed else 0.0,
+    }
+
+def print_report(specs: List[str], results: Dict):
+    """Print games/sec, the win/draw/loss matrix and the Elo table"""
+    print(f"\n🏁 {results['total_games']:,} games in {results['seconds']:.1f} s "
+          f"({results['games_per_sec']:,.0f} games/sec)")
+
+    width = max(12, *(len(spec) + 2 for spec in specs))
+    print("\n📊 Wins/Draws/Losses (row player vs column player):")
+    print(" " * width + "".join(f"{spec:>{width}}" for spec in specs))
+    for i, spec in enumerate(specs):
+        cells = []
+        for j in range(len(specs)):
+            if i == j:
+                cells.append(f"{'-':>{width}}")
+            else:
+                cells.append(f"{results['wins'][i][j]}/{results['draws'][i][j]}/{results['wins'][j][i]}"
+                             .rjust(width))
+        print(f"{spec:<{width}}" + "".join(cells))
+
+    print("\n📈 Elo estimates:")
+    for spec, rating in sorted(zip(specs, results['elo']), key=lambda item: -item[1]):
+        print(f"   {spec:<{width}}{rating:>7.0f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('players', nargs='*', default=['easy', 'medium', 'hard', 'unbeatable'],
+                        help="player specs: a difficulty, optionally prefixed by a class (AIPlayer:hard)")
+    parser.add_argument('--games', type=int, default=1000, help="games per pairing")
+    parser.add_argument('--processes', type=int, default=os.cpu_count())
+    parser.add_argument('--size', type=int, default=3)
+    parser.add_argument('--win-length', type=int, default=None)
+    parser.add_argument('--time-limit', type=float, default=None, help="seconds per AI move")
+    parser.add_argument('--chunk-size', type=int, default=500, help="games per worker task")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', default='tournament_games.bin', help="game records file ('' to skip)")
+    args = parser.parse_args()
+
+    results = run_tournament(args.players, args.games, args.processes, args.size, args.win_length,
+                             args.time_limit, args.chunk_size, args.seed, args.output)
+    print_report(args.players, results)
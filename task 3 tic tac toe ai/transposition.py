@@ -0,0 +1,181 @@
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from bitboard import BitBoard
+
+# Kinds of stored values: exact, or a lower/upper bound from a beta/alpha cutoff
+EXACT, LOWER, UPPER = 0, 1, 2
+
+# Bits of a position looked up per table access
+CHUNK_BITS = 8
+
+# Entries kept by a table: every position of a 3x3 board, capped on larger boards
+MAX_CAPACITY = 1 << 16
+
+# Per board size: the 8 cell permutations, their inverses and the chunked lookup tables
+_permutations: Dict[int, List[List[int]]] = {}
+_inverse_permutations: Dict[int, List[List[int]]] = {}
+_chunk_tables: Dict[int, List[List[List[int]]]] = {}
+
+
+def dihedral_permutations(size: int) -> List[List[int]]:
+    """Get the cell permutations of the 8 rotations and reflections of a square board"""
+    if size not in _permutations:
+        last = size - 1
+        transforms = [
+            lambda r, c: (r, c),
+            lambda r, c: (c, last - r),
+            lambda r, c: (last - r, last - c),
+            lambda r, c: (last - c, r),
+            lambda r, c: (r, last - c),
+            lambda r, c: (last - r, c),
+            lambda r, c: (c, r),
+            lambda r, c: (last - c, last - r),
+        ]
+        perms = []
+        for transform in transforms:
+            perm = []
+            for cell in range(size * size):
+                row, col = transform(*divmod(cell, size))
+                perm.append(row * size + col)
+            perms.append(perm)
+        inverses = []
+        for perm in perms:
+            inverse = [0] * len(perm)
+            for cell, image in enumerate(perm):
+                inverse[image] = cell
+            inverses.append(inverse)
+        _permutations[size] = perms
+        _inverse_permutations[size] = inverses
+    return _permutations[size]
+
+
+def inverse_permutations(size: int) -> List[List[int]]:
+    """Get the permutations mapping each transformed board back onto the original"""
+    if size not in _inverse_permutations:
+        dihedral_permutations(size)
+    return _inverse_permutations[size]
+
+
+def table_capacity(size: int) -> int:
+    """Get the number of entries a table for a board size holds"""
+    return min(3 ** (size * size), MAX_CAPACITY)
+
+
+def symmetry_tables(size: int) -> List[List[List[int]]]:
+    """
+    Get, per transform and per CHUNK_BITS-bit chunk of a position, the table
+    mapping the chunk's value to its transformed bits
+
+    A position packs both sides' stones as x_mask | o_mask << size**2, so one
+    table lookup per chunk transforms both masks at once.
+    """
+    if size not in _chunk_tables:
+        n_cells = size * size
+        n_bits = 2 * n_cells
+        tables = []
+        for perm in dihedral_permutations(size):
+            # Bit i of a position moves to bit target[i]
+            target = perm + [n_cells + cell for cell in perm]
+            chunks = []
+            for start in range(0, n_bits, CHUNK_BITS):
+                bits = target[start:start + CHUNK_BITS]
+                table = [0] * (1 << len(bits))
+                for value in range(1, len(table)):
+                    low = value & -value
+                    table[value] = table[value ^ low] | 1 << bits[low.bit_length() - 1]
+                chunks.append(table)
+            tables.append(chunks)
+        _chunk_tables[size] = tables
+    return _chunk_tables[size]
+
+
+def canonical_key(board: BitBoard) -> Tuple[int, int]:
+    """
+    Get the key of a position shared by all its symmetric images, and the
+    index of the transform mapping the board onto the canonical image
+
+    The key is the smallest transformed position, combined with the side to
+    move and the board shape so one table can hold several board sizes.
+    """
+    position = board.masks[0] | board.masks[1] << board.n_cells
+    best = None
+    best_transform = 0
+    for transform, chunks in enumerate(symmetry_tables(board.size)):
+        image = 0
+        rest = position
+        for table in chunks:
+            image |= table[rest & 0xFF]
+            rest >>= CHUNK_BITS
+            if not rest:
+                break
+        if best is None or image < best:
+            best = image
+            best_transform = transform
+    key = ((best << 1 | board.side) << 16) | board.size << 8 | board.win_length
+    return key, best_transform
+
+
+class TranspositionTable:
+    """
+    Search results keyed by canonical position, shared across the moves of a game.
+
+    Each entry holds (draft, kind, value, move): the remaining search depth
+    the value was computed with, whether it is EXACT or a LOWER/UPPER bound,
+    and the best move in canonical cell numbering. When the table holds
+    capacity entries the least recently stored one is evicted.
+    """
+
+    def __init__(self, capacity: int = MAX_CAPACITY):
+        self.capacity = capacity
+        self.entries: 'OrderedDict[int, Tuple[int, int, float, Optional[int]]]' = OrderedDict()
+        self.probes = 0
+        self.hits = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def probe(self, key: int) -> Optional[Tuple[int, int, float, Optional[int]]]:
+        """Get the entry stored for a key, or None"""
+        self.probes += 1
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.hits += 1
+        return entry
+
+    def store(self, key: int, draft: int, kind: int, value: float, move: Optional[int]):
+        """Store a search result, evicting the oldest entry when the table is full"""
+        entries = self.entries
+        if key in entries:
+            if entries[key][0] > draft:
+                return  # Keep the deeper result
+            entries.move_to_end(key)
+        entries[key] = (draft, kind, value, move)
+        if len(entries) > self.capacity:
+            entries.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        """Remove every entry and reset the statistics"""
+        self.entries.clear()
+        self.probes = self.hits = self.evictions = 0
+
+    def stats(self) -> Dict[str, float]:
+        """Get the size, probe and hit counts, hit rate and evictions"""
+        return {
+            'entries': len(self.entries),
+            'probes': self.probes,
+            'hits': self.hits,
+            'hit_rate': self.hits / self.probes if self.probes else 0.0,
+            'evictions': self.evictions,
+        }
+
+
+def to_canonical_cell(size: int, transform: int, cell: int) -> int:
+    """Map a board cell into the canonical image's numbering"""
+    return dihedral_permutations(size)[transform][cell]
+
+
+def from_canonical_cell(size: int, transform: int, cell: int) -> int:
+    """Map a cell of the canonical image back onto the board"""
+    return inverse_permutations(size)[transform][cell]